@@ -0,0 +1,145 @@
+"""Benchmark state memory over long runs: full-state node returns versus reducer deltas.
+
+The first table isolates state handling with trivial nodes, comparing nodes
+that return copies of the full message list and result dict (the previous
+``AgentState`` behaviour) with nodes that return only deltas through the
+``AgentState`` reducers. The second table runs ``AgentSystem`` end to end with
+an offline model to show memory as the number of hops grows. The third table
+times the messages reducers alone on messages that already carry an id, as
+LangGraph delivers them: ``append_messages`` passes those to ``add_messages``,
+while the delta channel reducer ``append_message_batches`` copies the list once
+and appends the new messages to the copy.
+
+Usage:
+    python benchmarks/bench_state_memory.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, TypedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, StateGraph
+from langgroup import AgentState, AgentSystem, BaseAgent
+from langgroup.models import append_message_batches, append_messages
+from langgroup.testing import ScriptedChatModel, sequential_router
+
+HOPS = (50, 200, 400)
+REDUCER_WRITES = (1_000, 2_000, 5_000)
+RESULT_TEXT = "x" * 200
+
+
+class CopyingState(TypedDict):
+    """The previous state schema, without reducers."""
+    messages: list
+    next: str
+    task_result: dict
+
+
+class EchoAgent(BaseAgent):
+    """Leaf agent without tools."""
+
+    @property
+    def description(self) -> str:
+        return "Echoes its input."
+
+    @property
+    def tools(self) -> List[Callable]:
+        return []
+
+    @property
+    def system_prompt(self) -> str:
+        return "Echo the request."
+
+
+def build_state_graph(hops: int, copying: bool):
+    """Build a supervisor/agent loop that only exercises state updates."""
+    workflow = StateGraph(CopyingState if copying else AgentState)
+
+    def supervisor(state):
+        next_agent = "finish" if len(state["messages"]) > hops else "agent"
+        if copying:
+            return {"messages": state["messages"], "next": next_agent, "task_result": state["task_result"]}
+        return {"next": next_agent}
+
+    def agent(state):
+        name = f"Agent{len(state['messages']) % 10}"
+        message = HumanMessage(content=f"{name} result: {RESULT_TEXT}", name=name)
+        if copying:
+            return {
+                "messages": state["messages"] + [message],
+                "next": "",
+                "task_result": {**state["task_result"], name: RESULT_TEXT},
+            }
+        return {"messages": [message], "next": "", "task_result": {name: RESULT_TEXT}}
+
+    workflow.add_node("supervisor", supervisor)
+    workflow.add_node("agent", agent)
+    workflow.add_edge("agent", "supervisor")
+    workflow.set_entry_point("supervisor")
+    workflow.add_conditional_edges(
+        "supervisor", lambda state: state["next"], {"agent": "agent", "finish": END}
+    )
+    return workflow.compile()
+
+
+def profile(fn: Callable[[], None]) -> tuple[float, int]:
+    """Return wall time and peak traced memory in KiB for ``fn``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak // 1024
+
+
+def time_writes(writes: int, batched: bool) -> float:
+    """Time ``writes`` one-message writes through a messages reducer."""
+    fresh = [HumanMessage(content=f"Agent result {i}", id=str(i)) for i in range(writes)]
+    messages = []
+    start = time.perf_counter()
+    for message in fresh:
+        if batched:
+            messages = append_message_batches(messages, [[message]])
+        else:
+            messages = append_messages(messages, [message])
+    return time.perf_counter() - start
+
+
+def main():
+    config = {"recursion_limit": max(HOPS) * 2 + 10}
+    initial = {"messages": [HumanMessage(content="task")], "next": "", "task_result": {}}
+
+    print("State handling only")
+    print(f"{'hops':>5} {'copy s':>8} {'copy KiB':>9} {'delta s':>8} {'delta KiB':>10}")
+    for hops in HOPS:
+        copy_time, copy_peak = profile(
+            lambda: build_state_graph(hops, copying=True).invoke(dict(initial), config)
+        )
+        delta_time, delta_peak = profile(
+            lambda: build_state_graph(hops, copying=False).invoke(dict(initial), config)
+        )
+        print(f"{hops:>5} {copy_time:>8.3f} {copy_peak:>9} {delta_time:>8.3f} {delta_peak:>10}")
+
+    print("\nAgentSystem end to end")
+    print(f"{'hops':>5} {'seconds':>8} {'peak KiB':>9}")
+    for hops in HOPS:
+        llm = ScriptedChatModel(responder=sequential_router(hops=hops))
+        system = AgentSystem(llm, [EchoAgent(llm)])
+        elapsed, peak = profile(lambda: system.workflow.invoke(system._initial_state("task"), config))
+        print(f"{hops:>5} {elapsed:>8.3f} {peak:>9}")
+
+    print("\nMessages reducer only")
+    print(f"{'writes':>6} {'add_messages s':>15} {'batches s':>10}")
+    for writes in REDUCER_WRITES:
+        add_time = time_writes(writes, batched=False)
+        batched_time = time_writes(writes, batched=True)
+        print(f"{writes:>6} {add_time:>15.3f} {batched_time:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark sub-system construction cost versus SupervisorAgent nesting depth.
+
+Compares the cached sub-system against the previous behaviour of building a
+fresh ``AgentSystem`` on every ``SupervisorAgent.invoke``.
+
+Usage:
+    python benchmarks/bench_supervisor_cache.py
+"""
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from langgroup import AgentSystem, BaseAgent, SupervisorAgent
+from langgroup.testing import ScriptedChatModel, sequential_router
+
+RUNS = 20
+MAX_DEPTH = 4
+
+
+class EchoAgent(BaseAgent):
+    """Leaf agent without tools."""
+
+    @property
+    def description(self) -> str:
+        return "Echoes its input."
+
+    @property
+    def tools(self) -> List[Callable]:
+        return []
+
+    @property
+    def system_prompt(self) -> str:
+        return "Echo the request."
+
+
+class RebuildingSupervisorAgent(SupervisorAgent):
+    """Supervisor that rebuilds its sub-system on every call (old behaviour)."""
+
+    @property
+    def sub_system(self):
+        return AgentSystem(self.llm, self.available_agents)
+
+
+def build_system(llm, depth: int, supervisor_cls) -> AgentSystem:
+    """Build a chain of ``depth`` nested teams over a single leaf agent."""
+    agent = EchoAgent(llm)
+    for level in range(depth):
+        agent = supervisor_cls(llm, [agent], name=f"Team{level}")
+    return AgentSystem(llm, [agent])
+
+
+def count_constructions(fn: Callable[[], None]) -> int:
+    """Count ``AgentSystem`` constructions performed by ``fn``."""
+    original_init = AgentSystem.__init__
+    count = 0
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal count
+        count += 1
+        original_init(self, *args, **kwargs)
+
+    AgentSystem.__init__ = counting_init
+    try:
+        fn()
+    finally:
+        AgentSystem.__init__ = original_init
+    return count
+
+
+def measure(depth: int, supervisor_cls) -> tuple[float, int]:
+    """Return mean seconds per run and sub-system builds for ``RUNS`` runs."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    system = build_system(llm, depth, supervisor_cls)
+
+    def run_all():
+        for _ in range(RUNS):
+            system.run("benchmark task")
+
+    start = time.perf_counter()
+    builds = count_constructions(run_all)
+    return (time.perf_counter() - start) / RUNS, builds
+
+
+def main():
+    print(f"{'depth':>5} {'rebuild ms/run':>15} {'builds':>7} {'cached ms/run':>14} {'builds':>7}")
+    for depth in range(1, MAX_DEPTH + 1):
+        before, before_builds = measure(depth, RebuildingSupervisorAgent)
+        after, after_builds = measure(depth, SupervisorAgent)
+        print(
+            f"{depth:>5} {before * 1000:>15.2f} {before_builds:>7} "
+            f"{after * 1000:>14.2f} {after_builds:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
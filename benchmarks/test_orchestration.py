@@ -0,0 +1,185 @@
+"""Offline pytest-benchmark suite for orchestration overhead.
+
+Every model call is served by ``ScriptedChatModel``, so these benchmarks
+measure only framework cost: graph construction, per-hop latency, memory per
+task and nested-supervisor overhead.
+
+Usage:
+    pytest benchmarks/ --benchmark-only
+    pytest benchmarks/ --benchmark-autosave   # then --benchmark-compare
+"""
+import asyncio
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, SupervisorAgent, TraceRecorder, TraceReplay
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import (
+    ResearchAgent,
+    AnalysisAgent,
+    WritingAgent,
+    MathAgent,
+)
+
+AGENT_CLASSES = [ResearchAgent, AnalysisAgent, WritingAgent, MathAgent]
+TASK = "Research compound interest, calculate 1000 * (1.05)^3 and write a summary"
+
+
+def make_llm(hops: int = 1) -> ScriptedChatModel:
+    """Create an offline model that routes ``hops`` times, then finishes."""
+    return ScriptedChatModel(responder=sequential_router(hops=hops))
+
+
+def make_agents(llm, count: int) -> list:
+    """Create ``count`` example agents, cycling through the example classes."""
+    agents = []
+    for i in range(count):
+        agent_cls = AGENT_CLASSES[i % len(AGENT_CLASSES)]
+        suffix = "" if i < len(AGENT_CLASSES) else str(i // len(AGENT_CLASSES))
+        agents.append(agent_cls(llm, name=f"{agent_cls.__name__}{suffix}"))
+    return agents
+
+
+def make_hierarchy(llm, depth: int) -> list:
+    """Create two teams per level, ``depth`` levels deep, over the example agents."""
+    if depth == 0:
+        return make_agents(llm, len(AGENT_CLASSES))
+    return [
+        SupervisorAgent(llm, make_hierarchy(llm, depth - 1), name=f"Team{depth}A"),
+        SupervisorAgent(llm, make_hierarchy(llm, depth - 1), name=f"Team{depth}B"),
+    ]
+
+
+def peak_memory_kib(fn) -> int:
+    """Return the peak traced memory of ``fn`` in KiB."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def test_import_time(benchmark):
+    """Cold ``import langgroup`` in a fresh interpreter, including interpreter startup."""
+    command = [sys.executable, "-c", "import sys; sys.path.insert(0, 'src'); import langgroup"]
+    benchmark.pedantic(subprocess.run, args=(command,), kwargs={"check": True}, rounds=5)
+
+
+@pytest.mark.parametrize("num_agents", [16, 64])
+def test_construct_agents(benchmark, num_agents):
+    """Agent construction time; agent graphs are compiled on first use."""
+    llm = make_llm()
+    benchmark(make_agents, llm, num_agents)
+
+
+@pytest.mark.parametrize("num_agents", [4, 16, 64])
+def test_build_flat_system(benchmark, num_agents):
+    """Graph build time for a flat team."""
+    llm = make_llm()
+    agents = make_agents(llm, num_agents)
+    benchmark(AgentSystem, llm, agents)
+
+
+@pytest.mark.parametrize("num_agents", [64, 256])
+def test_build_supervisor_prompt(benchmark, num_agents):
+    """Per-hop supervisor prompt build cost for a large team of nested teams."""
+    llm = make_llm()
+    teams = [
+        SupervisorAgent(llm, make_agents(llm, 8), name=f"Team{i}") for i in range(num_agents // 8)
+    ]
+    system = AgentSystem(llm, teams)
+    state = {"messages": system._initial_state(TASK)["messages"], "task_result": {}}
+
+    prompt = benchmark(system.supervisor._build_prompt, state)
+
+    assert "- Team0: " in prompt[0].content
+
+
+@pytest.mark.parametrize("hops", [1, 5, 20])
+def test_flat_run(benchmark, hops):
+    """End-to-end run cost and per-hop latency for a flat team."""
+    llm = make_llm(hops=hops)
+    system = AgentSystem(llm, make_agents(llm, len(AGENT_CLASSES)))
+
+    result = benchmark(system.run, TASK)
+
+    assert len(result["messages"]) == hops + 1
+    benchmark.extra_info["hops"] = hops
+    if benchmark.stats:  # None under --benchmark-disable
+        benchmark.extra_info["ms_per_hop"] = benchmark.stats.stats.mean * 1000 / hops
+    benchmark.extra_info["peak_kib"] = peak_memory_kib(lambda: system.run(TASK))
+
+
+@pytest.mark.parametrize("hops", [5, 20])
+def test_planned_run(benchmark, hops):
+    """Run cost in planning mode: one supervisor call, then a chain of ``hops`` steps."""
+    llm = make_llm(hops=hops)
+    system = AgentSystem(llm, make_agents(llm, len(AGENT_CLASSES)), planning=True)
+
+    result = benchmark(system.run, TASK)
+
+    assert len(result["messages"]) == hops + 1
+    if benchmark.stats:
+        benchmark.extra_info["ms_per_hop"] = benchmark.stats.stats.mean * 1000 / hops
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_hierarchical_run(benchmark, depth):
+    """Run cost of nested SupervisorAgent teams by depth."""
+    llm = make_llm()
+    system = AgentSystem(llm, make_hierarchy(llm, depth))
+
+    result = benchmark(system.run, TASK)
+
+    assert "Team" in next(iter(result["task_result"]))
+    benchmark.extra_info["peak_kib"] = peak_memory_kib(lambda: system.run(TASK))
+
+
+def test_replayed_run(benchmark, tmp_path):
+    """Run cost of replaying a recorded two-level run from its trace."""
+    llm = make_llm()
+    path = tmp_path / "trace.jsonl"
+    expected = AgentSystem(llm, make_hierarchy(llm, 2), trace=TraceRecorder(path)).run(TASK)
+    system = AgentSystem(llm, make_hierarchy(llm, 2), replay=TraceReplay(path))
+
+    result = benchmark(system.run, TASK)
+
+    assert result["task_result"] == expected["task_result"]
+    assert llm.call_count == len([line for line in path.read_text().splitlines() if '"llm_call"' in line])
+
+
+def test_parallel_fan_out(benchmark):
+    """Run cost when every agent is dispatched in a single parallel step."""
+    llm = make_llm()
+    system = AgentSystem(llm, make_agents(llm, 8), parallel=True)
+
+    result = benchmark(system.run, TASK)
+
+    assert len(result["task_result"]) == 8
+
+
+@pytest.mark.parametrize("num_tasks", [50])
+def test_async_batch_throughput(benchmark, num_tasks):
+    """Throughput of arun_many over many small tasks on one event loop."""
+    llm = make_llm()
+    system = AgentSystem(llm, make_agents(llm, len(AGENT_CLASSES)))
+
+    async def run_all():
+        return [outcome async for outcome in system.arun_many(
+            (f"{TASK} #{i}" for i in range(num_tasks)), max_concurrency=16
+        )]
+
+    outcomes = benchmark(lambda: asyncio.run(run_all()))
+
+    assert all(outcome.ok for outcome in outcomes)
+    if benchmark.stats:
+        benchmark.extra_info["tasks_per_second"] = num_tasks / benchmark.stats.stats.mean
@@ -1,6 +1,7 @@
 """Example agent implementations demonstrating how to use the langteam framework."""
 
 from typing import List, Callable
+from langgroup import cacheable
 from langgroup.agents import BaseAgent
 
 
@@ -19,6 +20,7 @@ def writing_tool(content: str) -> str:
     return f"Formatted content: {content}\n\nThis has been professionally formatted and structured."
 
 
+@cacheable
 def calculation_tool(expression: str) -> str:
     """Perform mathematical calculations."""
     try:
@@ -47,6 +49,11 @@ class ResearchAgent(BaseAgent):
         return """You are a research agent specializing in information gathering.
         Use the research tool to find information on any topic requested."""
 
+    @property
+    def routing_rules(self) -> List[str]:
+        """Return patterns for requests that clearly belong to this agent."""
+        return [r"\bresearch\b", r"\blook up\b", r"\bfind (out|information)\b"]
+
 
 class AnalysisAgent(BaseAgent):
     """Agent specializing in data analysis."""
@@ -67,6 +74,11 @@ class AnalysisAgent(BaseAgent):
         return """You are an analysis agent specializing in data analysis.
         Use the analysis tool to examine data and provide insights."""
 
+    @property
+    def routing_rules(self) -> List[str]:
+        """Return patterns for requests that clearly belong to this agent."""
+        return [r"\banaly[sz]\w*", r"\b(trends?|patterns?|correlations?)\b"]
+
 
 class WritingAgent(BaseAgent):
     """Agent specializing in writing and formatting content."""
@@ -87,6 +99,11 @@ class WritingAgent(BaseAgent):
         return """You are a writing agent specializing in content creation.
         Use the writing tool to format and present information clearly."""
 
+    @property
+    def routing_rules(self) -> List[str]:
+        """Return patterns for requests that clearly belong to this agent."""
+        return [r"\b(write|draft|summari[sz]e|format)\b"]
+
 
 class MathAgent(BaseAgent):
     """Agent specializing in mathematical calculations."""
@@ -106,3 +123,8 @@ class MathAgent(BaseAgent):
         """Return the system prompt for the agent."""
         return """You are a math agent specializing in calculations.
         Use the calculation tool to solve mathematical problems."""
+
+    @property
+    def routing_rules(self) -> List[str]:
+        """Return patterns for requests that clearly belong to this agent."""
+        return [r"\b(calculate|compute)\b", r"^[\d\s+\-*/().=?]+$"]
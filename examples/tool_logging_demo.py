@@ -4,6 +4,7 @@ import os
 import logging
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from langgroup import cacheable
 from langgroup.agents import BaseAgent
 from langgroup.agent_system import AgentSystem
 from typing import List, Callable
@@ -18,12 +19,14 @@ logging.basicConfig(
 )
 
 
+@cacheable
 def add_numbers(a: int, b: int) -> str:
     """Add two numbers together."""
     result = a + b
     return f"The sum of {a} and {b} is {result}"
 
 
+@cacheable
 def multiply_numbers(a: int, b: int) -> str:
     """Multiply two numbers together."""
     result = a * b
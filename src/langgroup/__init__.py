@@ -4,10 +4,121 @@ This package provides a supervisor-based architecture for coordinating
 multiple specialized AI agents to work together on complex tasks.
 """
 
-from .agent_system import AgentSystem
-from .team_supervisor import TeamSupervisor
-from .models import AgentState, RouteDecision
-from .agents import BaseAgent, SupervisorAgent
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .agent_system import AgentSystem
+    from .team_supervisor import TeamSupervisor
+    from .models import (
+        AgentState,
+        AgentTask,
+        MultiRouteDecision,
+        PlanStep,
+        RouteDecision,
+        StreamEvent,
+        TaskOutcome,
+        TaskPlan,
+    )
+    from .cache import ResponseCache, InMemoryCache, SQLiteCache, CacheStats
+    from .metrics import (
+        MetricsCollector,
+        MetricsExporter,
+        InMemoryExporter,
+        PrometheusExporter,
+        RunMetrics,
+        TeamMetrics,
+        NodeMetrics,
+    )
+    from .budget import RunBudget
+    from .tool_execution import ToolExecutor, ToolPolicy
+    from .tool_cache import cacheable
+    from .model_pool import ModelPool, ModelLimits, PriorityRateLimiter
+    from .workers import TaskQueue, SQLiteTaskQueue, QueuedTask, Worker, WorkerPool
+    from .speculation import SpeculationPredictor, TransitionPredictor
+    from .tracing import TraceRecorder, TraceReplay, TraceMismatchError, load_trace
+    from .routing import Router, RouteMatch, RuleRouter, EmbeddingRouter, TieredRouter
+    from .history import (
+        HistoryStrategy,
+        FullHistory,
+        SlidingWindowHistory,
+        ResultSummaryHistory,
+        TokenBudgetHistory,
+    )
+    from .handoff import (
+        HandoffStrategy,
+        LastMessageHandoff,
+        InstructionHandoff,
+        InstructionWithResultsHandoff,
+        FullHistoryHandoff,
+    )
+    from .compaction import ResultCompactor, TruncateCompactor, ExtractiveCompactor, LLMCompactor
+    from .agents import BaseAgent, SupervisorAgent
+
+# Public names and the submodules defining them. They are imported on first
+# access, so ``import langgroup`` does not load LangChain or LangGraph.
+_EXPORTS = {
+    "AgentSystem": ".agent_system",
+    "TeamSupervisor": ".team_supervisor",
+    "AgentState": ".models",
+    "AgentTask": ".models",
+    "MultiRouteDecision": ".models",
+    "RouteDecision": ".models",
+    "PlanStep": ".models",
+    "TaskPlan": ".models",
+    "StreamEvent": ".models",
+    "TaskOutcome": ".models",
+    "ResponseCache": ".cache",
+    "InMemoryCache": ".cache",
+    "SQLiteCache": ".cache",
+    "CacheStats": ".cache",
+    "MetricsCollector": ".metrics",
+    "MetricsExporter": ".metrics",
+    "InMemoryExporter": ".metrics",
+    "PrometheusExporter": ".metrics",
+    "RunMetrics": ".metrics",
+    "TeamMetrics": ".metrics",
+    "NodeMetrics": ".metrics",
+    "RunBudget": ".budget",
+    "ToolExecutor": ".tool_execution",
+    "ToolPolicy": ".tool_execution",
+    "cacheable": ".tool_cache",
+    "ModelPool": ".model_pool",
+    "ModelLimits": ".model_pool",
+    "PriorityRateLimiter": ".model_pool",
+    "TaskQueue": ".workers",
+    "SQLiteTaskQueue": ".workers",
+    "QueuedTask": ".workers",
+    "Worker": ".workers",
+    "WorkerPool": ".workers",
+    "SpeculationPredictor": ".speculation",
+    "TransitionPredictor": ".speculation",
+    "TraceRecorder": ".tracing",
+    "TraceReplay": ".tracing",
+    "TraceMismatchError": ".tracing",
+    "load_trace": ".tracing",
+    "Router": ".routing",
+    "RouteMatch": ".routing",
+    "RuleRouter": ".routing",
+    "EmbeddingRouter": ".routing",
+    "TieredRouter": ".routing",
+    "HistoryStrategy": ".history",
+    "FullHistory": ".history",
+    "SlidingWindowHistory": ".history",
+    "ResultSummaryHistory": ".history",
+    "TokenBudgetHistory": ".history",
+    "HandoffStrategy": ".handoff",
+    "LastMessageHandoff": ".handoff",
+    "InstructionHandoff": ".handoff",
+    "InstructionWithResultsHandoff": ".handoff",
+    "FullHistoryHandoff": ".handoff",
+    "ResultCompactor": ".compaction",
+    "TruncateCompactor": ".compaction",
+    "ExtractiveCompactor": ".compaction",
+    "LLMCompactor": ".compaction",
+    "BaseAgent": ".agents",
+    "SupervisorAgent": ".agents",
+}
 
 __version__ = "0.2.0"
 __all__ = [
@@ -15,6 +126,73 @@ __all__ = [
     "TeamSupervisor",
     "AgentState",
     "RouteDecision",
+    "AgentTask",
+    "MultiRouteDecision",
+    "PlanStep",
+    "TaskPlan",
+    "TaskOutcome",
+    "StreamEvent",
     "BaseAgent",
     "SupervisorAgent",
+    "ResponseCache",
+    "InMemoryCache",
+    "SQLiteCache",
+    "CacheStats",
+    "MetricsCollector",
+    "MetricsExporter",
+    "InMemoryExporter",
+    "PrometheusExporter",
+    "RunMetrics",
+    "TeamMetrics",
+    "NodeMetrics",
+    "RunBudget",
+    "ToolExecutor",
+    "ToolPolicy",
+    "cacheable",
+    "ModelPool",
+    "ModelLimits",
+    "PriorityRateLimiter",
+    "TaskQueue",
+    "SQLiteTaskQueue",
+    "QueuedTask",
+    "Worker",
+    "WorkerPool",
+    "SpeculationPredictor",
+    "TransitionPredictor",
+    "TraceRecorder",
+    "TraceReplay",
+    "TraceMismatchError",
+    "load_trace",
+    "Router",
+    "RouteMatch",
+    "RuleRouter",
+    "EmbeddingRouter",
+    "TieredRouter",
+    "HistoryStrategy",
+    "FullHistory",
+    "SlidingWindowHistory",
+    "ResultSummaryHistory",
+    "TokenBudgetHistory",
+    "HandoffStrategy",
+    "LastMessageHandoff",
+    "InstructionHandoff",
+    "InstructionWithResultsHandoff",
+    "FullHistoryHandoff",
+    "ResultCompactor",
+    "TruncateCompactor",
+    "ExtractiveCompactor",
+    "LLMCompactor",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -1,64 +1,620 @@
 """Agent system for managing and coordinating a team of specialized agents."""
+import asyncio
 import logging
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Union
 
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import merge_configs
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.errors import GraphBubbleUp
 from langgraph.graph import StateGraph, END
-from .models import AgentState
+from langgraph.types import Send
+from .batching import RequestBatcher, arun_with_batcher, run_with_batcher
+from .budget import BUDGET_CONFIG_KEY, PLAN_FAILED, UNKNOWN_AGENT, BudgetTracker, RunBudget
+from .cache import ResponseCache, make_cache_key, model_identity
+from .handoff import HandoffStrategy, LastMessageHandoff
+from .history import HistoryStrategy
+from .metrics import METRICS_CONFIG_KEY, MetricsCollector, MetricsRecorder
+from .routing import TieredRouter
+from .speculation import (
+    SPECULATION_CONFIG_KEY,
+    Speculation,
+    SpeculationPredictor,
+    SpeculationStore,
+    TokenCounter,
+    speculation_executor,
+)
+from .model_pool import ModelPool
+from .models import AgentState, PlanStep, StreamEvent, TaskOutcome
+from .streaming import (
+    AGENT_END,
+    AGENT_START,
+    SUPERVISOR_DECISION,
+    TRACE_CONFIG_KEY,
+    StreamTranslator,
+    emit,
+)
 from .team_supervisor import TeamSupervisor
+from .tool_cache import TOOL_CACHE_CONFIG_KEY
+from .tool_execution import TOOL_EXECUTOR_CONFIG_KEY, ToolExecutor
+from .tracing import RunTracer, TraceRecorder, TraceReplay
 
 logger = logging.getLogger(__name__)
 
+STREAM_MODES = ["custom", "messages", "updates", "values"]
+
+# An agent whose reply starts with this asks the supervisor for a new plan
+REPLAN_SIGNAL = "[REPLAN]"
+
 class AgentSystem:
     """Multiagent system with supervisor coordination."""
     
-    def __init__(self, llm, agents):
-        """Initialize the agent system."""
+    def __init__(
+        self,
+        llm,
+        agents,
+        history_strategy: Optional[HistoryStrategy] = None,
+        parallel: bool = False,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsCollector] = None,
+        router: Optional[TieredRouter] = None,
+        budget: Optional[RunBudget] = None,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        tool_executor: Optional[ToolExecutor] = None,
+        tool_cache: Optional[ResponseCache] = None,
+        model_pool: Optional[ModelPool] = None,
+        handoff: Optional[HandoffStrategy] = None,
+        planning: bool = False,
+        max_replans: int = 2,
+        speculation: Optional[SpeculationPredictor] = None,
+        trace: Optional[TraceRecorder] = None,
+        replay: Optional[TraceReplay] = None,
+        reuse_results: bool = False,
+    ):
+        """Initialize the agent system.
+
+        Args:
+            llm: The language model used by the supervisor
+            agents: The agents the supervisor can route to
+            history_strategy: Strategy for rendering the supervisor's view of
+                the conversation. Defaults to the full history.
+            parallel: If True, the supervisor may dispatch several independent
+                agents at once, each with its own subtask. Their results are
+                merged before the next supervisor turn.
+            cache: Optional response cache for supervisor decisions and agent
+                results, keyed on the prompt, model and agent name
+            metrics: Optional collector for per-run latency, token, tool and
+                hop metrics. Each run's RunMetrics is returned under
+                ``result["metrics"]`` and passed to the collector's exporters.
+            router: Optional tiered router that decides obvious routes from
+                agent rules and description similarity, consulting the
+                supervisor LLM only when no tier is confident. Not used for
+                parallel routing.
+            budget: Default limits for each run. A run that reaches a limit
+                ends gracefully with the results gathered so far and its
+                ``stop_reason`` set. Nested teams inherit the budget of the
+                run they belong to.
+            checkpointer: Optional LangGraph checkpointer, e.g. ``InMemorySaver``
+                or ``SqliteSaver``, that saves each run after every step so it
+                can be resumed with ``resume``. Nested teams checkpoint under
+                the same thread, namespaced by their place in the graph.
+            tool_executor: Thread and process pools for agent tools with a
+                pooled ToolPolicy. Nested teams without one of their own share
+                it. Defaults to a process-wide executor with default pool sizes.
+            tool_cache: Cache for the results of tools marked ``cacheable``,
+                e.g. an ``InMemoryCache`` or a ``SQLiteCache`` shared between
+                processes. Nested teams without one of their own share it.
+            model_pool: Optional pool of shared, rate-limited model clients.
+                The supervisor and every agent, including those of nested
+                teams, are switched to the pool's copy of their model, so
+                their calls share per-model request and token limits, with
+                routing calls served before agent calls.
+            handoff: Strategy for building each agent's request from the
+                supervisor's instruction, prior results and the conversation.
+                Defaults to the last message, or the subtask of a parallel route.
+                Teams with a compactor need a handoff that uses the
+                instruction unless ``parallel`` or ``planning`` is set.
+            planning: If True, the supervisor plans the whole task in one call
+                as a graph of agent steps with dependencies. The steps are
+                then scheduled without further supervisor calls, independent
+                steps running concurrently, and each step receives the
+                results of the steps it depends on. The supervisor plans
+                again only when a step fails or starts its reply with
+                ``REPLAN_SIGNAL``.
+            max_replans: New plans allowed per run in planning mode before the
+                run stops with ``stop_reason`` "plan_failed"
+            speculation: Optional predictor, e.g. a ``TransitionPredictor``,
+                for single-agent routing. The predicted agent is started
+                while the supervisor decides; its result is used if the
+                decision and the agent's request match the prediction and
+                discarded otherwise, with waste counted in the run metrics.
+                Agents whose ``reusable`` property is False are never started
+                speculatively. The request must not depend on the
+                supervisor's instruction, so the handoff's
+                ``uses_instruction`` must be False.
+            trace: Optional recorder appending every run's supervisor
+                decisions, agent inputs and outputs, model calls and tool
+                calls, with timings, to a JSONL trace. Nested teams write to
+                the trace of the run they belong to.
+            replay: Optional replay of a recorded trace. The supervisor and
+                every agent, including those of nested teams, answer from the
+                trace instead of their models, and recorded tool results are
+                returned without running the tools.
+            reuse_results: If True, an agent routed to again with a request
+                it already answered within the run, even with other requests
+                in between, is not run again; its earlier result is
+                returned, and the supervisor is told it was reused. Agents
+                whose ``reusable`` property is False always run. Use
+                ``cache`` to also reuse results across runs.
+        """
+        handoff = handoff or LastMessageHandoff()
+        if speculation is not None and handoff.uses_instruction:
+            raise ValueError(
+                "speculation needs a handoff that does not use the supervisor's instruction, "
+                "such as LastMessageHandoff"
+            )
+        compacting = [agent.name for agent in agents if getattr(agent, "compactor", None) is not None]
+        if compacting and not (handoff.uses_instruction or parallel or planning):
+            # Full results are fetched with a request naming their reference,
+            # which only reaches a team through an instruction or a subtask
+            raise ValueError(
+                f"Teams with a compactor ({', '.join(compacting)}) need a handoff that "
+                "passes on the supervisor's instruction, such as InstructionHandoff"
+            )
+        for pool in (model_pool, replay):
+            if pool is not None:
+                llm = pool.get(llm)
+                for agent in agents:
+                    agent.use_model_pool(pool)
         self.llm = llm
         self.agents = agents
-        self.supervisor = TeamSupervisor(llm, agents)
+        self.history_strategy = history_strategy
+        self.parallel = parallel
+        self.cache = cache
+        self.metrics = metrics
+        self.router = router
+        self.budget = budget
+        self.checkpointer = checkpointer
+        self.tool_executor = tool_executor
+        self.tool_cache = tool_cache
+        self.model_pool = model_pool
+        self.handoff = handoff
+        self.planning = planning
+        self.max_replans = max_replans
+        self.speculation = speculation
+        self.trace = trace
+        self.replay = replay
+        self.reuse_results = reuse_results
+        self.supervisor = TeamSupervisor(
+            llm,
+            agents,
+            history_strategy=history_strategy,
+            cache=cache,
+            router=router,
+            instructions=self.handoff.uses_instruction,
+        )
         self.workflow = self._build_workflow()
 
-    def _supervisor_node(self, state: AgentState) -> AgentState:
+    def _supervisor_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
         """Supervisor node that delegates to the Supervisor class."""
-        return self.supervisor.decide_next_agent(state)
+        tracker = self._budget_tracker(config)
+        stop_reason = tracker.check(state) if tracker is not None else None
+        if stop_reason:
+            return self._stop(stop_reason)
+        if self.planning:
+            return self._plan_node(state, tracker)
+        if self.parallel:
+            return self._check_routes(state, self.supervisor.decide_next_agents(state), tracker)
+        speculation = self._speculate(state, config)
+        try:
+            update = self._check_decision(state, self.supervisor.decide_next_agent(state), tracker)
+        except BaseException:
+            self._discard_speculation(speculation, config)
+            raise
+        self._settle_speculation(speculation, state, update, config)
+        return update
+
+    async def _asupervisor_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Async supervisor node that delegates to the Supervisor class."""
+        tracker = self._budget_tracker(config)
+        stop_reason = tracker.check(state) if tracker is not None else None
+        if stop_reason:
+            return self._stop(stop_reason)
+        if self.planning:
+            return await self._aplan_node(state, tracker)
+        if self.parallel:
+            return self._check_routes(state, await self.supervisor.adecide_next_agents(state), tracker)
+        speculation = self._speculate(state, config, run_async=True)
+        try:
+            update = self._check_decision(state, await self.supervisor.adecide_next_agent(state), tracker)
+        except BaseException:
+            self._discard_speculation(speculation, config)
+            raise
+        self._settle_speculation(speculation, state, update, config)
+        return update
+
+    def _speculate(
+        self, state: AgentState, config: RunnableConfig, run_async: bool = False
+    ) -> Optional[Speculation]:
+        """Start the predicted next agent, if any, before the supervisor decides.
+
+        The handoff does not use the supervisor's instruction, so the request
+        is known before the decision. The call runs outside the graph with the run's budget
+        and tool services, so its tokens are not streamed.
+        """
+        configurable = (config or {}).get("configurable") or {}
+        store = configurable.get(SPECULATION_CONFIG_KEY)
+        if self.speculation is None or store is None:
+            return None
+        agent_name = self.speculation.predict(state)
+        agent = self._agents_by_name.get(agent_name)
+        # Agents with side effects must not run on a prediction that may be discarded
+        if agent is None or not getattr(agent, "reusable", True):
+            return None
+        agent_input = self._agent_input({**state, "next": agent_name, "instruction": "", "context_agents": []})
+        counter = TokenCounter()
+        tracker = self._budget_tracker(config)
+        tracer = configurable.get(TRACE_CONFIG_KEY)
+        speculative_config = {
+            "callbacks": [counter] + [
+                handler for handler in (tracker, tracer) if handler is not None
+            ],
+            "configurable": {
+                key: configurable[key]
+                for key in (BUDGET_CONFIG_KEY, TOOL_EXECUTOR_CONFIG_KEY, TOOL_CACHE_CONFIG_KEY)
+                if key in configurable
+            },
+        }
+        inputs = {"messages": [("human", agent_input)]}
+        if run_async:
+            future = asyncio.ensure_future(agent.ainvoke(inputs, config=speculative_config))
+        else:
+            future = speculation_executor().submit(agent.invoke, inputs, config=speculative_config)
+        logger.info(f"🔮 Speculatively starting {agent_name}")
+        speculation = Speculation(agent_name, agent_input, future, counter)
+        store.add(speculation)
+        return speculation
+
+    def _settle_speculation(
+        self,
+        speculation: Optional[Speculation],
+        state: AgentState,
+        update: AgentState,
+        config: RunnableConfig,
+    ) -> None:
+        """Keep a speculative call for its agent node if the decision matches, else discard it."""
+        if self.speculation is not None and "stop_reason" not in update:
+            self.speculation.observe(state, update["next"])
+        if speculation is None:
+            return
+        if (
+            update["next"] == speculation.agent_name
+            and self._agent_input({**state, **update}) == speculation.agent_input
+        ):
+            logger.info(f"🔮 Speculation on {speculation.agent_name} matches the decision")
+            return
+        logger.info(f"🗑️ Discarding speculative {speculation.agent_name} call")
+        self._discard_speculation(speculation, config)
+
+    def _discard_speculation(self, speculation: Optional[Speculation], config: RunnableConfig) -> None:
+        """Cancel a speculative call and record it as wasted."""
+        if speculation is None:
+            return
+        configurable = (config or {}).get("configurable") or {}
+        configurable[SPECULATION_CONFIG_KEY].pop(speculation.agent_name, speculation.agent_input)
+        speculation.cancel()
+        self._record_speculation(speculation, config, hit=False)
+
+    def _adopt_speculation(
+        self, config: RunnableConfig, agent_name: str, agent_input: str
+    ) -> Optional[Speculation]:
+        """Return the speculative call started for this agent request, if any."""
+        store = ((config or {}).get("configurable") or {}).get(SPECULATION_CONFIG_KEY)
+        if store is None:
+            return None
+        speculation = store.pop(agent_name, agent_input)
+        if speculation is not None:
+            logger.info(f"🔮 Using speculative result for {agent_name}")
+        return speculation
+
+    @staticmethod
+    def _record_speculation(speculation: Speculation, config: RunnableConfig, hit: bool) -> None:
+        """Record a settled speculative call in the run's metrics, when metrics are on."""
+        recorder = ((config or {}).get("configurable") or {}).get(METRICS_CONFIG_KEY)
+        if recorder is None:
+            return
+        counter = speculation.counter
+        recorder.record_speculation(
+            (config or {}).get("metadata"),
+            hit,
+            llm_calls=counter.llm_calls,
+            prompt_tokens=counter.prompt_tokens,
+            completion_tokens=counter.completion_tokens,
+            elapsed=time.perf_counter() - speculation.started,
+        )
+
+    def _plan_node(self, state: AgentState, tracker: Optional[BudgetTracker]) -> AgentState:
+        """Make or repair the plan if needed, then dispatch the steps that are ready."""
+        update = {}
+        feedback = self._plan_feedback(state) if state.get("plan") else ""
+        while feedback is not None:
+            if state.get("plan") and state.get("replans", 0) >= self.max_replans:
+                return self._stop(PLAN_FAILED)
+            update = self.supervisor.plan(state, feedback)
+            state = {**state, **update}
+            feedback = self._plan_feedback(state)
+        return {**update, **self._schedule(state, tracker)}
+
+    async def _aplan_node(self, state: AgentState, tracker: Optional[BudgetTracker]) -> AgentState:
+        """Asynchronously make or repair the plan if needed, then dispatch the ready steps."""
+        update = {}
+        feedback = self._plan_feedback(state) if state.get("plan") else ""
+        while feedback is not None:
+            if state.get("plan") and state.get("replans", 0) >= self.max_replans:
+                return self._stop(PLAN_FAILED)
+            update = await self.supervisor.aplan(state, feedback)
+            state = {**state, **update}
+            feedback = self._plan_feedback(state)
+        return {**update, **self._schedule(state, tracker)}
+
+    def _plan_feedback(self, state: AgentState) -> Optional[str]:
+        """Return why the current plan cannot be completed, or None if it can."""
+        results = state.get("step_results") or {}
+        failed = state.get("failed_steps") or {}
+        for step in state["plan"]:
+            if step.agent not in self.agent_name_map:
+                return f"there is no agent named {step.agent}."
+            if step.id in failed:
+                return f'the {step.agent} step "{step.task}" failed: {failed[step.id]}'
+            if str(results.get(step.id, "")).lstrip().startswith(REPLAN_SIGNAL):
+                return f'the {step.agent} step "{step.task}" asked for a new plan: {results[step.id]}'
+        pending = [step for step in state["plan"] if step.id not in results]
+        if pending and not self._ready_steps(pending, results):
+            return "the remaining steps depend on each other in a cycle."
+        return None
+
+    @staticmethod
+    def _ready_steps(pending: list[PlanStep], results: dict) -> list[PlanStep]:
+        """Return the pending steps whose dependencies have all completed."""
+        return [step for step in pending if all(dep in results for dep in step.depends_on)]
+
+    def _schedule(self, state: AgentState, tracker: Optional[BudgetTracker]) -> AgentState:
+        """Dispatch the plan's ready steps, or finish when every step has completed."""
+        results = state.get("step_results") or {}
+        pending = [step for step in state["plan"] if step.id not in results]
+        if not pending:
+            logger.info("🏁 All planned steps completed")
+            return {"next": "finish", "routes": []}
+        steps = {step.id: step for step in state["plan"]}
+        routes = [
+            step.model_copy(update={"task": self._step_task(step, steps, results)})
+            for step in self._ready_steps(pending, results)
+        ]
+        logger.info(f"▶️ Running steps: {', '.join(f'{step.id} {step.agent}' for step in routes)}")
+        update = {"next": ", ".join(step.agent for step in routes), "routes": routes}
+        return self._check_routes(state, update, tracker)
+
+    @staticmethod
+    def _step_task(step: PlanStep, steps: dict[str, PlanStep], results: dict) -> str:
+        """Build a step's request from its subtask and the results of the steps it depends on."""
+        task = step.task
+        if step.depends_on:
+            inputs = "\n".join(f"- {steps[dep].agent}: {results[dep]}" for dep in step.depends_on)
+            task += f"\n\nResults this step builds on:\n{inputs}"
+        return task + f"\n\nIf this step cannot be done as described, start your reply with {REPLAN_SIGNAL} and the reason."
+
+    @staticmethod
+    def _budget_tracker(config: Optional[RunnableConfig]) -> Optional[BudgetTracker]:
+        """Return the budget tracker of the current run, if it has a budget."""
+        return ((config or {}).get("configurable") or {}).get(BUDGET_CONFIG_KEY)
+
+    def _check_decision(
+        self, state: AgentState, update: AgentState, tracker: Optional[BudgetTracker]
+    ) -> AgentState:
+        """Stop instead of following a decision for an unknown or stuck agent."""
+        next_agent = update["next"]
+        if next_agent == "finish":
+            return update
+        if next_agent not in self.agent_name_map:
+            logger.warning(f"⚠️ Supervisor chose unknown agent: {next_agent}")
+            return self._stop(UNKNOWN_AGENT)
+        stop_reason = tracker.check_repeat(state, next_agent) if tracker is not None else None
+        if stop_reason:
+            return self._stop(stop_reason)
+        return update
+
+    def _check_routes(
+        self, state: AgentState, update: AgentState, tracker: Optional[BudgetTracker]
+    ) -> AgentState:
+        """Drop parallel routes to unknown agents or beyond the hops left in the budget.
+
+        A decision whose routes all name unknown agents stops the run, as a
+        single-route decision for an unknown agent does.
+        """
+        routes = update["routes"]
+        for route in routes:
+            if route.agent not in self.agent_name_map:
+                logger.warning(f"⚠️ Supervisor chose unknown agent: {route.agent}")
+        update["routes"] = [route for route in routes if route.agent in self.agent_name_map]
+        if routes and not update["routes"]:
+            return {**self._stop(UNKNOWN_AGENT), "routes": []}
+        remaining = tracker.remaining_hops(state) if tracker is not None else None
+        if remaining is not None and len(update["routes"]) > remaining:
+            logger.warning(f"⚠️ Hop budget allows only {remaining} of {len(update['routes'])} routes")
+            update["routes"] = update["routes"][:remaining]
+        return update
+
+    def _stop(self, stop_reason: str) -> AgentState:
+        """End the run early, keeping the results gathered so far."""
+        logger.warning(f"⚠️ Stopping run early: {stop_reason}")
+        emit(SUPERVISOR_DECISION, next="finish", reasoning=f"Stopped early: {stop_reason}", stop_reason=stop_reason)
+        return {"next": "finish", "stop_reason": stop_reason}
 
     def _agent_node(self, agent, agent_name: str):
         """Create a node for a specific agent."""
-        def node(state: AgentState) -> AgentState:
-            messages = state["messages"]
-            last_message = messages[-1].content if messages else ""
-            
+        def node(state: AgentState, config: RunnableConfig) -> AgentState:
+            agent_input = self._agent_input(state)
+            emit(AGENT_START, agent_name, input=agent_input)
+            key = self._agent_cache_key(agent, agent_input)
+            speculation = self._adopt_speculation(config, agent_name, agent_input)
+            if speculation is None:
+                reused = self._reused_response(state, agent, agent_input)
+                if reused is not None:
+                    emit(AGENT_END, agent_name, output=reused, cached=True, reused=True)
+                    return self._agent_update(state, agent_name, reused, agent_input, reused=True)
+            cached = self._cached_response(agent_name, key) if speculation is None else None
+            if cached is not None:
+                emit(AGENT_END, agent_name, output=cached, cached=True)
+                return self._agent_update(state, agent_name, cached, agent_input)
+
             logger.info(f"🤖 {agent_name} is working...")
-            # The new create_agent returns a compiled graph, which is invoked directly
-            result = agent.invoke({"messages": [("human", last_message)]})
-            
-            # Extract the agent's response from the result
+            try:
+                if speculation is not None:
+                    result = speculation.result()
+                    self._record_speculation(speculation, config, hit=True)
+                else:
+                    # The new create_agent returns a compiled graph, which is invoked directly.
+                    # Passing the node config nests its events under this node when streaming.
+                    result = agent.invoke({"messages": [("human", agent_input)]}, config=config)
+            except Exception as e:
+                return self._step_failure(state, agent_name, e)
             agent_response = result['messages'][-1].content
+            self._store_response(key, agent_response)
+            emit(AGENT_END, agent_name, output=agent_response, cached=False)
+            return self._agent_update(state, agent_name, agent_response, agent_input)
 
-            # Add agent's response to messages
-            new_message = HumanMessage(
-                content=f"{agent_name} result: {agent_response}",
-                name=agent_name
-            )
-            
-            return {
-                "messages": messages + [new_message],
-                "next": "",
-                "task_result": {**state.get("task_result", {}), agent_name: agent_response}
-            }
+        async def anode(state: AgentState, config: RunnableConfig) -> AgentState:
+            agent_input = self._agent_input(state)
+            emit(AGENT_START, agent_name, input=agent_input)
+            key = self._agent_cache_key(agent, agent_input)
+            speculation = self._adopt_speculation(config, agent_name, agent_input)
+            if speculation is None:
+                reused = self._reused_response(state, agent, agent_input)
+                if reused is not None:
+                    emit(AGENT_END, agent_name, output=reused, cached=True, reused=True)
+                    return self._agent_update(state, agent_name, reused, agent_input, reused=True)
+            cached = self._cached_response(agent_name, key) if speculation is None else None
+            if cached is not None:
+                emit(AGENT_END, agent_name, output=cached, cached=True)
+                return self._agent_update(state, agent_name, cached, agent_input)
+
+            logger.info(f"🤖 {agent_name} is working...")
+            try:
+                if speculation is not None:
+                    result = await speculation.aresult()
+                    self._record_speculation(speculation, config, hit=True)
+                else:
+                    result = await agent.ainvoke({"messages": [("human", agent_input)]}, config=config)
+            except Exception as e:
+                return self._step_failure(state, agent_name, e)
+            agent_response = result['messages'][-1].content
+            self._store_response(key, agent_response)
+            emit(AGENT_END, agent_name, output=agent_response, cached=False)
+            return self._agent_update(state, agent_name, agent_response, agent_input)
+
+        return RunnableLambda(node, afunc=anode, name=agent_name)
+
+    def _step_failure(self, state: AgentState, agent_name: str, error: Exception) -> AgentState:
+        """Record a failed plan step so the supervisor can plan around it.
+
+        Outside planning mode, and for LangGraph control flow such as
+        interrupts, the error is re-raised.
+        """
+        step = state.get("step")
+        if step is None or isinstance(error, GraphBubbleUp):
+            raise error
+        message = f"{type(error).__name__}: {error}"
+        logger.error(f"❌ {agent_name} failed step {step}: {message}")
+        emit(AGENT_END, agent_name, output=None, error=message, cached=False)
+        return {
+            "messages": [HumanMessage(content=f"{agent_name} failed: {message}", name=agent_name)],
+            "failed_steps": {step: message},
+        }
+
+    def _agent_input(self, state: AgentState) -> str:
+        """Return the request text for an agent node, as built by the handoff strategy."""
+        return self.handoff.render(state)
+
+    def _agent_cache_key(self, agent, agent_input: str) -> Optional[str]:
+        """Build the cache key for an agent call, or None when caching is off."""
+        if self.cache is None or not getattr(agent, "reusable", True):
+            return None
+        return make_cache_key(f"agent:{agent.name}", model_identity(agent.llm), agent_input)
+
+    def _reused_response(self, state: AgentState, agent, agent_input: str) -> Optional[str]:
+        """Return the agent's result from earlier in the run if it got the same request."""
+        if not self.reuse_results or not getattr(agent, "reusable", True):
+            return None
+        results = (state.get("agent_results") or {}).get(agent.name) or {}
+        reused = results.get(self._request_key(agent_input))
+        if reused is not None:
+            logger.info(f"♻️ Reusing {agent.name}'s result for an unchanged request")
+        return reused
+
+    @staticmethod
+    def _request_key(agent_input: str) -> str:
+        """Normalize a request so that ones differing only in whitespace match."""
+        return " ".join(agent_input.split())
+
+    def _cached_response(self, agent_name: str, key: Optional[str]) -> Optional[str]:
+        """Return a cached agent response for ``key``, if any."""
+        if key is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"💾 Using cached result for {agent_name}")
+        return cached
+
+    def _store_response(self, key: Optional[str], agent_response: str) -> None:
+        """Store an agent response under ``key`` when caching is on."""
+        if key is not None and isinstance(agent_response, str):
+            self.cache.set(key, agent_response)
+
+    def _agent_update(
+        self,
+        state: AgentState,
+        agent_name: str,
+        agent_response: str,
+        agent_input: Optional[str] = None,
+        reused: bool = False,
+    ) -> AgentState:
+        """Build the state update for an agent's response to ``agent_input``."""
+        # Add agent's response to messages
+        content = f"{agent_name} result: {agent_response}"
+        if reused:
+            content += f"\n({agent_name} was not run again: it already answered this exact request)"
+        new_message = HumanMessage(content=content, name=agent_name)
         
-        return node
+        # Reducers on AgentState append the message and merge the result.
+        # "next" is left to the supervisor so parallel branches don't collide.
+        update = {
+            "messages": [new_message],
+            "task_result": {agent_name: agent_response}
+        }
+        if state.get("step") is not None:
+            update["step_results"] = {state["step"]: agent_response}
+        if self.reuse_results and agent_input is not None:
+            update["agent_results"] = {agent_name: {self._request_key(agent_input): agent_response}}
+        return update
     
     def _build_workflow(self) -> StateGraph:
         """Build the workflow graph with supervisor and agents."""
         workflow = StateGraph(AgentState)
         
         # Add supervisor node
-        workflow.add_node("supervisor", self._supervisor_node)
+        workflow.add_node(
+            "supervisor",
+            RunnableLambda(self._supervisor_node, afunc=self._asupervisor_node, name="supervisor")
+        )
         
         # Add agent nodes and edges
         # Create a mapping of agent names to node names for routing
         self.agent_name_map = {}
+        self._agents_by_name = {agent.name: agent for agent in self.agents}
         for agent in self.agents:
             # Use agent.name for node identification
             node_name = agent.name.replace('Agent', '').lower() + '_agent'
@@ -70,10 +626,12 @@ class AgentSystem:
         workflow.set_entry_point("supervisor")
         
         # Add conditional edges from supervisor to agents
-        def route_supervisor(state: AgentState) -> str:
+        def route_supervisor(state: AgentState) -> str | list[Send]:
             next_agent = state["next"]
             if next_agent == "finish":
                 return "end"
+            if self.parallel or self.planning:
+                return self._fan_out(state)
             # Map agent name to node name
             return self.agent_name_map.get(next_agent, next_agent)
         
@@ -86,20 +644,408 @@ class AgentSystem:
             conditional_map
         )
         
-        return workflow.compile()
+        # Without a checkpointer of its own, a nested team's workflow uses the
+        # checkpointer of the run it is part of
+        return workflow.compile(checkpointer=self.checkpointer)
     
-    def run(self, task: str) -> dict:
-        """Run the multiagent system with a given task."""
-        logger.info(f"🚀 Starting multiagent system")
-        logger.info(f"📝 Task: {task}")
-        
-        initial_state = {
+    def _fan_out(self, state: AgentState) -> str | list[Send]:
+        """Dispatch each route of a parallel decision or plan to its agent node."""
+        sends = []
+        for route in state["routes"]:
+            step = route.id if isinstance(route, PlanStep) else None
+            node_name = self.agent_name_map[route.agent]
+            sends.append(Send(node_name, {**state, "subtask": route.task, "step": step}))
+        return sends or "end"
+
+    def _initial_state(self, task: str) -> AgentState:
+        """Build the initial workflow state for a task."""
+        return {
             "messages": [HumanMessage(content=task)],
             "next": "",
-            "task_result": {}
+            "task_result": {},
+            "routes": [],
+            "instruction": "",
+            "context_agents": [],
+            "plan": [],
+            "step_results": {},
+            "failed_steps": {},
+            "replans": 0,
+            "agent_results": {},
         }
+
+    def run(
+        self,
+        task: str,
+        config: Optional[RunnableConfig] = None,
+        budget: Optional[RunBudget] = None,
+        thread_id: Optional[str] = None,
+    ) -> dict:
+        """Run the multiagent system with a given task.
+
+        Args:
+            task: The task to perform
+            config: Optional LangGraph config. When called from inside another
+                workflow's node, pass that node's config so the run is nested
+                under it.
+            budget: Limits for this run, overriding the system's default budget
+            thread_id: Checkpoint thread to save the run under, so that it can
+                be resumed with ``resume``. Requires a checkpointer; one is
+                generated when omitted.
+        """
+        logger.info("🚀 Starting multiagent system")
+        logger.info(f"📝 Task: {task}")
         
-        result = self.workflow.invoke(initial_state)
-        logger.info(f"✅ Task completed!")
+        config = self._with_speculation(self._with_tools(self._with_thread(config, thread_id)))
+        config, recorder = self._start_metrics(self._with_budget(config, budget))
+        config, tracer = self._start_trace(config, task)
+        result = self.workflow.invoke(self._initial_state(task), config)
+        self._finish_metrics(recorder, result)
+        self._finish_trace(tracer, result)
+        logger.info("✅ Task completed!")
         
         return result
+
+    async def arun(
+        self,
+        task: str,
+        config: Optional[RunnableConfig] = None,
+        budget: Optional[RunBudget] = None,
+        thread_id: Optional[str] = None,
+    ) -> dict:
+        """Run the multiagent system with a given task on the event loop.
+
+        Supervisor decisions and agent calls are awaited, so many tasks can
+        share a single event loop without a thread per task.
+        """
+        logger.info("🚀 Starting multiagent system")
+        logger.info(f"📝 Task: {task}")
+
+        config = self._with_speculation(self._with_tools(self._with_thread(config, thread_id)))
+        config, recorder = self._start_metrics(self._with_budget(config, budget))
+        config, tracer = self._start_trace(config, task)
+        result = await self.workflow.ainvoke(self._initial_state(task), config)
+        self._finish_metrics(recorder, result)
+        self._finish_trace(tracer, result)
+        logger.info("✅ Task completed!")
+
+        return result
+
+    def resume(
+        self,
+        thread_id: str,
+        config: Optional[RunnableConfig] = None,
+        budget: Optional[RunBudget] = None,
+    ) -> dict:
+        """Continue a checkpointed run from its last completed step.
+
+        Steps that finished before the run stopped, including those inside
+        nested teams, are not repeated. Resuming a finished run returns its
+        final state.
+
+        Args:
+            thread_id: Checkpoint thread the run was saved under
+            config: Optional LangGraph config
+            budget: Limits for the resumed part of the run
+
+        Raises:
+            ValueError: If no checkpoint exists for ``thread_id``
+        """
+        logger.info(f"🔁 Resuming thread {thread_id}")
+        config = self._with_speculation(self._with_tools(self._with_thread(config, thread_id)))
+        if not self.workflow.get_state(config).values:
+            raise ValueError(f"No checkpoint found for thread {thread_id}")
+
+        config, recorder = self._start_metrics(self._with_budget(config, budget))
+        config, tracer = self._start_trace(config, f"resume {thread_id}")
+        result = self.workflow.invoke(None, config)
+        self._finish_metrics(recorder, result)
+        self._finish_trace(tracer, result)
+        logger.info("✅ Task completed!")
+
+        return result
+
+    async def aresume(
+        self,
+        thread_id: str,
+        config: Optional[RunnableConfig] = None,
+        budget: Optional[RunBudget] = None,
+    ) -> dict:
+        """Asynchronously continue a checkpointed run from its last completed step."""
+        logger.info(f"🔁 Resuming thread {thread_id}")
+        config = self._with_speculation(self._with_tools(self._with_thread(config, thread_id)))
+        if not (await self.workflow.aget_state(config)).values:
+            raise ValueError(f"No checkpoint found for thread {thread_id}")
+
+        config, recorder = self._start_metrics(self._with_budget(config, budget))
+        config, tracer = self._start_trace(config, f"resume {thread_id}")
+        result = await self.workflow.ainvoke(None, config)
+        self._finish_metrics(recorder, result)
+        self._finish_trace(tracer, result)
+        logger.info("✅ Task completed!")
+
+        return result
+
+    def _with_thread(
+        self, config: Optional[RunnableConfig], thread_id: Optional[str]
+    ) -> Optional[RunnableConfig]:
+        """Add the checkpoint thread of a top-level run to ``config``."""
+        if thread_id is None:
+            if self.checkpointer is None:
+                return config
+            thread_id = str(uuid.uuid4())
+            logger.info(f"💾 Checkpointing under thread {thread_id}")
+        elif self.checkpointer is None:
+            raise ValueError("thread_id requires an AgentSystem created with a checkpointer")
+        return merge_configs(config, {"configurable": {"thread_id": thread_id}})
+
+    def stream(
+        self,
+        task: str,
+        config: Optional[RunnableConfig] = None,
+        budget: Optional[RunBudget] = None,
+        thread_id: Optional[str] = None,
+    ) -> Iterator[StreamEvent]:
+        """Run the multiagent system and yield events as they happen.
+
+        Yields supervisor decisions, agent start and finish events, tool calls
+        and results, and LLM token deltas from agents, including those inside
+        nested SupervisorAgent teams (see ``StreamEvent.path``). The last
+        event has type "final" and carries the final state.
+
+        ``config``, ``budget`` and ``thread_id`` are as for ``run``.
+        """
+        logger.info("🚀 Starting multiagent system (streaming)")
+        logger.info(f"📝 Task: {task}")
+
+        translator = StreamTranslator(self.node_agent_names())
+        config = self._with_speculation(self._with_tools(self._with_thread(config, thread_id)))
+        config, recorder = self._start_metrics(self._with_budget(config, budget))
+        config, tracer = self._start_trace(config, task)
+        for namespace, mode, chunk in self.workflow.stream(
+            self._initial_state(task), config, stream_mode=STREAM_MODES, subgraphs=True
+        ):
+            yield from translator.translate(namespace, mode, chunk)
+        self._finish_metrics(recorder, translator.result)
+        self._finish_trace(tracer, translator.result)
+        logger.info("✅ Task completed!")
+        yield translator.final_event()
+
+    async def astream(
+        self,
+        task: str,
+        config: Optional[RunnableConfig] = None,
+        budget: Optional[RunBudget] = None,
+        thread_id: Optional[str] = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """Asynchronously run the multiagent system and yield events as they happen."""
+        logger.info("🚀 Starting multiagent system (streaming)")
+        logger.info(f"📝 Task: {task}")
+
+        translator = StreamTranslator(self.node_agent_names())
+        config = self._with_speculation(self._with_tools(self._with_thread(config, thread_id)))
+        config, recorder = self._start_metrics(self._with_budget(config, budget))
+        config, tracer = self._start_trace(config, task)
+        async for namespace, mode, chunk in self.workflow.astream(
+            self._initial_state(task), config, stream_mode=STREAM_MODES, subgraphs=True
+        ):
+            for event in translator.translate(namespace, mode, chunk):
+                yield event
+        self._finish_metrics(recorder, translator.result)
+        self._finish_trace(tracer, translator.result)
+        logger.info("✅ Task completed!")
+        yield translator.final_event()
+
+    def _with_budget(
+        self, config: Optional[RunnableConfig], budget: Optional[RunBudget] = None
+    ) -> Optional[RunnableConfig]:
+        """Add a budget tracker for a new run to ``config`` when the run has a budget.
+
+        Without a budget of its own, a nested run keeps the tracker it
+        inherited from the enclosing run's config.
+        """
+        budget = budget or self.budget
+        if budget is None:
+            return config
+        tracker = BudgetTracker(budget, parent=self._budget_tracker(config))
+        return merge_configs(config, {"callbacks": [tracker], "configurable": {BUDGET_CONFIG_KEY: tracker}})
+
+    def _with_tools(self, config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+        """Add this system's tool executor and tool cache to ``config`` when it has them."""
+        configurable = {}
+        if self.tool_executor is not None:
+            configurable[TOOL_EXECUTOR_CONFIG_KEY] = self.tool_executor
+        if self.tool_cache is not None:
+            configurable[TOOL_CACHE_CONFIG_KEY] = self.tool_cache
+        if not configurable:
+            return config
+        return merge_configs(config, {"configurable": configurable})
+
+    def _with_speculation(self, config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+        """Add a store for a new run's speculative agent calls when speculation is on."""
+        if self.speculation is None:
+            return config
+        return merge_configs(config, {"configurable": {SPECULATION_CONFIG_KEY: SpeculationStore()}})
+
+    def _start_metrics(
+        self, config: Optional[RunnableConfig]
+    ) -> tuple[Optional[RunnableConfig], Optional[MetricsRecorder]]:
+        """Add a metrics recorder for a new run to ``config`` when metrics are on."""
+        if self.metrics is None:
+            return config, None
+        recorder = self.metrics.start_run(self.node_agent_names())
+        return merge_configs(
+            config, {"callbacks": [recorder], "configurable": {METRICS_CONFIG_KEY: recorder}}
+        ), recorder
+
+    def _finish_metrics(self, recorder: Optional[MetricsRecorder], result: Optional[dict]) -> None:
+        """Export a finished run's metrics and attach them to its result."""
+        if recorder is None:
+            return
+        run_metrics = self.metrics.finish_run(recorder)
+        if result is not None:
+            result["metrics"] = run_metrics
+
+    def _start_trace(
+        self, config: Optional[RunnableConfig], task: str
+    ) -> tuple[Optional[RunnableConfig], Optional[RunTracer]]:
+        """Add a tracer for a new run to ``config`` when the system records traces."""
+        if self.trace is None:
+            return config, None
+        tracer = self.trace.start_run(task, self.node_agent_names())
+        return merge_configs(
+            config, {"callbacks": [tracer], "configurable": {TRACE_CONFIG_KEY: tracer}}
+        ), tracer
+
+    def _finish_trace(self, tracer: Optional[RunTracer], result: Optional[dict]) -> None:
+        """Write the end of a traced run."""
+        if tracer is not None:
+            self.trace.finish_run(tracer, result)
+
+    def node_agent_names(self) -> dict[str, str]:
+        """Map graph node names to agent names, including nested teams."""
+        names = {node_name: agent_name for agent_name, node_name in self.agent_name_map.items()}
+        for agent in self.agents:
+            sub_system = getattr(agent, "sub_system", None)
+            if isinstance(sub_system, AgentSystem):
+                names.update(sub_system.node_agent_names())
+        return names
+
+    def run_many(
+        self,
+        tasks: Iterable[str],
+        max_concurrency: int = 8,
+        batch_routing: bool = True,
+    ) -> Iterator[TaskOutcome]:
+        """Run many tasks with bounded concurrency, yielding outcomes as they complete.
+
+        Tasks are pulled from ``tasks`` lazily, so generators are never
+        materialized. A failing task is reported through its outcome's
+        ``error`` and does not affect the others.
+
+        Args:
+            tasks: Iterable of task strings
+            max_concurrency: Maximum number of tasks running at once
+            batch_routing: Send concurrent supervisor routing calls through the
+                model's ``batch`` API
+
+        Yields:
+            A TaskOutcome per task, in completion order
+        """
+        batcher = RequestBatcher(max_batch_size=max_concurrency) if batch_routing else None
+        indexed_tasks = enumerate(tasks)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            in_flight = set()
+
+            def submit_next() -> bool:
+                try:
+                    index, task = next(indexed_tasks)
+                except StopIteration:
+                    return False
+                in_flight.add(
+                    executor.submit(run_with_batcher, batcher, self._run_outcome, index, task)
+                )
+                return True
+
+            while len(in_flight) < max_concurrency and submit_next():
+                pass
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.remove(future)
+                    submit_next()
+                    yield future.result()
+
+    async def arun_many(
+        self,
+        tasks: Union[Iterable[str], AsyncIterable[str]],
+        max_concurrency: int = 8,
+        batch_routing: bool = True,
+    ) -> AsyncIterator[TaskOutcome]:
+        """Asynchronously run many tasks with bounded concurrency.
+
+        Accepts a regular or async iterable, consumed lazily. Outcomes are
+        yielded as tasks complete, with per-task error isolation.
+
+        Args:
+            tasks: Iterable or async iterable of task strings
+            max_concurrency: Maximum number of tasks running at once
+            batch_routing: Send concurrent supervisor routing calls through the
+                model's ``abatch`` API
+
+        Yields:
+            A TaskOutcome per task, in completion order
+        """
+        batcher = RequestBatcher(max_batch_size=max_concurrency) if batch_routing else None
+        task_iter = _aiter_tasks(tasks)
+        in_flight = set()
+        index = 0
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_concurrency:
+                    try:
+                        task = await task_iter.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    in_flight.add(asyncio.ensure_future(self._arun_outcome(index, task, batcher)))
+                    index += 1
+                if not in_flight:
+                    break
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _run_outcome(self, index: int, task: str) -> TaskOutcome:
+        """Run one task of a batch, capturing any error in the outcome."""
+        try:
+            return TaskOutcome(index=index, task=task, result=self.run(task))
+        except Exception as e:
+            logger.error(f"❌ Task {index} failed: {e}")
+            return TaskOutcome(index=index, task=task, error=e)
+
+    async def _arun_outcome(
+        self, index: int, task: str, batcher: Optional[RequestBatcher]
+    ) -> TaskOutcome:
+        """Asynchronously run one task of a batch, capturing any error in the outcome."""
+        try:
+            result = await arun_with_batcher(batcher, self.arun, task)
+            return TaskOutcome(index=index, task=task, result=result)
+        except Exception as e:
+            logger.error(f"❌ Task {index} failed: {e}")
+            return TaskOutcome(index=index, task=task, error=e)
+
+
+async def _aiter_tasks(tasks: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    """Iterate over a sync or async iterable of tasks."""
+    if hasattr(tasks, "__aiter__"):
+        async for task in tasks:
+            yield task
+    else:
+        for task in tasks:
+            yield task
@@ -1,23 +1,30 @@
 
 """Base class for creating specialized agents."""
 from abc import ABC, abstractmethod
-from typing import List, Callable, Optional
+from typing import List, Callable, Optional, TYPE_CHECKING
 import logging
-from langchain.agents import create_agent
+import threading
 from langchain_core.language_models import BaseChatModel
 from langchain_core.callbacks import BaseCallbackHandler
-from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import merge_configs
 from typing import Any, Dict
+from ..cache import CacheStats
+
+if TYPE_CHECKING:
+    from ..model_pool import ModelPool
+    from ..tool_execution import ToolPolicy
 
 
 logger = logging.getLogger(__name__)
 
 
 class ToolCallLogger(BaseCallbackHandler):
-    """Callback handler to log tool calls."""
+    """Callback handler to log tool calls and cache lookups for cacheable tools."""
 
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
+        self.cache_stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
 
     def on_tool_start(
         self, serialized: Dict[str, Any], input_str: str, **kwargs: Any
@@ -34,6 +41,17 @@ class ToolCallLogger(BaseCallbackHandler):
         return_value = output.content if hasattr(output, 'content') else output
         logger.info(f"[{self.agent_name}] Return value: {return_value}")
 
+    def on_tool_cache_lookup(self, tool_name: str, hit: bool) -> None:
+        """Count a cache lookup for a cacheable tool and log hits."""
+        with self._lock:
+            stats = self.cache_stats.setdefault(tool_name, CacheStats())
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+        if hit:
+            logger.info(f"[{self.agent_name}] 💾 Using cached result for tool: {tool_name}")
+
 
 class BaseAgent(ABC):
     """Abstract base class for a specialized agent."""
@@ -54,7 +72,8 @@ class BaseAgent(ABC):
         self.llm = llm
         self.name = name or self.__class__.__name__
         self.tool_logger = ToolCallLogger(self.name)
-        self.agent = self._create_agent()
+        self._agent = None
+        self._agent_lock = threading.Lock()
 
     @property
     @abstractmethod
@@ -68,20 +87,102 @@ class BaseAgent(ABC):
         """Return the system prompt for the agent."""
         pass
 
+    @property
+    def routing_rules(self) -> List[str]:
+        """Return regular expressions that identify requests for this agent.
+
+        Used by ``RuleRouter`` to route obvious requests without a supervisor
+        LLM call. Patterns match case-insensitively anywhere in the request.
+        """
+        return []
+
+    @property
+    def reusable(self) -> bool:
+        """Return whether the agent's results may be reused for a repeated request.
+
+        Override to return False for agents that are nondeterministic or have
+        side effects, so they run on every request even when the AgentSystem
+        reuses results or caches responses, and are never started
+        speculatively.
+        """
+        return True
+
+    @property
+    def tool_policies(self) -> Dict[str, "ToolPolicy"]:
+        """Return execution policies by tool name.
+
+        Tools without a policy run inline. Pooled tools run on the shared
+        pools of the AgentSystem's ToolExecutor, so blocking I/O tools called
+        in the same model turn overlap and CPU-bound tools can escape the GIL.
+        """
+        return {}
+
+    @property
+    def agent(self):
+        """Return the compiled agent graph.
+
+        The graph is compiled on first use rather than at construction, so
+        building large teams and importing agents stays cheap.
+        """
+        if self._agent is None:
+            with self._agent_lock:
+                if self._agent is None:
+                    self._agent = self._create_agent()
+        return self._agent
+
     def _create_agent(self):
         """Create and compile the agent graph."""
+        # Imported here because langchain.agents loads LangGraph
+        from langchain.agents import create_agent
+        from ..tool_cache import ToolCacheMiddleware, is_cacheable, tool_name
+        from ..tool_execution import ToolExecutionMiddleware
+        from ..tracing import ReplayChatModel, ToolReplayMiddleware
+
+        tools = self.tools
+        middleware = []
+        if isinstance(self.llm, ReplayChatModel):
+            # Outermost, so replayed results skip the tool cache and pools
+            middleware.append(ToolReplayMiddleware(self.llm.replay))
+        cacheable_names = {tool_name(tool) for tool in tools if is_cacheable(tool)}
+        if cacheable_names:
+            middleware.append(
+                ToolCacheMiddleware(cacheable_names, on_lookup=self.tool_logger.on_tool_cache_lookup)
+            )
+        policies = self.tool_policies
+        if policies:
+            middleware.append(ToolExecutionMiddleware(policies))
         return create_agent(
             self.llm,
-            tools=self.tools,
-            system_prompt=self.system_prompt
+            tools=tools,
+            system_prompt=self.system_prompt,
+            middleware=middleware,
         )
 
+    def use_model_pool(self, pool: "ModelPool") -> None:
+        """Switch the agent to the pool's shared, rate-limited copy of its model.
+
+        A ``TraceReplay`` can stand in for the pool to switch the agent to a
+        model replaying a recorded trace.
+        """
+        llm = pool.get(self.llm)
+        if llm is not self.llm:
+            with self._agent_lock:
+                self.llm = llm
+                self._agent = None
+
+    def _add_tool_logger(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the tool logger to the callbacks of an invocation config.
+
+        The config may come from an enclosing graph node, in which case its
+        callbacks can be a callback manager rather than a list.
+        """
+        kwargs["config"] = merge_configs(kwargs.get("config"), {"callbacks": [self.tool_logger]})
+        return kwargs
+
     def invoke(self, *args, **kwargs):
         """Invoke the agent graph with tool call logging."""
-        # Add the tool logger to callbacks if not already present
-        if "config" not in kwargs:
-            kwargs["config"] = {}
-        if "callbacks" not in kwargs["config"]:
-            kwargs["config"]["callbacks"] = []
-        kwargs["config"]["callbacks"].append(self.tool_logger)
-        return self.agent.invoke(*args, **kwargs)
+        return self.agent.invoke(*args, **self._add_tool_logger(kwargs))
+
+    async def ainvoke(self, *args, **kwargs):
+        """Asynchronously invoke the agent graph with tool call logging."""
+        return await self.agent.ainvoke(*args, **self._add_tool_logger(kwargs))
@@ -1,34 +1,156 @@
 """Supervisor agent for coordinating sub-agents."""
 import logging
+import re
+import threading
 
 from typing import List, Callable, Optional
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage
+from ..budget import RunBudget
+from ..cache import InMemoryCache, ResponseCache, make_cache_key
+from ..compaction import ResultCompactor, render_results
+from ..handoff import HandoffStrategy
+from ..history import HistoryStrategy
+from ..routing import TieredRouter
+from ..speculation import SpeculationPredictor
 from .base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+# A request line ending in this phrase and a reference asks a team for full
+# results; the line may be followed by text a plan step appends to its subtask
+FULL_RESULTS_REQUEST = re.compile(r"full results ([0-9a-f]{16})\s*$", re.MULTILINE)
+
 
 class SupervisorAgent(BaseAgent):
     """Supervisor agent that routes tasks to specialized sub-agents."""
 
-    def __init__(self, llm: BaseChatModel, available_agents: list[BaseAgent], name: Optional[str] = None):
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        available_agents: list[BaseAgent],
+        name: Optional[str] = None,
+        history_strategy: Optional[HistoryStrategy] = None,
+        parallel: bool = False,
+        cache: Optional[ResponseCache] = None,
+        router: Optional[TieredRouter] = None,
+        budget: Optional[RunBudget] = None,
+        handoff: Optional[HandoffStrategy] = None,
+        planning: bool = False,
+        speculation: Optional[SpeculationPredictor] = None,
+        reuse_results: bool = False,
+        compactor: Optional[ResultCompactor] = None,
+        result_store: Optional[ResponseCache] = None,
+    ):
         """Initialize the supervisor agent.
         
         Args:
             llm: The language model to use
             available_agents: List of agents this supervisor manages
             name: Optional custom name for the supervisor
+            history_strategy: Optional history strategy for the team's supervisor
+            parallel: Whether the team's supervisor may run several agents at once
+            cache: Optional response cache shared with the team's sub-system
+            router: Optional tiered router for the team's supervisor
+            budget: Optional limits for each of the team's runs. Without one,
+                the team follows the budget of the run it is part of.
+            handoff: Optional handoff strategy for the team's agents
+            planning: Whether the team's supervisor plans all steps up front
+            speculation: Optional predictor for speculative routing in the team
+            reuse_results: Whether the team reuses an agent's result when it
+                gets the same request again within a run
+            compactor: Optional compaction for the team's results, e.g. a
+                ``TruncateCompactor``, applied when they exceed the
+                compactor's ``max_chars`` so nested teams hand their parent
+                a bounded summary instead of every sub-result verbatim. The
+                parent system must pass on its supervisor's instruction or
+                subtask so the full results can be requested.
+            result_store: Where full results are kept while their summary is
+                in use, for the parent to fetch on demand. Defaults to an
+                in-memory LRU cache when a compactor is set.
         """
         self.available_agents = available_agents
+        self.history_strategy = history_strategy
+        self.parallel = parallel
+        self.cache = cache
+        self.router = router
+        self.budget = budget
+        self.handoff = handoff
+        self.planning = planning
+        self.speculation = speculation
+        self.reuse_results = reuse_results
+        self.compactor = compactor
+        if compactor is not None and result_store is None:
+            result_store = InMemoryCache(max_size=256)
+        self.result_store = result_store
+        self._sub_system = None
+        self._sub_system_lock = threading.Lock()
+        self._descriptions = None
         super().__init__(llm, name=name)
 
+    @property
+    def sub_system(self):
+        """Return the compiled sub-system for this supervisor's agents.
+
+        The sub-system is built on first use and reused across invocations;
+        the compiled graph holds no per-run state, so it is safe to share
+        between threads and concurrent async tasks.
+        """
+        if self._sub_system is None:
+            with self._sub_system_lock:
+                if self._sub_system is None:
+                    # Import here to avoid circular dependency
+                    from ..agent_system import AgentSystem
+                    self._sub_system = AgentSystem(
+                        self.llm,
+                        self.available_agents,
+                        history_strategy=self.history_strategy,
+                        parallel=self.parallel,
+                        cache=self.cache,
+                        router=self.router,
+                        budget=self.budget,
+                        handoff=self.handoff,
+                        planning=self.planning,
+                        speculation=self.speculation,
+                        reuse_results=self.reuse_results,
+                    )
+        return self._sub_system
+
+    def use_model_pool(self, pool) -> None:
+        """Switch this supervisor and its team to the pool's shared model copies."""
+        for agent in self.available_agents:
+            agent.use_model_pool(pool)
+        if hasattr(self.compactor, "use_model_pool"):
+            self.compactor.use_model_pool(pool)
+        with self._sub_system_lock:
+            self._sub_system = None
+        super().use_model_pool(pool)
+
+    def _team_descriptions(self) -> tuple[str, str]:
+        """Return this team's description and its agent list for prompts.
+
+        Nested teams would otherwise re-walk every sub-agent on each read, so
+        both are built once and rebuilt only when the agent list changes.
+        """
+        agents = tuple(self.available_agents)
+        cached = self._descriptions
+        if cached is None or cached[0] != agents:
+            # Describe capabilities based on sub-agents
+            capabilities = [agent.description for agent in agents]
+            description = f"Coordinates a team that can: {', '.join(capabilities)}"
+            agent_descriptions = "\n".join(f"- {agent.name}: {agent.description}" for agent in agents)
+            cached = self._descriptions = (agents, description, agent_descriptions)
+        return cached[1], cached[2]
+
     @property
     def description(self) -> str:
         """Return a description of the agent."""
-        # Describe capabilities based on sub-agents
-        capabilities = [agent.description for agent in self.available_agents]
-        return f"Coordinates a team that can: {', '.join(capabilities)}"
+        return self._team_descriptions()[0]
+
+    @property
+    def reusable(self) -> bool:
+        """Return True only if every agent of the team may have its results reused."""
+        return all(agent.reusable for agent in self.available_agents)
 
     @property
     def tools(self) -> List[Callable]:
@@ -38,11 +160,7 @@ class SupervisorAgent(BaseAgent):
     @property
     def system_prompt(self) -> str:
         """Return the system prompt for the agent."""
-        agent_descriptions = "\n".join(
-            f"- {agent.__class__.__name__}: {agent.description}" 
-            for agent in self.available_agents
-        )
-        
+        agent_descriptions = self._team_descriptions()[1]
         return f"""You are a supervisor orchestrating a team of specialized agents. Your role is to analyze the user's task and the ongoing conversation to delegate the next step to the most appropriate agent.
 
 Here are the agents available to you:
@@ -51,43 +169,103 @@ Here are the agents available to you:
 Follow these rules:
 1.  **Analyze the Request**: Carefully read the user's task and the conversation history.
 2.  **Break Down the Task**: If the task is complex, break it down into smaller, sequential steps. Each step should be handled by the most appropriate agent.
-3.  **Delegate**: Choose the best agent to perform the next action. The agent's description will help you decide. For example, if the user asks to research a topic, you should route to the "ResearchAgent".
-4.  **FINISH**: Once all steps of the task are fully completed and the user's request has been met, you must choose "FINISH". Do not finish if there are still steps to be done.
+3.  **Delegate**: Choose the best agent to perform the next action using their exact name from the list above. The agent's description will help you decide.
+4.  **FINISH**: Once all steps of the task are fully completed and the user's request has been met, you must respond with "finish". Do not finish if there are still steps to be done.
 5.  **No Assumptions**: Do not make assumptions about what has been done. Base your decisions only on the conversation history. If the history is empty, start from the beginning of the task.
 
-Your job is to decide which agent should act next. Choose FINISH ONLY when the entire task is complete."""
+Your job is to decide which agent should act next by returning their exact name, or "finish" when the entire task is complete."""
     
     def invoke(self, inputs, **kwargs):
         """Override invoke to run the sub-agent system."""
-        # Import here to avoid circular dependency
-        from ..agent_system import AgentSystem
-        
-        # Create a sub-system for this supervisor's agents
-        sub_system = AgentSystem(self.llm, self.available_agents)
-        
-        # Extract the task from inputs
+        task = self._extract_task(inputs)
+        stored = self._stored_results(task)
+        if stored is not None:
+            return self._response(stored)
+        config = kwargs.get("config")
+        result = self.sub_system.run(task, config=config)
+        results = self._results_text(result)
+        if self._over_budget(results):
+            results = self._compacted(
+                results, self.compactor.compact(task, result.get("task_result", {}), config)
+            )
+        return self._format_result(result, results)
+
+    async def ainvoke(self, inputs, **kwargs):
+        """Override ainvoke to run the sub-agent system asynchronously."""
+        task = self._extract_task(inputs)
+        stored = self._stored_results(task)
+        if stored is not None:
+            return self._response(stored)
+        config = kwargs.get("config")
+        result = await self.sub_system.arun(task, config=config)
+        results = self._results_text(result)
+        if self._over_budget(results):
+            results = self._compacted(
+                results, await self.compactor.acompact(task, result.get("task_result", {}), config)
+            )
+        return self._format_result(result, results)
+
+    def full_results(self, ref: str) -> Optional[str]:
+        """Return the full results behind a compacted summary, if still stored."""
+        if self.result_store is None:
+            return None
+        return self.result_store.get(ref)
+
+    def _stored_results(self, task: str) -> Optional[str]:
+        """Return stored full results when the request asks for them by reference."""
+        match = FULL_RESULTS_REQUEST.search(task.strip())
+        if match is None:
+            return None
+        full = self.full_results(match.group(1))
+        if full is not None:
+            logger.info(f"📂 {self.name} returning stored full results {match.group(1)}")
+        return full
+
+    @staticmethod
+    def _results_text(result: dict) -> str:
+        """Render every sub-agent's latest result."""
+        return render_results(result.get("task_result", {}))
+
+    def _over_budget(self, results: str) -> bool:
+        """Return whether the results exceed the compactor's size budget."""
+        return self.compactor is not None and len(results) > self.compactor.max_chars
+
+    def _compacted(self, full: str, summary: str) -> str:
+        """Store the full results and return the summary with a reference to them."""
+        ref = make_cache_key(f"team:{self.name}", "", full)[:16]
+        self.result_store.set(ref, full)
+        logger.info(f"🗜️ {self.name} compacted results from {len(full)} to {len(summary)}")
+        return (
+            f"{summary}\n[Results compacted from {len(full)} characters. For the full results, "
+            f"route to {self.name} with the instruction or subtask: full results {ref}]"
+        )
+
+    @staticmethod
+    def _extract_task(inputs) -> str:
+        """Extract the task text from agent-style inputs."""
         if isinstance(inputs, dict) and "messages" in inputs:
             messages = inputs["messages"]
             if messages:
                 # Get the last message content as the task
                 if isinstance(messages[-1], tuple):
-                    task = messages[-1][1]
-                else:
-                    task = messages[-1].content if hasattr(messages[-1], 'content') else str(messages[-1])
-            else:
-                task = "No task provided"
-        else:
-            task = str(inputs)
-        
-        # Run the sub-system
-        result = sub_system.run(task)
-        
-        # Format result for return
+                    return messages[-1][1]
+                return messages[-1].content if hasattr(messages[-1], 'content') else str(messages[-1])
+            return "No task provided"
+        return str(inputs)
+
+    def _format_result(self, result: dict, results: str) -> dict:
+        """Format a sub-system result as an agent response."""
         # Summarize the task results from all sub-agents
         summary = f"Completed task using team {self.name}:\n"
-        for agent_name, agent_result in result.get("task_result", {}).items():
-            summary += f"- {agent_name}: {agent_result}\n"
-        
+        if results:
+            summary += f"{results}\n"
+        if result.get("stop_reason"):
+            summary += f"Stopped early: {result['stop_reason']}\n"
+        return self._response(summary)
+
+    @staticmethod
+    def _response(content: str) -> dict:
+        """Wrap text as an agent response."""
         return {
-            "messages": [HumanMessage(content=summary)]
+            "messages": [HumanMessage(content=content)]
         }
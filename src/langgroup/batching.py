@@ -0,0 +1,155 @@
+"""Micro-batching of concurrent model calls made by independent runs."""
+import asyncio
+import contextvars
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+from langchain_core.runnables import Runnable
+
+logger = logging.getLogger(__name__)
+
+_active_batcher: contextvars.ContextVar[Optional["RequestBatcher"]] = contextvars.ContextVar(
+    "langgroup_active_batcher", default=None
+)
+
+
+def get_active_batcher() -> Optional["RequestBatcher"]:
+    """Return the batcher of the batch run executing in the current context, if any."""
+    return _active_batcher.get()
+
+
+def run_with_batcher(batcher: Optional["RequestBatcher"], fn: Callable, *args: Any) -> Any:
+    """Call ``fn`` with ``batcher`` active for model calls made in this context."""
+    token = _active_batcher.set(batcher)
+    try:
+        return fn(*args)
+    finally:
+        _active_batcher.reset(token)
+
+
+async def arun_with_batcher(batcher: Optional["RequestBatcher"], fn: Callable, *args: Any) -> Any:
+    """Await ``fn`` with ``batcher`` active for model calls made in this context."""
+    token = _active_batcher.set(batcher)
+    try:
+        return await fn(*args)
+    finally:
+        _active_batcher.reset(token)
+
+
+class _PendingCall:
+    """A queued call waiting for its batch to run."""
+
+    __slots__ = ("input", "result", "error", "done")
+
+    def __init__(self, input: Any):
+        self.input = input
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class RequestBatcher:
+    """Collect concurrent calls to the same runnable and send them through ``batch``/``abatch``.
+
+    Calls are grouped per runnable. A group is flushed when it reaches
+    ``max_batch_size`` or when the first call in it has waited ``max_wait``
+    seconds, whichever comes first.
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_wait: float = 0.01):
+        """Initialize the batcher.
+
+        Args:
+            max_batch_size: Largest number of inputs sent in one batch
+            max_wait: Seconds the first call of a batch waits for more calls
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._pending: dict[int, list[_PendingCall]] = {}
+        self._leaders: set[int] = set()
+        self._async_pending: dict[int, list[tuple[Any, asyncio.Future]]] = {}
+        self._async_flushes: set[asyncio.Task] = set()
+
+    def invoke(self, runnable: Runnable, input: Any) -> Any:
+        """Invoke ``runnable`` on ``input`` as part of a batch, blocking until it completes."""
+        key = id(runnable)
+        call = _PendingCall(input)
+        batch = None
+        is_leader = False
+        with self._lock:
+            pending = self._pending.setdefault(key, [])
+            pending.append(call)
+            if len(pending) >= self.max_batch_size:
+                batch = self._pending.pop(key)
+            elif key not in self._leaders:
+                # The first caller of a batch waits for others and then flushes it
+                self._leaders.add(key)
+                is_leader = True
+
+        if batch:
+            self._run_batch(runnable, batch)
+        if is_leader:
+            call.done.wait(self.max_wait)
+            with self._lock:
+                self._leaders.discard(key)
+                batch = self._pending.pop(key, None)
+            if batch:
+                self._run_batch(runnable, batch)
+
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _run_batch(self, runnable: Runnable, batch: list[_PendingCall]) -> None:
+        """Run a batch synchronously and hand each caller its result."""
+        logger.debug(f"Running batch of {len(batch)} calls")
+        try:
+            results = runnable.batch([call.input for call in batch], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(batch)
+        for call, result in zip(batch, results):
+            if isinstance(result, Exception):
+                call.error = result
+            else:
+                call.result = result
+            call.done.set()
+
+    async def ainvoke(self, runnable: Runnable, input: Any) -> Any:
+        """Asynchronously invoke ``runnable`` on ``input`` as part of a batch."""
+        loop = asyncio.get_running_loop()
+        key = id(runnable)
+        future = loop.create_future()
+        pending = self._async_pending.setdefault(key, [])
+        pending.append((input, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush_async(runnable, key)
+        elif len(pending) == 1:
+            loop.call_later(self.max_wait, self._flush_async, runnable, key)
+        return await future
+
+    def _flush_async(self, runnable: Runnable, key: int) -> None:
+        """Start running the pending async calls for ``runnable``."""
+        batch = self._async_pending.pop(key, None)
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._arun_batch(runnable, batch))
+        self._async_flushes.add(task)
+        task.add_done_callback(self._async_flushes.discard)
+
+    async def _arun_batch(self, runnable: Runnable, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        """Run a batch asynchronously and resolve each caller's future."""
+        logger.debug(f"Running batch of {len(batch)} calls")
+        try:
+            results = await runnable.abatch([input for input, _ in batch], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,109 @@
+"""Per-run budgets that stop runaway routing loops gracefully."""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .metrics import token_usage
+from .models import AgentState
+
+BUDGET_CONFIG_KEY = "langgroup_budget"
+
+MAX_HOPS = "max_hops"
+MAX_TOKENS = "max_tokens"
+MAX_WALL_TIME = "max_wall_time"
+MAX_CONSECUTIVE_SAME_AGENT = "max_consecutive_same_agent"
+UNKNOWN_AGENT = "unknown_agent"
+PLAN_FAILED = "plan_failed"
+
+
+@dataclass
+class RunBudget:
+    """Limits for a single run. None disables a limit.
+
+    Attributes:
+        max_hops: Agent calls allowed per team level
+        max_tokens: Prompt and completion tokens allowed across the whole
+            run, including nested teams
+        max_wall_time: Seconds the whole run may take. Checked between hops,
+            so an agent call in progress is not interrupted.
+        max_consecutive_same_agent: Times in a row the same agent may be
+            called before the run is considered stuck
+    """
+    max_hops: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_wall_time: Optional[float] = None
+    max_consecutive_same_agent: Optional[int] = None
+
+
+def agent_hops(state: AgentState) -> int:
+    """Count the agent results in a state; each agent call adds one named message."""
+    return sum(1 for msg in state["messages"] if msg.name)
+
+
+class BudgetTracker(BaseCallbackHandler):
+    """Callback handler that tracks a run's token use and elapsed time against a budget.
+
+    Nested SupervisorAgent teams inherit their parent's tracker through the
+    run config; a team with its own budget gets a child tracker that also
+    honours the parent's token and time limits.
+    """
+
+    run_inline = True
+
+    def __init__(self, budget: RunBudget, parent: Optional["BudgetTracker"] = None):
+        """Initialize the tracker.
+
+        Args:
+            budget: Limits to enforce
+            parent: Tracker of the enclosing run, if any
+        """
+        self.budget = budget
+        self.parent = parent
+        self.started = time.monotonic()
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = token_usage(response)
+        with self._lock:
+            self.tokens += prompt_tokens + completion_tokens
+
+    def check(self, state: AgentState) -> Optional[str]:
+        """Return the limit the run has reached before its next hop, or None."""
+        max_hops = self.budget.max_hops
+        if max_hops is not None and agent_hops(state) >= max_hops:
+            return MAX_HOPS
+        return self._check_resources()
+
+    def _check_resources(self) -> Optional[str]:
+        """Return the run-wide limit that has been reached, or None."""
+        if self.budget.max_tokens is not None and self.tokens >= self.budget.max_tokens:
+            return MAX_TOKENS
+        max_wall_time = self.budget.max_wall_time
+        if max_wall_time is not None and time.monotonic() - self.started >= max_wall_time:
+            return MAX_WALL_TIME
+        if self.parent is not None:
+            return self.parent._check_resources()
+        return None
+
+    def remaining_hops(self, state: AgentState) -> Optional[int]:
+        """Return the agent calls left at this level, or None when unlimited."""
+        if self.budget.max_hops is None:
+            return None
+        return max(self.budget.max_hops - agent_hops(state), 0)
+
+    def check_repeat(self, state: AgentState, next_agent: str) -> Optional[str]:
+        """Return a stop reason if calling ``next_agent`` again would exceed the repeat limit."""
+        limit = self.budget.max_consecutive_same_agent
+        if limit is None:
+            return None
+        streak = 0
+        for msg in reversed(state["messages"]):
+            if msg.name != next_agent:
+                break
+            streak += 1
+        return MAX_CONSECUTIVE_SAME_AGENT if streak >= limit else None
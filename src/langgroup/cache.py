@@ -0,0 +1,225 @@
+"""Response caches for supervisor routing and agent calls."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from langchain_core.messages import BaseMessage
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters for a cache."""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def normalize_prompt(prompt: Union[str, list]) -> str:
+    """Normalize a prompt so insignificant whitespace does not change the cache key.
+
+    Args:
+        prompt: A string or a list of messages
+
+    Returns:
+        A canonical string form of the prompt
+    """
+    if isinstance(prompt, str):
+        return " ".join(prompt.split())
+    parts = []
+    for msg in prompt:
+        if isinstance(msg, BaseMessage):
+            parts.append(f"{msg.type}: {' '.join(str(msg.content).split())}")
+        else:
+            parts.append(" ".join(str(msg).split()))
+    return "\n".join(parts)
+
+
+def model_identity(llm: Any) -> str:
+    """Return a stable identifier for a model and the parameters that affect its output."""
+    params = getattr(llm, "_identifying_params", None)
+    if isinstance(params, dict) and params:
+        return json.dumps(params, sort_keys=True, default=str)
+    return type(llm).__name__
+
+
+def make_cache_key(namespace: str, model: str, prompt: Union[str, list]) -> str:
+    """Build a cache key from a namespace (e.g. agent name), model identity and prompt."""
+    raw = "\x1f".join((namespace, model, normalize_prompt(prompt)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Abstract base class for response caches.
+
+    Subclasses implement storage; this class handles TTL bookkeeping and
+    hit/miss counting.
+    """
+
+    def __init__(self, max_size: Optional[int] = 1024, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries; least recently used entries
+                are evicted first. None for unbounded.
+            ttl: Seconds an entry stays valid. None for no expiry.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for ``key``, or None on a miss."""
+        value = self._get(key, time.time())
+        with self._stats_lock:
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key``."""
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self._set(key, value, expires_at)
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> Optional[str]:
+        """Return an unexpired value for ``key`` and mark it as recently used."""
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        """Store a value and evict entries beyond ``max_size``."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class InMemoryCache(ResponseCache):
+    """Thread-safe in-memory LRU cache."""
+
+    def __init__(self, max_size: Optional[int] = 1024, ttl: Optional[float] = None):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._entries: OrderedDict[str, tuple[str, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """Persistent cache stored in a SQLite database file.
+
+    Safe to share between threads and between processes using the same file.
+    """
+
+    def __init__(
+        self,
+        path: str = ".langgroup_cache.db",
+        max_size: Optional[int] = 100_000,
+        ttl: Optional[float] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: Path to the database file
+            max_size: Maximum number of entries; least recently used entries
+                are evicted first. None for unbounded.
+            ttl: Seconds an entry stays valid. None for no expiry.
+        """
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def _set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            if self.max_size is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_size,),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
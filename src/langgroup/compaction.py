@@ -0,0 +1,207 @@
+"""Compaction strategies that bound the size of a team's results at its boundary."""
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+
+from .cache import ResponseCache, make_cache_key, model_identity
+
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD = re.compile(r"[a-z0-9]{4,}")
+
+SUMMARY_PROMPT = """You summarize the results of a team of agents for the supervisor that delegated the task to the team.
+Keep the facts, numbers, names and conclusions the supervisor needs to continue the task, and drop everything else.
+Reply with the summary only, in at most {max_chars} characters."""
+
+
+def render_results(results: dict[str, Any]) -> str:
+    """Render agent results as one ``- name: result`` line each."""
+    return "\n".join(f"- {name}: {result}" for name, result in results.items())
+
+
+def allot(lengths: list[int], budget: int) -> list[int]:
+    """Share ``budget`` characters between texts of the given lengths.
+
+    Texts shorter than an equal share keep their full length and leave the
+    rest of their share to longer texts.
+    """
+    allotment = [0] * len(lengths)
+    remaining = budget
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    for position, i in enumerate(order):
+        share = remaining // (len(order) - position)
+        allotment[i] = min(lengths[i], share)
+        remaining -= allotment[i]
+    return allotment
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut ``text`` to ``limit`` characters, marking the cut."""
+    if len(text) <= limit:
+        return text
+    return text[:max(0, limit - 3)] + "..."
+
+
+class ResultCompactor(ABC):
+    """Abstract base class for compacting a team's results for its parent.
+
+    A SupervisorAgent with a compactor hands its parent a compacted summary
+    whenever its rendered results exceed ``max_chars``, the team's size
+    budget, and keeps the full results for the parent to fetch on demand.
+    """
+
+    def __init__(self, max_chars: int = 2000):
+        """Initialize the compactor.
+
+        Args:
+            max_chars: Size budget, in characters, for the results a team
+                passes up to its parent
+        """
+        if max_chars < 1:
+            raise ValueError("max_chars must be at least 1")
+        self.max_chars = max_chars
+
+    @abstractmethod
+    def compact(
+        self, task: str, results: dict[str, str], config: Optional[RunnableConfig] = None
+    ) -> str:
+        """Compact a team's results to fit ``max_chars``.
+
+        Args:
+            task: The task the team was given
+            results: Latest result of each of the team's agents
+            config: Config of the team's node, for compactors that call a model
+
+        Returns:
+            The results text to hand to the parent
+        """
+        pass
+
+    async def acompact(
+        self, task: str, results: dict[str, str], config: Optional[RunnableConfig] = None
+    ) -> str:
+        """Asynchronously compact a team's results to fit ``max_chars``."""
+        return self.compact(task, results, config)
+
+
+class TruncateCompactor(ResultCompactor):
+    """Truncate each agent's result to a fair share of the budget."""
+
+    def compact(
+        self, task: str, results: dict[str, str], config: Optional[RunnableConfig] = None
+    ) -> str:
+        """Truncate results so that every agent keeps a share of the budget."""
+        texts = {name: str(result) for name, result in results.items()}
+        overhead = sum(len(f"- {name}: \n") for name in texts)
+        limits = allot([len(text) for text in texts.values()], max(0, self.max_chars - overhead))
+        return render_results({
+            name: _truncate(text, limit) for (name, text), limit in zip(texts.items(), limits)
+        })
+
+
+class ExtractiveCompactor(ResultCompactor):
+    """Keep the sentences of each result that are most relevant to the task.
+
+    Sentences are scored by the task words they contain, with a bonus for
+    numbers, and kept in their original order. No model is called.
+    """
+
+    def compact(
+        self, task: str, results: dict[str, str], config: Optional[RunnableConfig] = None
+    ) -> str:
+        """Select the most relevant sentences of each result within its share of the budget."""
+        texts = {name: str(result) for name, result in results.items()}
+        overhead = sum(len(f"- {name}: \n") for name in texts)
+        limits = allot([len(text) for text in texts.values()], max(0, self.max_chars - overhead))
+        task_words = set(WORD.findall(task.lower()))
+        return render_results({
+            name: self._extract(text, limit, task_words)
+            for (name, text), limit in zip(texts.items(), limits)
+        })
+
+    @staticmethod
+    def _extract(text: str, limit: int, task_words: set[str]) -> str:
+        """Return the highest-scoring sentences of ``text`` that fit in ``limit`` characters."""
+        if len(text) <= limit:
+            return text
+        sentences = [sentence for sentence in SENTENCE_BREAK.split(text) if sentence.strip()]
+
+        def score(i: int) -> tuple:
+            words = set(WORD.findall(sentences[i].lower()))
+            has_number = any(char.isdigit() for char in sentences[i])
+            # Earlier sentences win ties; they usually carry the answer
+            return len(words & task_words) + has_number, -i
+
+        kept, used = set(), 0
+        for i in sorted(range(len(sentences)), key=score, reverse=True):
+            cost = len(sentences[i]) + (1 if kept else 0)
+            if used + cost <= limit:
+                kept.add(i)
+                used += cost
+        if not kept:
+            return _truncate(sentences[0] if sentences else text, limit)
+        return " ".join(sentences[i] for i in sorted(kept))
+
+
+class LLMCompactor(ResultCompactor):
+    """Summarize a team's results with a model call, caching each summary."""
+
+    def __init__(self, llm, max_chars: int = 2000, cache: Optional[ResponseCache] = None):
+        """Initialize the compactor.
+
+        Args:
+            llm: The language model that writes the summaries
+            max_chars: Size budget for the summary; longer replies are truncated
+            cache: Optional cache of summaries, keyed on the model and the
+                prompt, so identical team results are summarized once
+        """
+        super().__init__(max_chars)
+        self.llm = llm
+        self.cache = cache
+
+    def use_model_pool(self, pool) -> None:
+        """Switch the compactor to the pool's shared copy of its model."""
+        self.llm = pool.get(self.llm)
+
+    def _prompt(self, task: str, results: dict[str, str]) -> list:
+        """Build the summary prompt."""
+        return [
+            SystemMessage(content=SUMMARY_PROMPT.format(max_chars=self.max_chars)),
+            HumanMessage(content=f"Task: {task}\n\nResults:\n{render_results(results)}"),
+        ]
+
+    def _cached(self, prompt: list) -> tuple[Optional[str], Optional[str]]:
+        """Return the cache key and any cached summary for a prompt."""
+        if self.cache is None:
+            return None, None
+        key = make_cache_key("compact", model_identity(self.llm), prompt)
+        return key, self.cache.get(key)
+
+    def _finish(self, key: Optional[str], summary: Any) -> str:
+        """Cache a fresh summary and enforce the budget."""
+        summary = _truncate(str(summary).strip(), self.max_chars)
+        if key is not None:
+            self.cache.set(key, summary)
+        return summary
+
+    def compact(
+        self, task: str, results: dict[str, str], config: Optional[RunnableConfig] = None
+    ) -> str:
+        """Summarize the results with the model, or return the cached summary."""
+        prompt = self._prompt(task, results)
+        key, cached = self._cached(prompt)
+        if cached is not None:
+            return cached
+        return self._finish(key, self.llm.invoke(prompt, config=config).content)
+
+    async def acompact(
+        self, task: str, results: dict[str, str], config: Optional[RunnableConfig] = None
+    ) -> str:
+        """Asynchronously summarize the results, or return the cached summary."""
+        prompt = self._prompt(task, results)
+        key, cached = self._cached(prompt)
+        if cached is not None:
+            return cached
+        return self._finish(key, (await self.llm.ainvoke(prompt, config=config)).content)
@@ -0,0 +1,119 @@
+"""Handoff strategies that control what an agent receives when the supervisor routes to it."""
+from abc import ABC, abstractmethod
+
+from .models import AgentState
+
+
+def original_task(state: AgentState) -> str:
+    """Return the task the run was started with."""
+    messages = state["messages"]
+    return messages[0].content if messages else ""
+
+
+def current_instruction(state: AgentState) -> str:
+    """Return the supervisor's instruction for the next agent.
+
+    Parallel routes carry their own subtask; otherwise the instruction comes
+    from the last routing decision and may be empty.
+    """
+    return state.get("subtask") or state.get("instruction") or ""
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
+
+
+class HandoffStrategy(ABC):
+    """Abstract base class for building the request an agent node sends to its agent.
+
+    ``uses_instruction`` tells whether the request is built from the
+    supervisor's instruction and context agents. The supervisor is only asked
+    for them when it is True.
+    """
+
+    uses_instruction: bool = True
+
+    @abstractmethod
+    def render(self, state: AgentState) -> str:
+        """Render the agent's request.
+
+        Args:
+            state: Current agent state, including the supervisor's instruction
+
+        Returns:
+            The request text for the agent
+        """
+        pass
+
+
+class LastMessageHandoff(HandoffStrategy):
+    """Send the supervisor's parallel subtask, or else the last message of the conversation.
+
+    At the first hop the last message is the task; after that it is the
+    previous agent's result.
+    """
+
+    uses_instruction = False
+
+    def render(self, state: AgentState) -> str:
+        """Return the subtask or the content of the last message."""
+        if state.get("subtask"):
+            return state["subtask"]
+        messages = state["messages"]
+        return messages[-1].content if messages else ""
+
+
+class InstructionHandoff(HandoffStrategy):
+    """Send only the supervisor's instruction, falling back to the original task."""
+
+    def render(self, state: AgentState) -> str:
+        """Return the instruction, or the task when the supervisor gave none."""
+        return current_instruction(state) or original_task(state)
+
+
+class InstructionWithResultsHandoff(HandoffStrategy):
+    """Send the instruction with the original task and the prior results it refers to.
+
+    The supervisor names the agents whose results the next agent needs in
+    ``RouteDecision.context_agents``. Without an explicit list, the results of
+    every agent that has run are included.
+    """
+
+    def __init__(self, max_chars_per_result: int = 2000):
+        """Initialize the strategy.
+
+        Args:
+            max_chars_per_result: Results longer than this are truncated
+        """
+        self.max_chars_per_result = max_chars_per_result
+
+    def render(self, state: AgentState) -> str:
+        """Render the task, the referenced results and the instruction."""
+        task = original_task(state)
+        instruction = current_instruction(state)
+        task_result = state.get("task_result") or {}
+        names = state.get("context_agents") or list(task_result)
+        results = [
+            f"- {name}: {_truncate(str(task_result[name]), self.max_chars_per_result)}"
+            for name in names
+            if name in task_result
+        ]
+        if not instruction and not results:
+            return task
+        parts = [f"Overall task: {task}"]
+        if results:
+            parts.append("Relevant results so far:\n" + "\n".join(results))
+        parts.append(f"Your instruction: {instruction or task}")
+        return "\n\n".join(parts)
+
+
+class FullHistoryHandoff(HandoffStrategy):
+    """Send the whole conversation followed by the supervisor's instruction."""
+
+    def render(self, state: AgentState) -> str:
+        """Join every message and append the instruction."""
+        transcript = "\n".join(msg.content for msg in state["messages"])
+        instruction = current_instruction(state)
+        if not instruction:
+            return transcript
+        return f"Conversation so far:\n{transcript}\n\nYour instruction: {instruction}"
@@ -0,0 +1,138 @@
+"""History strategies that control how much context the supervisor sees."""
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from .models import AgentState
+
+# Rough characters-per-token ratio for English text and code.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string without a tokenizer.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        Approximate number of tokens, never less than one for non-empty text
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+class HistoryStrategy(ABC):
+    """Abstract base class for rendering the supervisor's conversation history."""
+
+    @abstractmethod
+    def render(self, state: AgentState) -> str:
+        """Render the history section of the supervisor prompt.
+
+        Args:
+            state: Current agent state containing messages and results
+
+        Returns:
+            The history text to send to the supervisor
+        """
+        pass
+
+
+class FullHistory(HistoryStrategy):
+    """Send every message of the run to the supervisor."""
+
+    def render(self, state: AgentState) -> str:
+        """Join the content of all messages."""
+        return "\n".join(msg.content for msg in state["messages"])
+
+
+class SlidingWindowHistory(HistoryStrategy):
+    """Send only the most recent messages to the supervisor."""
+
+    def __init__(self, window: int = 6):
+        """Initialize the strategy.
+
+        Args:
+            window: Number of trailing messages to keep
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+
+    def render(self, state: AgentState) -> str:
+        """Join the content of the last ``window`` messages."""
+        messages = state["messages"]
+        recent = messages[-self.window:]
+        lines = [msg.content for msg in recent]
+        omitted = len(messages) - len(recent)
+        if omitted:
+            lines.insert(0, f"[{omitted} earlier messages omitted]")
+        return "\n".join(lines)
+
+
+class ResultSummaryHistory(HistoryStrategy):
+    """Send one line per agent with its latest result instead of the transcript."""
+
+    def __init__(self, max_chars_per_result: int = 500):
+        """Initialize the strategy.
+
+        Args:
+            max_chars_per_result: Results longer than this are truncated
+        """
+        self.max_chars_per_result = max_chars_per_result
+
+    def render(self, state: AgentState) -> str:
+        """Render the latest result of each agent that has run."""
+        task_result = state.get("task_result", {})
+        if not task_result:
+            return ""
+        lines = []
+        for agent_name, agent_result in task_result.items():
+            text = str(agent_result)
+            if len(text) > self.max_chars_per_result:
+                text = text[:self.max_chars_per_result] + "..."
+            lines.append(f"{agent_name} result: {text}")
+        return "\n".join(lines)
+
+
+class TokenBudgetHistory(HistoryStrategy):
+    """Send the most recent messages that fit within an estimated token budget."""
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        estimator: Callable[[str], int] = estimate_tokens,
+    ):
+        """Initialize the strategy.
+
+        Args:
+            max_tokens: Token budget for the rendered history
+            estimator: Function estimating the token count of a string
+        """
+        self.max_tokens = max_tokens
+        self.estimator = estimator
+
+    def render(self, state: AgentState) -> str:
+        """Walk back from the newest message until the budget is spent.
+
+        Only the messages that end up in the prompt are measured, so the cost
+        per supervisor turn is bounded by the budget rather than the run length.
+        """
+        messages = state["messages"]
+        kept = []
+        used = 0
+        for msg in reversed(messages):
+            cost = self.estimator(msg.content)
+            if kept and used + cost > self.max_tokens:
+                break
+            if not kept and cost > self.max_tokens:
+                # Always keep the newest message, trimmed to the budget
+                kept.append(msg.content[-self.max_tokens * CHARS_PER_TOKEN:])
+                used = self.max_tokens
+                continue
+            kept.append(msg.content)
+            used += cost
+        omitted = len(messages) - len(kept)
+        if omitted:
+            kept.append(f"[{omitted} earlier messages omitted]")
+        return "\n".join(reversed(kept))
@@ -0,0 +1,515 @@
+"""Per-run metrics for agent systems: latency, tokens, tool durations and hops."""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .streaming import agent_path
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR_NODE = "supervisor"
+
+METRICS_CONFIG_KEY = "langgroup_metrics"
+
+
+def locate(metadata: Optional[dict], node_agent_names: dict[str, str]) -> Optional[tuple[tuple, str]]:
+    """Return the ``(team_path, node_name)`` a callback event or node belongs to.
+
+    Args:
+        metadata: Callback or node config metadata carrying the LangGraph
+            checkpoint namespace
+        node_agent_names: Mapping of graph node names to agent names at
+            every nesting level
+
+    Returns:
+        The path of team names and the supervisor or agent node, or None for
+        events outside any team node
+    """
+    checkpoint_ns = (metadata or {}).get("langgraph_checkpoint_ns")
+    if not checkpoint_ns:
+        return None
+    namespace = checkpoint_ns.split("|")
+    if namespace[-1].split(":", 1)[0] == SUPERVISOR_NODE:
+        return agent_path(namespace[:-1], node_agent_names), SUPERVISOR_NODE
+    path = agent_path(namespace, node_agent_names)
+    if not path:
+        return None
+    return path[:-1], path[-1]
+
+
+@dataclass
+class NodeMetrics:
+    """Totals for the supervisor or one agent of a team."""
+    calls: int = 0
+    wall_time: float = 0.0
+    llm_calls: int = 0
+    llm_latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tool_durations: dict[str, list[float]] = field(default_factory=dict)
+
+    @property
+    def tool_calls(self) -> int:
+        """Number of tool calls made by the node."""
+        return sum(len(durations) for durations in self.tool_durations.values())
+
+    @property
+    def tool_time(self) -> float:
+        """Seconds spent in tool calls made by the node."""
+        return sum(sum(durations) for durations in self.tool_durations.values())
+
+
+@dataclass
+class TeamMetrics:
+    """Metrics for one level of the team hierarchy.
+
+    The top-level system has an empty path; each nested SupervisorAgent team
+    adds its name, so ``depth`` is the team's nesting depth. With speculative
+    routing, ``speculations`` counts agent calls started before the
+    supervisor's decision and ``speculation_hits`` those that were used; the
+    model usage and agent time of discarded calls are counted as wasted.
+    """
+    path: tuple[str, ...] = ()
+    hops: int = 0
+    nodes: dict[str, NodeMetrics] = field(default_factory=dict)
+    speculations: int = 0
+    speculation_hits: int = 0
+    speculation_wasted_tokens: int = 0
+    speculation_wasted_time: float = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Nesting depth of the team, 0 for the top-level system."""
+        return len(self.path)
+
+    def node(self, name: str) -> NodeMetrics:
+        """Return the metrics of a node, creating them if needed."""
+        if name not in self.nodes:
+            self.nodes[name] = NodeMetrics()
+        return self.nodes[name]
+
+
+@dataclass
+class RunMetrics:
+    """Metrics collected for one run, grouped by team."""
+    wall_time: float = 0.0
+    teams: dict[tuple[str, ...], TeamMetrics] = field(default_factory=dict)
+
+    def team(self, *path: str) -> TeamMetrics:
+        """Return the metrics of the team at ``path``, creating them if needed."""
+        if path not in self.teams:
+            self.teams[path] = TeamMetrics(path=path)
+        return self.teams[path]
+
+    @property
+    def hops(self) -> int:
+        """Agent hops across all teams."""
+        return sum(team.hops for team in self.teams.values())
+
+    @property
+    def max_depth(self) -> int:
+        """Deepest team nesting level reached."""
+        return max((team.depth for team in self.teams.values()), default=0)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Prompt tokens across all teams."""
+        return sum(node.prompt_tokens for _, _, node in self.iter_nodes())
+
+    @property
+    def completion_tokens(self) -> int:
+        """Completion tokens across all teams."""
+        return sum(node.completion_tokens for _, _, node in self.iter_nodes())
+
+    def iter_nodes(self):
+        """Yield ``(team_path, node_name, NodeMetrics)`` for every node."""
+        for path, team in self.teams.items():
+            for name, node in team.nodes.items():
+                yield path, name, node
+
+
+class MetricsRecorder(BaseCallbackHandler):
+    """Callback handler that records the metrics of a single run.
+
+    Events are attributed through their LangGraph checkpoint namespace, so
+    calls made inside nested SupervisorAgent teams land on the team and agent
+    that made them.
+    """
+
+    run_inline = True
+
+    def __init__(self, node_agent_names: dict[str, str]):
+        """Initialize the recorder.
+
+        Args:
+            node_agent_names: Mapping of graph node names to agent names at
+                every nesting level
+        """
+        self.node_agent_names = node_agent_names
+        self.metrics = RunMetrics()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._nodes: dict[UUID, tuple[tuple, str, float]] = {}
+        self._llm_calls: dict[UUID, tuple[tuple, str, float]] = {}
+        self._tool_calls: dict[UUID, tuple[tuple, str, str, float]] = {}
+        self._seen_tasks: set[str] = set()
+
+    def finish(self) -> RunMetrics:
+        """Stop the run clock and return the collected metrics."""
+        self.metrics.wall_time = time.perf_counter() - self._started
+        return self.metrics
+
+    def _locate(self, metadata: Optional[dict]) -> Optional[tuple[tuple, str]]:
+        """Return the ``(team_path, node_name)`` an event belongs to."""
+        return locate(metadata, self.node_agent_names)
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        node_name = metadata.get("langgraph_node")
+        checkpoint_ns = metadata.get("langgraph_checkpoint_ns", "")
+        if kwargs.get("name") != node_name or not checkpoint_ns.split("|")[-1].startswith(f"{node_name}:"):
+            return
+        if node_name != SUPERVISOR_NODE and node_name not in self.node_agent_names:
+            return
+        location = self._locate(metadata)
+        if location is None:
+            return
+        with self._lock:
+            # The node's task and the runnable inside it report the same namespace
+            if checkpoint_ns in self._seen_tasks:
+                return
+            self._seen_tasks.add(checkpoint_ns)
+            self._nodes[run_id] = (*location, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id)
+
+    def _end_node(self, run_id: UUID) -> None:
+        with self._lock:
+            started = self._nodes.pop(run_id, None)
+            if started is None:
+                return
+            team_path, node_name, start = started
+            team = self.metrics.team(*team_path)
+            node = team.node(node_name)
+            node.calls += 1
+            node.wall_time += time.perf_counter() - start
+            if node_name != SUPERVISOR_NODE:
+                team.hops += 1
+
+    def record_speculation(
+        self,
+        metadata: Optional[dict],
+        hit: bool,
+        llm_calls: int = 0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        elapsed: float = 0.0,
+    ) -> None:
+        """Record the outcome of a speculative agent call.
+
+        Args:
+            metadata: Metadata of the node settling the call: the agent node
+                that used it, or the supervisor node that discarded it
+            hit: Whether the call was used
+            llm_calls: Model calls made by the speculative call
+            prompt_tokens: Prompt tokens used by the speculative call
+            completion_tokens: Completion tokens used by the speculative call
+            elapsed: Seconds the call ran before it was used or discarded
+        """
+        location = self._locate(metadata)
+        if location is None:
+            return
+        team_path, node_name = location
+        with self._lock:
+            team = self.metrics.team(*team_path)
+            team.speculations += 1
+            if hit:
+                # The agent's model calls ran outside its node; credit them to it
+                team.speculation_hits += 1
+                node = team.node(node_name)
+                node.llm_calls += llm_calls
+                node.prompt_tokens += prompt_tokens
+                node.completion_tokens += completion_tokens
+            else:
+                team.speculation_wasted_tokens += prompt_tokens + completion_tokens
+                team.speculation_wasted_time += elapsed
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, metadata)
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, metadata)
+
+    def _start_llm(self, run_id: UUID, metadata: Optional[dict]) -> None:
+        location = self._locate(metadata)
+        if location is not None:
+            with self._lock:
+                self._llm_calls[run_id] = (*location, time.perf_counter())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = token_usage(response)
+        self._end_llm(run_id, prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_llm(run_id, 0, 0)
+
+    def _end_llm(self, run_id: UUID, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            started = self._llm_calls.pop(run_id, None)
+            if started is None:
+                return
+            team_path, node_name, start = started
+            node = self.metrics.team(*team_path).node(node_name)
+            node.llm_calls += 1
+            node.llm_latency += time.perf_counter() - start
+            node.prompt_tokens += prompt_tokens
+            node.completion_tokens += completion_tokens
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        location = self._locate(metadata)
+        if location is None:
+            return
+        tool_name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        with self._lock:
+            self._tool_calls[run_id] = (*location, tool_name, time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id)
+
+    def _end_tool(self, run_id: UUID) -> None:
+        with self._lock:
+            started = self._tool_calls.pop(run_id, None)
+            if started is None:
+                return
+            team_path, node_name, tool_name, start = started
+            node = self.metrics.team(*team_path).node(node_name)
+            node.tool_durations.setdefault(tool_name, []).append(time.perf_counter() - start)
+
+
+def token_usage(response: LLMResult) -> tuple[int, int]:
+    """Return ``(prompt_tokens, completion_tokens)`` reported for a model call."""
+    prompt_tokens = completion_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if not found:
+        reported = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = reported.get("prompt_tokens", 0)
+        completion_tokens = reported.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+class MetricsExporter(ABC):
+    """Abstract base class for destinations of finished run metrics."""
+
+    @abstractmethod
+    def export(self, metrics: RunMetrics) -> None:
+        """Receive the metrics of a finished run."""
+        pass
+
+
+class InMemoryExporter(MetricsExporter):
+    """Keep the metrics of recent runs in memory."""
+
+    def __init__(self, max_runs: Optional[int] = 1000):
+        """Initialize the exporter.
+
+        Args:
+            max_runs: Number of most recent runs to keep. None for unbounded.
+        """
+        self._runs: deque[RunMetrics] = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+
+    def export(self, metrics: RunMetrics) -> None:
+        with self._lock:
+            self._runs.append(metrics)
+
+    @property
+    def runs(self) -> list[RunMetrics]:
+        """Metrics of the kept runs, oldest first."""
+        with self._lock:
+            return list(self._runs)
+
+    def clear(self) -> None:
+        """Forget every kept run."""
+        with self._lock:
+            self._runs.clear()
+
+
+class PrometheusExporter(MetricsExporter):
+    """Aggregate run metrics into counters rendered in the Prometheus text format.
+
+    Serve ``render()`` from a ``/metrics`` endpoint or write it to a file for
+    the node exporter's textfile collector. Teams are labelled with their
+    path joined by "/", and "root" for the top-level system.
+    """
+
+    METRICS = {
+        "runs_total": ("counter", "Finished runs"),
+        "run_duration_seconds_total": ("counter", "Wall time of finished runs"),
+        "hops_total": ("counter", "Agent hops per team"),
+        "team_depth": ("gauge", "Nesting depth of each team"),
+        "node_calls_total": ("counter", "Node executions"),
+        "node_duration_seconds_total": ("counter", "Wall time spent in nodes"),
+        "llm_calls_total": ("counter", "LLM calls"),
+        "llm_latency_seconds_total": ("counter", "Time spent waiting for LLM calls"),
+        "prompt_tokens_total": ("counter", "Prompt tokens sent to LLMs"),
+        "completion_tokens_total": ("counter", "Completion tokens received from LLMs"),
+        "tool_calls_total": ("counter", "Tool calls"),
+        "tool_duration_seconds_total": ("counter", "Time spent in tool calls"),
+        "speculations_total": ("counter", "Agent calls started before the supervisor's decision"),
+        "speculation_hits_total": ("counter", "Speculative agent calls that were used"),
+        "speculation_wasted_tokens_total": ("counter", "Tokens used by discarded speculative calls"),
+        "speculation_wasted_seconds_total": ("counter", "Agent time spent on discarded speculative calls"),
+    }
+
+    def __init__(self, prefix: str = "langgroup"):
+        """Initialize the exporter.
+
+        Args:
+            prefix: Prefix of every metric name
+        """
+        self.prefix = prefix
+        self._values: dict[str, dict[tuple, float]] = {name: {} for name in self.METRICS}
+        self._lock = threading.Lock()
+
+    def export(self, metrics: RunMetrics) -> None:
+        with self._lock:
+            self._add("runs_total", (), 1)
+            self._add("run_duration_seconds_total", (), metrics.wall_time)
+            for path, team in metrics.teams.items():
+                team_label = (("team", "/".join(path) or "root"),)
+                self._add("hops_total", team_label, team.hops)
+                self._values["team_depth"][team_label] = team.depth
+                if team.speculations:
+                    self._add("speculations_total", team_label, team.speculations)
+                    self._add("speculation_hits_total", team_label, team.speculation_hits)
+                    self._add("speculation_wasted_tokens_total", team_label, team.speculation_wasted_tokens)
+                    self._add("speculation_wasted_seconds_total", team_label, team.speculation_wasted_time)
+                for node_name, node in team.nodes.items():
+                    labels = team_label + (("node", node_name),)
+                    self._add("node_calls_total", labels, node.calls)
+                    self._add("node_duration_seconds_total", labels, node.wall_time)
+                    self._add("llm_calls_total", labels, node.llm_calls)
+                    self._add("llm_latency_seconds_total", labels, node.llm_latency)
+                    self._add("prompt_tokens_total", labels, node.prompt_tokens)
+                    self._add("completion_tokens_total", labels, node.completion_tokens)
+                    for tool_name, durations in node.tool_durations.items():
+                        tool_labels = labels + (("tool", tool_name),)
+                        self._add("tool_calls_total", tool_labels, len(durations))
+                        self._add("tool_duration_seconds_total", tool_labels, sum(durations))
+
+    def _add(self, name: str, labels: tuple, value: float) -> None:
+        series = self._values[name]
+        series[labels] = series.get(labels, 0) + value
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text) in self.METRICS.items():
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+                for labels, value in sorted(self._values[name].items()):
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple) -> str:
+    """Format label pairs as ``{key="value",...}``."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, keeping integers free of a decimal point."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsCollector:
+    """Create per-run recorders and hand finished run metrics to exporters.
+
+    Attach one collector to an AgentSystem with ``metrics=``; each run then
+    returns its RunMetrics under ``result["metrics"]``.
+    """
+
+    def __init__(self, exporters: Optional[list[MetricsExporter]] = None):
+        """Initialize the collector.
+
+        Args:
+            exporters: Exporters that receive the metrics of every finished run
+        """
+        self.exporters = list(exporters or [])
+
+    def start_run(self, node_agent_names: dict[str, str]) -> MetricsRecorder:
+        """Return a recorder for a new run; pass it as a callback of the run."""
+        return MetricsRecorder(node_agent_names)
+
+    def finish_run(self, recorder: MetricsRecorder) -> RunMetrics:
+        """Finish a run's metrics and export them."""
+        metrics = recorder.finish()
+        for exporter in self.exporters:
+            try:
+                exporter.export(metrics)
+            except Exception as e:
+                logger.warning(f"⚠️ Metrics exporter {type(exporter).__name__} failed: {e}")
+        return metrics
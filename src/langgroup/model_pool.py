@@ -0,0 +1,287 @@
+"""Shared, rate-limited model clients with priority between routing and agent calls."""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from .metrics import token_usage
+
+logger = logging.getLogger(__name__)
+
+ROUTING = 0
+AGENT = 1
+
+POLL_INTERVAL = 0.05
+
+_call_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "langgroup_call_priority", default=AGENT
+)
+
+
+@contextmanager
+def call_priority(priority: int) -> Iterator[None]:
+    """Run model calls made in this context at ``priority``; lower values go first."""
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+@dataclass
+class ModelLimits:
+    """Provider quota for one model. None disables a limit.
+
+    Attributes:
+        requests_per_minute: Requests allowed per minute
+        tokens_per_minute: Prompt and completion tokens allowed per minute.
+            A call's tokens are charged when it returns, so a large call can
+            leave the bucket in debt and delay the calls after it.
+        burst_seconds: Seconds of quota that may be spent at once after an
+            idle period. Small values pace requests evenly.
+        backoff: Seconds to pause all calls to the model after the provider
+            reports a rate limit error
+    """
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    burst_seconds: float = 1.0
+    backoff: float = 1.0
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available; 0 if they are now."""
+        return max(amount - self.tokens, 0.0) / self.rate
+
+
+class PriorityRateLimiter(BaseRateLimiter):
+    """Rate limiter enforcing request and token buckets, serving waiters by priority.
+
+    Callers waiting for capacity are served in order of their
+    ``call_priority``, then arrival, so supervisor routing calls are not
+    starved by a backlog of agent calls. Chat models call ``acquire`` before
+    each request when this limiter is their ``rate_limiter``.
+    """
+
+    def __init__(self, limits: ModelLimits):
+        """Initialize the limiter.
+
+        Args:
+            limits: Quota to enforce
+        """
+        self.limits = limits
+        self.requests = self._bucket(limits.requests_per_minute, limits.burst_seconds, minimum=1.0)
+        self.tokens = self._bucket(limits.tokens_per_minute, limits.burst_seconds, minimum=0.0)
+        self.paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _bucket(
+        per_minute: Optional[float], burst_seconds: float, minimum: float
+    ) -> Optional[TokenBucket]:
+        """Build a bucket holding ``burst_seconds`` of a per-minute quota, or None if unlimited."""
+        if per_minute is None:
+            return None
+        rate = per_minute / 60
+        return TokenBucket(rate, max(rate * burst_seconds, minimum))
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        ticket = self._enqueue()
+        try:
+            with self._condition:
+                while True:
+                    delay = self._try_take(ticket)
+                    if delay == 0:
+                        return True
+                    if not blocking:
+                        self._dequeue(ticket)
+                        return False
+                    self._condition.wait(delay)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        ticket = self._enqueue()
+        try:
+            while True:
+                with self._condition:
+                    delay = self._try_take(ticket)
+                    if delay == 0:
+                        return True
+                    if not blocking:
+                        self._dequeue(ticket)
+                        return False
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def _enqueue(self) -> tuple[int, int]:
+        ticket = (_call_priority.get(), next(self._counter))
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: tuple[int, int]) -> None:
+        self._waiters.remove(ticket)
+        heapq.heapify(self._waiters)
+        self._condition.notify_all()
+
+    def _abandon(self, ticket: tuple[int, int]) -> None:
+        """Take an interrupted waiter out of line, so it does not block the callers behind it."""
+        with self._condition:
+            if ticket in self._waiters:
+                self._dequeue(ticket)
+
+    def _try_take(self, ticket: tuple[int, int]) -> float:
+        """Take capacity for ``ticket`` if it is first in line; return 0 or seconds to wait.
+
+        Must be called with the condition held.
+        """
+        if self._waiters[0] != ticket:
+            return POLL_INTERVAL
+        now = time.monotonic()
+        delay = self.paused_until - now
+        if self.requests is not None:
+            self.requests.refill(now)
+            delay = max(delay, self.requests.wait_time(1.0))
+        if self.tokens is not None:
+            self.tokens.refill(now)
+            # Calls are charged when they return, so one only needs the bucket out of debt
+            delay = max(delay, self.tokens.wait_time(0.0))
+        if delay > 0:
+            return delay
+        if self.requests is not None:
+            self.requests.tokens -= 1
+        heapq.heappop(self._waiters)
+        self._condition.notify_all()
+        return 0
+
+    def record_tokens(self, count: int) -> None:
+        """Charge the tokens a finished call used."""
+        if self.tokens is None or not count:
+            return
+        with self._condition:
+            self.tokens.refill(time.monotonic())
+            self.tokens.tokens -= count
+
+    def pause(self, seconds: float) -> None:
+        """Hold all calls for ``seconds``, e.g. after the provider rejected one."""
+        with self._condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True for provider errors that signal a rate limit (HTTP 429)."""
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+class RateLimitHandler(BaseCallbackHandler):
+    """Callback handler that reports a pooled model's token use and 429s to its limiter."""
+
+    run_inline = True
+
+    def __init__(self, limiter: PriorityRateLimiter):
+        self.limiter = limiter
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = token_usage(response)
+        self.limiter.record_tokens(prompt_tokens + completion_tokens)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        if is_rate_limit_error(error):
+            logger.warning(f"⚠️ Rate limited by provider, pausing for {self.limiter.limits.backoff}s")
+            self.limiter.pause(self.limiter.limits.backoff)
+
+
+def model_name(llm: Any) -> str:
+    """Return the provider model name of a chat model, or its class name."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+class ModelPool:
+    """Shared chat model clients with per-model rate limits.
+
+    Every agent and supervisor of an AgentSystem created with a pool,
+    including nested teams, calls the pool's copy of its model. One limiter
+    per model name is shared by all copies, so the system as a whole stays
+    within the provider quota. Copies reuse the HTTP client of the model they
+    were made from, so calls share its connection pool.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, ModelLimits]] = None,
+        default_limits: Optional[ModelLimits] = None,
+    ):
+        """Initialize the pool.
+
+        Args:
+            limits: Quotas by model name, e.g. ``{"gpt-4o-mini": ModelLimits(...)}``
+            default_limits: Quota for models without an entry in ``limits``;
+                None leaves them unlimited
+        """
+        self.limits = limits or {}
+        self.default_limits = default_limits
+        self.limiters: Dict[str, PriorityRateLimiter] = {}
+        # Pooled copies by id of the original model, kept with the original so
+        # that its id cannot be reused by another model
+        self._models: Dict[int, tuple[BaseChatModel, BaseChatModel]] = {}
+        self._pooled: set[int] = set()
+        self._lock = threading.Lock()
+
+    def get(self, llm: BaseChatModel) -> BaseChatModel:
+        """Return the pool's shared, rate-limited copy of ``llm``."""
+        with self._lock:
+            if id(llm) in self._pooled:
+                return llm
+            if id(llm) not in self._models:
+                pooled = self._make_pooled(llm)
+                self._models[id(llm)] = (llm, pooled)
+                self._pooled.add(id(pooled))
+            return self._models[id(llm)][1]
+
+    def _make_pooled(self, llm: BaseChatModel) -> BaseChatModel:
+        """Copy ``llm`` with the limiter for its model attached."""
+        name = model_name(llm)
+        limits = self.limits.get(name, self.default_limits)
+        if limits is None:
+            return llm
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            limiter = self.limiters[name] = PriorityRateLimiter(limits)
+        callbacks = llm.callbacks if isinstance(llm.callbacks, list) else []
+        return llm.model_copy(update={
+            "rate_limiter": limiter,
+            "callbacks": [*callbacks, RateLimitHandler(limiter)],
+        })
@@ -1,10 +1,106 @@
 """Data models for the multiagent system."""
-from typing import Literal, TypedDict
+import uuid
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Optional, TypedDict
 from pydantic import BaseModel, Field
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, RemoveMessage
+from langgraph.graph.message import add_messages
 
+try:
+    from langgraph.channels.delta import DeltaChannel
+except ImportError:  # LangGraph releases without delta channels
+    DeltaChannel = None
 
 
+def _fresh(right: Any) -> bool:
+    """Return whether ``right`` is a list of new messages that have no id yet."""
+    return isinstance(right, list) and all(
+        isinstance(msg, BaseMessage) and msg.id is None for msg in right
+    )
+
+
+def _assign_ids(messages: list[BaseMessage]) -> None:
+    """Give fresh messages an id so later updates and removals can target them."""
+    for msg in messages:
+        msg.id = str(uuid.uuid4())
+
+
+def append_messages(left: list[BaseMessage], right: list[BaseMessage]) -> list[BaseMessage]:
+    """Append new messages to the conversation.
+
+    Fresh messages (no id yet) are the common case for agent results and are
+    appended directly. Anything else, such as updates to existing messages or
+    ``RemoveMessage`` entries, is handled by LangGraph's ``add_messages``.
+    The old list is left untouched, as a plain reducer channel shares it
+    with its copies.
+    """
+    if _fresh(right):
+        _assign_ids(right)
+        return (left or []) + right
+    return add_messages(left or [], right)
+
+
+def append_message_batches(
+    left: list[BaseMessage], writes: list[list[BaseMessage]]
+) -> list[BaseMessage]:
+    """Apply a batch of message writes in order, as a delta channel reducer.
+
+    The previous list may already be in a caller's hands through
+    ``stream(stream_mode="values")`` or ``get_state``, so it is copied once per
+    batch and never changed. New messages, whether fresh or already given an
+    id by LangGraph, are appended to that copy; only updates to existing
+    messages and ``RemoveMessage`` entries go through ``add_messages``.
+    """
+    messages = list(left) if left else []
+    known: Optional[set] = None
+    for right in writes:
+        if _fresh(right):
+            _assign_ids(right)
+            messages.extend(right)
+            if known is not None:
+                known.update(msg.id for msg in right)
+            continue
+        if isinstance(right, list) and all(
+            isinstance(msg, BaseMessage) and not isinstance(msg, RemoveMessage) and msg.id
+            for msg in right
+        ):
+            if known is None:
+                known = {msg.id for msg in messages}
+            ids = [msg.id for msg in right]
+            if len(set(ids)) == len(ids) and known.isdisjoint(ids):
+                messages.extend(right)
+                known.update(ids)
+                continue
+        messages = add_messages(messages, right)
+        known = None
+    return messages
+
+
+# With a delta channel, checkpoints store each step's new messages instead of
+# the whole conversation, so checkpoint size grows linearly with the run
+MessagesReducer = DeltaChannel(append_message_batches) if DeltaChannel is not None else append_messages
+
+
+def merge_task_results(left: dict, right: dict) -> dict:
+    """Merge agent results, letting newer results replace older ones."""
+    if not right:
+        return left
+    if not left:
+        return right
+    return {**left, **right}
+
+
+def merge_agent_results(left: dict, right: dict) -> dict:
+    """Merge results recorded per agent and request, keeping those of earlier requests."""
+    if not right:
+        return left
+    if not left:
+        return right
+    merged = dict(left)
+    for agent_name, results in right.items():
+        merged[agent_name] = {**merged.get(agent_name, {}), **results}
+    return merged
+
 
 class RouteDecision(BaseModel):
     """Decision made by the supervisor about which agent to route to next."""
@@ -12,10 +108,103 @@ class RouteDecision(BaseModel):
         description="The name of the agent to handle the next step, or 'finish' if task is complete"
     )
     reasoning: str = Field(description="Brief explanation of why this agent was chosen")
+    instruction: str = Field(
+        default="",
+        description="A specific, self-contained instruction for the chosen agent's next step"
+    )
+    context_agents: list[str] = Field(
+        default_factory=list,
+        description="Names of agents whose earlier results the chosen agent needs for this step"
+    )
+
+
+class AgentTask(BaseModel):
+    """A subtask assigned to a single agent."""
+    agent: str = Field(description="The exact name of the agent to run")
+    task: str = Field(description="A self-contained description of the work for this agent")
+
+
+class MultiRouteDecision(BaseModel):
+    """Decision made by the supervisor about which agents to run next, possibly in parallel."""
+    routes: list[AgentTask] = Field(
+        default_factory=list,
+        description="Agents to run next with their subtasks; an empty list if the task is complete"
+    )
+    reasoning: str = Field(description="Brief explanation of why these agents were chosen")
+
+
+class PlanStep(AgentTask):
+    """A step of a supervisor plan: a subtask for one agent and the steps it depends on."""
+    id: str = Field(description="A short unique identifier for this step, e.g. '1'")
+    depends_on: list[str] = Field(
+        default_factory=list,
+        description="Identifiers of the steps whose results this step needs; empty if none"
+    )
+
+
+class TaskPlan(BaseModel):
+    """Plan made by the supervisor: the agent steps for the whole task and their dependencies."""
+    steps: list[PlanStep] = Field(
+        default_factory=list,
+        description="Steps that complete the task; steps without a dependency between them run in parallel"
+    )
+    reasoning: str = Field(description="Brief explanation of the plan")
 
 
 class AgentState(TypedDict):
-    """State that will be passed between agents in the workflow."""
-    messages: list[BaseMessage]
+    """State that will be passed between agents in the workflow.
+
+    ``messages`` and ``task_result`` use reducers, so nodes return only the
+    messages and results they add rather than copies of the full state.
+    Checkpoints store ``messages`` as deltas where LangGraph supports it.
+    ``routes`` holds the subtasks chosen by a parallel routing decision.
+    ``instruction`` and ``context_agents`` hold the supervisor's instruction
+    for the next agent and the agents whose results it needs.
+    ``plan`` holds the steps of the current plan in plan mode, with
+    ``step_results`` and ``failed_steps`` keyed by step id and ``replans``
+    counting the plans made after the first.
+    ``agent_results`` holds every result of each agent in the run keyed by
+    its normalized request, for reusing results within a run.
+    ``stop_reason`` is set when a run ends early, e.g. on a budget limit.
+    """
+    messages: Annotated[list[BaseMessage], MessagesReducer]
     next: str
-    task_result: dict
+    task_result: Annotated[dict, merge_task_results]
+    routes: list[AgentTask]
+    instruction: str
+    context_agents: list[str]
+    plan: list[PlanStep]
+    step_results: Annotated[dict, merge_task_results]
+    failed_steps: Annotated[dict, merge_task_results]
+    replans: int
+    agent_results: Annotated[dict, merge_agent_results]
+    stop_reason: str
+
+
+@dataclass
+class TaskOutcome:
+    """Outcome of a single task from a batch run."""
+    index: int
+    task: str
+    result: Optional[dict] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the task completed without raising."""
+        return self.error is None
+
+
+@dataclass
+class StreamEvent:
+    """An event produced while streaming a run.
+
+    ``type`` is one of "supervisor_decision", "agent_start", "agent_end",
+    "tool_start", "tool_end", "token" or "final". ``path`` lists the nested
+    SupervisorAgent teams the event came from, outermost first, and is empty
+    for the top-level system.
+    """
+    type: str
+    path: tuple[str, ...] = ()
+    agent: Optional[str] = None
+    data: dict[str, Any] = field(default_factory=dict)
@@ -0,0 +1,268 @@
+"""Cheap routers that decide obvious routes before the supervisor LLM is consulted."""
+import logging
+import math
+import re
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from .models import AgentState, RouteDecision
+
+logger = logging.getLogger(__name__)
+
+LLM_TIER = "llm"
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me of on or please "
+    "the this to use what with you".split()
+)
+
+
+@dataclass
+class RouteMatch:
+    """An agent chosen by a router, with the router's confidence in [0, 1]."""
+    agent: str
+    confidence: float
+    tier: str
+
+
+class Router(ABC):
+    """Abstract base class for a routing tier."""
+
+    name: str = "router"
+
+    def prepare(self, agents: list) -> None:
+        """Precompute per-agent data before the first request. Optional."""
+        pass
+
+    @abstractmethod
+    def match(self, task: str, agents: list) -> Optional[RouteMatch]:
+        """Return the best agent for ``task``, or None when the router has no opinion."""
+        pass
+
+
+class RuleRouter(Router):
+    """Route a task to the only agent whose ``routing_rules`` match it.
+
+    Rules are regular expressions matched case-insensitively anywhere in the
+    task. A match by exactly one agent is fully confident; matches by several
+    agents are ambiguous and leave the decision to the next tier.
+    """
+
+    name = "rules"
+
+    def __init__(self):
+        self._patterns: dict[str, list[re.Pattern]] = {}
+
+    def prepare(self, agents: list) -> None:
+        for agent in agents:
+            self._compiled(agent)
+
+    def _compiled(self, agent) -> list[re.Pattern]:
+        """Return the agent's compiled rules."""
+        patterns = self._patterns.get(agent.name)
+        if patterns is None:
+            patterns = [
+                rule if isinstance(rule, re.Pattern) else re.compile(rule, re.IGNORECASE)
+                for rule in getattr(agent, "routing_rules", [])
+            ]
+            self._patterns[agent.name] = patterns
+        return patterns
+
+    def match(self, task: str, agents: list) -> Optional[RouteMatch]:
+        matched = [
+            agent.name for agent in agents
+            if any(pattern.search(task) for pattern in self._compiled(agent))
+        ]
+        if len(matched) != 1:
+            return None
+        return RouteMatch(matched[0], 1.0, self.name)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word stems, dropping stopwords.
+
+    Words are cut to their first five letters, a crude stemmer that lets
+    "calculate" match "calculations".
+    """
+    return [word[:5] for word in re.findall(r"[a-z]+", text.lower()) if word not in STOPWORDS]
+
+
+def hashed_embedding(text: str, dims: int = 512) -> list[float]:
+    """Embed text as a hashed bag of word stems. Needs no model or network access."""
+    vector = [0.0] * dims
+    for token in tokenize(text):
+        vector[zlib.crc32(token.encode("utf-8")) % dims] += 1.0
+    return vector
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """Return the cosine similarity of two vectors, 0 when either is all zeros."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class EmbeddingRouter(Router):
+    """Route a task to the agent whose description is most similar to it.
+
+    Description vectors are computed once per agent. Confidence is the
+    relative margin between the best and second best similarity, so a task
+    that resembles two agents equally is left to the next tier.
+    """
+
+    name = "embedding"
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]] = hashed_embedding,
+        min_similarity: float = 0.1,
+        max_cached_tasks: int = 1024,
+    ):
+        """Initialize the router.
+
+        Args:
+            embed: Function mapping text to a vector. Defaults to a local
+                hashed bag of words; any embedding model's ``embed_query``
+                can be used instead.
+            min_similarity: Best similarity below which the router has no opinion
+            max_cached_tasks: Number of task vectors kept for repeated lookups
+        """
+        self.embed = embed
+        self.min_similarity = min_similarity
+        self.max_cached_tasks = max_cached_tasks
+        self._descriptions: dict[str, tuple[str, Sequence[float]]] = {}
+        self._tasks: OrderedDict[str, Sequence[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prepare(self, agents: list) -> None:
+        for agent in agents:
+            self._description_vector(agent)
+
+    def _description_vector(self, agent) -> Sequence[float]:
+        """Return the agent's description vector, recomputing it if the description changed."""
+        description = agent.description
+        cached = self._descriptions.get(agent.name)
+        if cached is None or cached[0] != description:
+            cached = (description, self.embed(description))
+            self._descriptions[agent.name] = cached
+        return cached[1]
+
+    def _task_vector(self, task: str) -> Sequence[float]:
+        """Return the vector of a task, reusing it across the run's supervisor turns."""
+        with self._lock:
+            vector = self._tasks.get(task)
+            if vector is not None:
+                self._tasks.move_to_end(task)
+                return vector
+        vector = self.embed(task)
+        with self._lock:
+            self._tasks[task] = vector
+            while len(self._tasks) > self.max_cached_tasks:
+                self._tasks.popitem(last=False)
+        return vector
+
+    def match(self, task: str, agents: list) -> Optional[RouteMatch]:
+        if not agents:
+            return None
+        task_vector = self._task_vector(task)
+        scores = sorted(
+            ((cosine_similarity(task_vector, self._description_vector(agent)), agent.name) for agent in agents),
+            reverse=True,
+        )
+        best, best_agent = scores[0]
+        if best < self.min_similarity:
+            return None
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        return RouteMatch(best_agent, (best - runner_up) / best, self.name)
+
+
+class TieredRouter:
+    """Try cheap routers in order and fall back to the supervisor LLM when none is confident.
+
+    The first tier whose match reaches ``threshold`` decides the route. Once
+    the chosen agent has returned a result, the LLM decides what happens
+    next, since a task may need further steps that no rule matched. With
+    ``finish_on_result`` set, the router finishes the run instead, which
+    suits systems that only receive routine single-agent requests. ``stats`` counts how often each tier decided, with "llm"
+    counting the supervisor calls that were still needed.
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[list[Router]] = None,
+        threshold: float = 0.6,
+        finish_on_result: bool = False,
+    ):
+        """Initialize the router.
+
+        Args:
+            tiers: Routers to try in order. Defaults to rules, then embeddings.
+            threshold: Minimum confidence for a tier to decide
+            finish_on_result: Finish once the chosen agent has answered
+                instead of asking the LLM. Only safe when tasks never need
+                more than the one routed agent.
+        """
+        self.tiers = tiers if tiers is not None else [RuleRouter(), EmbeddingRouter()]
+        self.threshold = threshold
+        self.finish_on_result = finish_on_result
+        self._stats: dict[str, int] = {tier.name: 0 for tier in self.tiers}
+        self._stats[LLM_TIER] = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Number of decisions made by each tier."""
+        with self._lock:
+            return dict(self._stats)
+
+    def prepare(self, agents: list) -> None:
+        """Precompute every tier's per-agent data."""
+        for tier in self.tiers:
+            tier.prepare(agents)
+
+    def match(self, task: str, agents: list) -> Optional[RouteMatch]:
+        """Return the first confident match across tiers."""
+        for tier in self.tiers:
+            match = tier.match(task, agents)
+            if match is not None and match.confidence >= self.threshold:
+                return match
+        return None
+
+    def decide(self, state: AgentState, agents: list) -> Optional[RouteDecision]:
+        """Return a routing decision, or None when the supervisor LLM must decide.
+
+        Args:
+            state: Current agent state
+            agents: Agents available to the supervisor
+
+        Returns:
+            A decision for the next agent or "finish", or None
+        """
+        messages = state["messages"]
+        task = str(messages[0].content) if messages else ""
+        match = self.match(task, agents)
+        if match is None:
+            self._count(LLM_TIER)
+            return None
+        if match.agent not in state.get("task_result", {}):
+            decision = RouteDecision(
+                next_agent=match.agent,
+                reasoning=f"Routed by the {match.tier} tier with confidence {match.confidence:.2f}",
+            )
+        elif self.finish_on_result:
+            decision = RouteDecision(
+                next_agent="finish",
+                reasoning=f"{match.agent} has answered the request routed by the {match.tier} tier",
+            )
+        else:
+            self._count(LLM_TIER)
+            return None
+        self._count(match.tier)
+        return decision
+
+    def _count(self, tier: str) -> None:
+        with self._lock:
+            self._stats[tier] = self._stats.get(tier, 0) + 1
@@ -0,0 +1,181 @@
+"""Speculative routing: start the likely next agent while the supervisor decides."""
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional, Union
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .metrics import token_usage
+from .models import AgentState
+
+logger = logging.getLogger(__name__)
+
+SPECULATION_CONFIG_KEY = "langgroup_speculation"
+
+START = "__start__"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def speculation_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool that runs speculative agent calls of sync runs."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(thread_name_prefix="langgroup-speculation")
+    return _executor
+
+
+def previous_agent(state: AgentState) -> str:
+    """Return the agent that produced the last result, or START before the first hop."""
+    for msg in reversed(state["messages"]):
+        if msg.name:
+            return msg.name
+    return START
+
+
+class SpeculationPredictor(ABC):
+    """Abstract base class for predicting the supervisor's next routing decision."""
+
+    @abstractmethod
+    def predict(self, state: AgentState) -> Optional[str]:
+        """Return the agent worth starting before the supervisor decides, or None."""
+        pass
+
+    def observe(self, state: AgentState, next_agent: str) -> None:
+        """Learn from the supervisor's actual decision for ``state``."""
+        pass
+
+
+class TransitionPredictor(SpeculationPredictor):
+    """Predict the next agent from how often each agent has followed the previous one.
+
+    Transitions are counted across all runs of the system, including
+    decisions to finish. An agent is predicted once it has followed the
+    previous agent in at least ``threshold`` of at least ``min_observations``
+    decisions.
+    """
+
+    def __init__(self, threshold: float = 0.6, min_observations: int = 3):
+        """Initialize the predictor.
+
+        Args:
+            threshold: Share of past decisions the prediction must account for.
+                Lower values speculate more often and waste more calls.
+            min_observations: Decisions to observe after an agent before
+                predicting what follows it
+        """
+        self.threshold = threshold
+        self.min_observations = min_observations
+        self._transitions: dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def predict(self, state: AgentState) -> Optional[str]:
+        with self._lock:
+            counts = self._transitions.get(previous_agent(state))
+            if not counts:
+                return None
+            total = sum(counts.values())
+            next_agent, count = counts.most_common(1)[0]
+        if total < self.min_observations or count / total < self.threshold or next_agent == "finish":
+            return None
+        return next_agent
+
+    def observe(self, state: AgentState, next_agent: str) -> None:
+        with self._lock:
+            self._transitions[previous_agent(state)][next_agent] += 1
+
+    def transitions(self) -> dict[str, dict[str, int]]:
+        """Return the observed transition counts by previous agent."""
+        with self._lock:
+            return {agent: dict(counts) for agent, counts in self._transitions.items()}
+
+
+class TokenCounter(BaseCallbackHandler):
+    """Callback handler that counts the model calls and tokens of a speculative call."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = token_usage(response)
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+
+class Speculation:
+    """An agent call started before the supervisor's decision."""
+
+    def __init__(
+        self,
+        agent_name: str,
+        agent_input: str,
+        future: Union[Future, asyncio.Future],
+        counter: TokenCounter,
+    ):
+        """Initialize the speculation.
+
+        Args:
+            agent_name: Agent the call was made to
+            agent_input: Request the agent was given
+            future: The running call, a thread pool future or an asyncio task
+            counter: Callback counting the call's model usage
+        """
+        self.agent_name = agent_name
+        self.agent_input = agent_input
+        self.future = future
+        self.counter = counter
+        self.started = time.perf_counter()
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.agent_name, self.agent_input
+
+    def result(self) -> dict:
+        """Wait for the call and return the agent's output."""
+        return self.future.result()
+
+    async def aresult(self) -> dict:
+        """Asynchronously wait for the call and return the agent's output."""
+        if isinstance(self.future, Future):
+            return await asyncio.wrap_future(self.future)
+        return await self.future
+
+    def cancel(self) -> None:
+        """Cancel the call. A call already running in a thread finishes unobserved."""
+        self.future.cancel()
+
+
+class SpeculationStore:
+    """Speculative calls of one run, waiting to be adopted by their agent node."""
+
+    def __init__(self):
+        self._pending: dict[tuple[str, str], Speculation] = {}
+        self._lock = threading.Lock()
+
+    def add(self, speculation: Speculation) -> None:
+        with self._lock:
+            previous = self._pending.pop(speculation.key, None)
+            self._pending[speculation.key] = speculation
+        if previous is not None:
+            previous.cancel()
+
+    def pop(self, agent_name: str, agent_input: str) -> Optional[Speculation]:
+        """Remove and return the speculative call matching an agent request, if any."""
+        with self._lock:
+            return self._pending.pop((agent_name, agent_input), None)
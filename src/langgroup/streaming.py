@@ -0,0 +1,129 @@
+"""Streaming events emitted while an agent system runs."""
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langgraph.config import get_config, get_stream_writer
+
+from .models import StreamEvent
+
+SUPERVISOR_DECISION = "supervisor_decision"
+AGENT_START = "agent_start"
+AGENT_END = "agent_end"
+TOOL_START = "tool_start"
+TOOL_END = "tool_end"
+TOKEN = "token"
+FINAL = "final"
+
+TRACE_CONFIG_KEY = "langgroup_trace"
+
+
+def emit(event_type: str, agent: Optional[str] = None, **data: Any) -> None:
+    """Send a custom stream event from inside a workflow node.
+
+    Does nothing when called outside a running workflow. Events of traced
+    runs are also written to the run's trace.
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return
+    event = {"type": event_type, "agent": agent, "data": data}
+    tracer = (config.get("configurable") or {}).get(TRACE_CONFIG_KEY)
+    if tracer is not None:
+        tracer.record_event(config.get("metadata"), event)
+    get_stream_writer()(event)
+
+
+def agent_path(namespace: tuple, node_agent_names: dict[str, str]) -> tuple[str, ...]:
+    """Map a LangGraph namespace of ``node:task_id`` entries to agent names.
+
+    Entries for nodes that do not run an agent (the supervisor, or the
+    internal nodes of a leaf agent's graph) are skipped.
+    """
+    path = []
+    for entry in namespace:
+        node_name = entry.split(":", 1)[0]
+        agent_name = node_agent_names.get(node_name)
+        if agent_name is not None:
+            path.append(agent_name)
+    return tuple(path)
+
+
+class StreamTranslator:
+    """Translate LangGraph stream chunks into StreamEvents.
+
+    LangGraph reports nested graphs with a namespace of ``node:task_id``
+    entries. Each node name is mapped back to the agent it runs, so events
+    from nested SupervisorAgent teams carry the path of team names.
+    """
+
+    def __init__(self, node_agent_names: dict[str, str]):
+        """Initialize the translator.
+
+        Args:
+            node_agent_names: Mapping of graph node names to agent names at
+                every nesting level
+        """
+        self.node_agent_names = node_agent_names
+        self.result: Optional[dict] = None
+
+    def translate(self, namespace: tuple, mode: str, chunk: Any) -> list[StreamEvent]:
+        """Translate one ``(namespace, mode, chunk)`` item from a subgraph stream."""
+        path = self._path(namespace)
+        if mode == "custom":
+            return [StreamEvent(chunk["type"], path, chunk.get("agent"), chunk.get("data", {}))]
+        if mode == "values":
+            if not namespace:
+                self.result = chunk
+            return []
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "supervisor":
+                return []
+            if not isinstance(message, (AIMessageChunk, AIMessage)) or not message.text:
+                return []
+            # The checkpoint namespace locates the model call even when the
+            # subgraph namespace does not (async model calls on Python < 3.11)
+            checkpoint_ns = metadata.get("langgraph_checkpoint_ns")
+            if checkpoint_ns:
+                path = self._path(tuple(checkpoint_ns.split("|")))
+            if not path:
+                return []
+            return [StreamEvent(TOKEN, path[:-1], path[-1], {"content": message.text})]
+        if mode == "updates" and path:
+            # Updates from inside a leaf agent's own graph carry its tool calls
+            return self._tool_events(path[:-1], path[-1], chunk)
+        return []
+
+    def final_event(self) -> StreamEvent:
+        """Return the event carrying the run's final state."""
+        return StreamEvent(FINAL, (), None, {"result": self.result})
+
+    def _path(self, namespace: tuple) -> tuple[str, ...]:
+        """Map a LangGraph namespace to agent names."""
+        return agent_path(namespace, self.node_agent_names)
+
+    @staticmethod
+    def _tool_events(team_path: tuple, agent: str, update: Any) -> list[StreamEvent]:
+        """Extract tool calls and tool results from a leaf agent's node updates."""
+        events = []
+        if not isinstance(update, dict):
+            return events
+        for node_update in update.values():
+            if not isinstance(node_update, dict):
+                continue
+            for message in node_update.get("messages", []):
+                if isinstance(message, AIMessage):
+                    for tool_call in message.tool_calls:
+                        events.append(StreamEvent(TOOL_START, team_path, agent, {
+                            "tool": tool_call["name"],
+                            "args": tool_call["args"],
+                            "id": tool_call["id"],
+                        }))
+                elif isinstance(message, ToolMessage):
+                    events.append(StreamEvent(TOOL_END, team_path, agent, {
+                        "tool": message.name,
+                        "output": message.content,
+                        "id": message.tool_call_id,
+                    }))
+        return events
@@ -1,30 +1,133 @@
 """Supervisor agent for coordinating sub-agents."""
 import logging
+from typing import Optional
 
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import HumanMessage
-from langchain_core.prompts import ChatPromptTemplate
-from .models import AgentState, RouteDecision
+from langchain_core.messages import HumanMessage, SystemMessage
+from .batching import get_active_batcher
+from .cache import ResponseCache, make_cache_key, model_identity
+from .history import FullHistory, HistoryStrategy
+from .model_pool import ROUTING, call_priority
+from .models import AgentState, MultiRouteDecision, RouteDecision, TaskPlan
+from .routing import TieredRouter
+from .streaming import SUPERVISOR_DECISION, emit
 from .agents.base_agent import BaseAgent
-from .agents.supervisor_agent import SupervisorAgent
 
 logger = logging.getLogger(__name__)
 
+HUMAN_PROMPT = """Task: {task}
+
+Conversation history:
+{history}
+
+Decide which agent should act next or if we should FINISH."""
+
+
+PLAN_HUMAN_PROMPT = """Task: {task}
+
+Conversation history:
+{history}
+
+{feedback}Plan the steps that remain to complete the task."""
+
+# Kinds of supervisor decision, each with its own system prompt
+ROUTE = "route"
+PARALLEL = "parallel"
+PLAN = "plan"
+
+
+def build_system_prompt(
+    agent_descriptions: str, mode: str = ROUTE, instructions: bool = True
+) -> str:
+    """Build the supervisor system prompt for a team.
+
+    Args:
+        agent_descriptions: One "- name: description" line per agent
+        mode: ROUTE to choose one agent per turn, PARALLEL to choose several
+            agents at once or PLAN to plan all steps up front
+        instructions: Whether ROUTE decisions should carry an instruction and
+            context agents, i.e. whether the handoff strategy uses them
+    """
+    if mode == PARALLEL:
+        delegate_rule = (
+            "Choose the agents to perform the next actions using their exact names from the list above. "
+            "Choose several agents only when their subtasks are independent of each other, "
+            "and give each agent a self-contained subtask."
+        )
+        finish_rule = "return an empty list of routes"
+        job = "Your job is to decide which agents should act next and what each should do, or return no routes when the entire task is complete."
+    elif mode == PLAN:
+        delegate_rule = (
+            "Plan every remaining step at once. Assign each step to the best agent using their exact name from the list above, "
+            "give it a self-contained subtask and a short unique id, and list the ids of the steps whose results it needs. "
+            "Steps that do not depend on each other run in parallel."
+        )
+        finish_rule = "return an empty list of steps"
+        job = "Your job is to return the steps that complete the task and their dependencies, or no steps when the entire task is complete."
+    else:
+        delegate_rule = "Choose the best agent to perform the next action using their exact name from the list above."
+        if instructions:
+            delegate_rule += " Give it a specific instruction for this step and name the agents whose earlier results it needs."
+        finish_rule = 'respond with "finish"'
+        job = 'Your job is to decide which agent should act next by returning their exact name, or "finish" when the entire task is complete.'
+
+    return f"""You are a supervisor orchestrating a team of specialized agents. Your role is to analyze the user's task and the ongoing conversation to delegate the next step to the most appropriate agent.
+
+Here are the agents available to you:
+{agent_descriptions}
+
+Follow these rules:
+1.  **Analyze the Request**: Carefully read the user's task and the conversation history.
+2.  **Break Down the Task**: If the task is complex, break it down into smaller, sequential steps. Each step should be handled by the most appropriate agent.
+3.  **Delegate**: {delegate_rule}
+4.  **FINISH**: Once all steps of the task are fully completed and the user's request has been met, you must {finish_rule}. Do not finish if there are still steps to be done.
+5.  **No Assumptions**: Do not make assumptions about what has been done. Base your decisions only on the conversation history. If the history is empty, start from the beginning of the task.
+
+{job}"""
+
 
 class TeamSupervisor:
     """Supervisor agent that routes tasks to specialized sub-agents."""
     
-    def __init__(self, llm: BaseChatModel, available_agents: list[BaseAgent]):
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        available_agents: list[BaseAgent],
+        history_strategy: Optional[HistoryStrategy] = None,
+        cache: Optional[ResponseCache] = None,
+        router: Optional[TieredRouter] = None,
+        instructions: bool = True,
+    ):
         """Initialize the supervisor.
         
         Args:
             llm: The language model to use for decision making
             available_agents: List of available agents with their metadata
+            history_strategy: Strategy for rendering the conversation history.
+                Defaults to sending the full history.
+            cache: Optional cache for routing decisions
+            router: Optional tiered router tried before the LLM for
+                single-agent routing decisions
+            instructions: Whether to ask for an instruction and context
+                agents with each routing decision
         """
         self.llm = llm
         self.available_agents = available_agents
-        self.supervisor_agent = SupervisorAgent(llm, available_agents)
+        self.history_strategy = history_strategy or FullHistory()
+        self.cache = cache
+        self.router = router
+        self.instructions = instructions
+        self._prompt_cache = None
+        if router is not None:
+            router.prepare(available_agents)
         self.structured_llm = llm.with_structured_output(RouteDecision)
+        self.multi_route_llm = llm.with_structured_output(MultiRouteDecision)
+        self.plan_llm = llm.with_structured_output(TaskPlan)
+        self._routers = {
+            RouteDecision: self.structured_llm,
+            MultiRouteDecision: self.multi_route_llm,
+            TaskPlan: self.plan_llm,
+        }
     
     def decide_next_agent(self, state: AgentState) -> AgentState:
         """Decide which agent should act next based on current state.
@@ -35,58 +138,251 @@ class TeamSupervisor:
         Returns:
             Updated state with the next agent decision
         """
-        messages = state["messages"]
+        decision = self._fast_decision(state)
+        if decision is None:
+            decision = self._invoke_router(RouteDecision, self._build_prompt(state))
+        return self._apply_decision(state, decision)
+
+    async def adecide_next_agent(self, state: AgentState) -> AgentState:
+        """Asynchronously decide which agent should act next.
         
-        # Build agent descriptions dynamically with agent names
-        agent_descriptions = "\n".join(
-            f"- {agent.name}: {agent.description}" 
-            for agent in self.available_agents
-        )
+        Args:
+            state: Current agent state containing messages and results
+            
+        Returns:
+            Updated state with the next agent decision
+        """
+        decision = self._fast_decision(state)
+        if decision is None:
+            decision = await self._ainvoke_router(RouteDecision, self._build_prompt(state))
+        return self._apply_decision(state, decision)
+
+    def decide_next_agents(self, state: AgentState) -> AgentState:
+        """Decide which agents should act next, allowing independent agents to run in parallel.
         
-        # Create supervisor prompt with structured output
-        system_prompt = f"""You are a supervisor orchestrating a team of specialized agents. Your role is to analyze the user's task and the ongoing conversation to delegate the next step to the most appropriate agent.
+        Args:
+            state: Current agent state containing messages and results
+            
+        Returns:
+            Updated state with the chosen routes, or "finish" when no routes remain
+        """
+        decision = self._invoke_router(MultiRouteDecision, self._build_prompt(state, PARALLEL))
+        return self._apply_multi_decision(decision)
 
-Here are the agents available to you:
-{agent_descriptions}
+    async def adecide_next_agents(self, state: AgentState) -> AgentState:
+        """Asynchronously decide which agents should act next.
+        
+        Args:
+            state: Current agent state containing messages and results
+            
+        Returns:
+            Updated state with the chosen routes, or "finish" when no routes remain
+        """
+        decision = await self._ainvoke_router(MultiRouteDecision, self._build_prompt(state, PARALLEL))
+        return self._apply_multi_decision(decision)
 
-Follow these rules:
-1.  **Analyze the Request**: Carefully read the user's task and the conversation history.
-2.  **Break Down the Task**: If the task is complex, break it down into smaller, sequential steps. Each step should be handled by the most appropriate agent.
-3.  **Delegate**: Choose the best agent to perform the next action using their exact name from the list above.
-4.  **FINISH**: Once all steps of the task are fully completed and the user's request has been met, you must respond with "finish". Do not finish if there are still steps to be done.
-5.  **No Assumptions**: Do not make assumptions about what has been done. Base your decisions only on the conversation history. If the history is empty, start from the beginning of the task.
+    def plan(self, state: AgentState, feedback: str = "") -> AgentState:
+        """Plan all remaining steps of the task as a graph of agent subtasks.
 
-Your job is to decide which agent should act next by returning their exact name, or "finish" when the entire task is complete."""
-        
-        supervisor_prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("human", """Task: {task}
+        Args:
+            state: Current agent state containing messages and results
+            feedback: Why the previous plan must be replaced, when replanning
 
-Conversation history:
-{history}
+        Returns:
+            State update with the new plan
+        """
+        decision = self._invoke_router(TaskPlan, self._build_prompt(state, PLAN, feedback))
+        return self._apply_plan(state, decision)
 
-Decide which agent should act next or if we should FINISH.""")
-        ])
-        
-        # Build conversation history
-        history = "\n".join([msg.content for msg in messages])
+    async def aplan(self, state: AgentState, feedback: str = "") -> AgentState:
+        """Asynchronously plan all remaining steps of the task."""
+        decision = await self._ainvoke_router(TaskPlan, self._build_prompt(state, PLAN, feedback))
+        return self._apply_plan(state, decision)
+
+    def _fast_decision(self, state: AgentState) -> Optional[RouteDecision]:
+        """Return the tiered router's decision, or None when the LLM must decide."""
+        if self.router is None:
+            return None
+        decision = self.router.decide(state, self.available_agents)
+        if decision is not None:
+            logger.info("⚡ Fast router decided without an LLM call")
+        return decision
+
+    def _invoke_router(self, schema: type, prompt: list):
+        """Get a structured routing decision from the cache, the active batch run or the model."""
+        key = self._cache_key(schema, prompt)
+        decision = self._cached_decision(schema, key)
+        if decision is not None:
+            return decision
+
+        structured_llm = self._routers[schema]
+        batcher = get_active_batcher()
+        with call_priority(ROUTING):
+            if batcher is not None:
+                decision = batcher.invoke(structured_llm, prompt)
+            else:
+                decision = structured_llm.invoke(prompt)
+        self._store_decision(key, decision)
+        return decision
+
+    async def _ainvoke_router(self, schema: type, prompt: list):
+        """Asynchronously get a structured routing decision."""
+        key = self._cache_key(schema, prompt)
+        decision = self._cached_decision(schema, key)
+        if decision is not None:
+            return decision
+
+        structured_llm = self._routers[schema]
+        batcher = get_active_batcher()
+        with call_priority(ROUTING):
+            if batcher is not None:
+                decision = await batcher.ainvoke(structured_llm, prompt)
+            else:
+                decision = await structured_llm.ainvoke(prompt)
+        self._store_decision(key, decision)
+        return decision
+
+    def _cache_key(self, schema: type, prompt: list) -> Optional[str]:
+        """Build the cache key for a routing prompt, or None when caching is off."""
+        if self.cache is None:
+            return None
+        return make_cache_key(f"supervisor:{schema.__name__}", model_identity(self.llm), prompt)
+
+    def _cached_decision(self, schema: type, key: Optional[str]):
+        """Return a cached decision for ``key``, if any."""
+        if key is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        logger.info("💾 Using cached supervisor decision")
+        return schema.model_validate_json(cached)
+
+    def _store_decision(self, key: Optional[str], decision) -> None:
+        """Store a decision under ``key`` when caching is on."""
+        if key is not None:
+            self.cache.set(key, decision.model_dump_json())
+
+    def _build_prompt(self, state: AgentState, mode: str = ROUTE, feedback: str = "") -> list:
+        """Build the supervisor prompt messages for the current state.
+
+        The system message depends only on the team, so it is a byte-identical
+        prefix across hops and runs and eligible for provider prompt caching.
+        """
+        messages = state["messages"]
+        history = self.history_strategy.render(state)
         task = messages[0].content if messages else "No task"
+        if mode == PLAN:
+            if feedback:
+                feedback = f"The previous plan could not be completed: {feedback}\n\n"
+            human = PLAN_HUMAN_PROMPT.format(task=task, history=history, feedback=feedback)
+        else:
+            human = HUMAN_PROMPT.format(task=task, history=history)
+        return [
+            SystemMessage(content=self._team_prompts()[0][mode]),
+            HumanMessage(content=human),
+        ]
+
+    def _team_prompts(self) -> tuple[dict[str, str], dict[str, str]]:
+        """Return the system prompts keyed by mode and the agent name lookup.
+
+        Both are built once and rebuilt only when the agent list changes.
+        """
+        agents = tuple(self.available_agents)
+        cached = self._prompt_cache
+        if cached is not None and cached[0] == agents:
+            return cached[1], cached[2]
+        agent_descriptions = "\n".join(f"- {agent.name}: {agent.description}" for agent in agents)
+        prompts = {
+            mode: build_system_prompt(agent_descriptions, mode, self.instructions)
+            for mode in (ROUTE, PARALLEL, PLAN)
+        }
+        names = {agent.name.lower(): agent.name for agent in agents}
+        self._prompt_cache = (agents, prompts, names)
+        return prompts, names
+
+    def resolve_agent_name(self, name: str) -> str:
+        """Map a name chosen by the model to "finish" or an exact agent name.
+
+        Matching ignores case, surrounding whitespace, quotes and trailing
+        periods, so "FINISH" or "mathagent" are understood. Unknown names are
+        returned unchanged.
+        """
+        cleaned = name.strip().strip("\"'`").rstrip(".").strip().lower()
+        if cleaned == "finish":
+            return "finish"
+        return self._team_prompts()[1].get(cleaned, name)
+
+    def _apply_decision(self, state: AgentState, decision: RouteDecision) -> AgentState:
+        """Log a routing decision and return it as a state update."""
+        next_agent = self.resolve_agent_name(decision.next_agent)
         
-        # Get structured decision
-        decision = self.structured_llm.invoke(
-            supervisor_prompt.format_messages(
-                task=task,
-                history=history
-            )
+        logger.info(f"🎯 Supervisor decision: {next_agent}")
+        logger.info(f"💭 Reasoning: {decision.reasoning}")
+        emit(
+            SUPERVISOR_DECISION,
+            next=next_agent,
+            reasoning=decision.reasoning,
+            instruction=decision.instruction,
         )
         
-        next_agent = decision.next_agent
+        return {
+            "next": next_agent,
+            "instruction": decision.instruction,
+            "context_agents": [self.resolve_agent_name(name) for name in decision.context_agents],
+        }
+
+    def _apply_multi_decision(self, decision: MultiRouteDecision) -> AgentState:
+        """Log a parallel routing decision and return it as a state update."""
+        routes = [
+            route.model_copy(update={"agent": self.resolve_agent_name(route.agent)})
+            for route in decision.routes
+        ]
+        agent_names = [route.agent for route in routes]
         
-        logger.info(f"🎯 Supervisor decision: {next_agent}")
+        logger.info(f"🎯 Supervisor decision: {', '.join(agent_names) or 'finish'}")
         logger.info(f"💭 Reasoning: {decision.reasoning}")
+        emit(
+            SUPERVISOR_DECISION,
+            next=agent_names or "finish",
+            reasoning=decision.reasoning,
+            routes=[route.model_dump() for route in routes],
+        )
         
         return {
-            "messages": messages, 
-            "next": next_agent, 
-            "task_result": state.get("task_result", {})
+            "next": "finish" if not routes else ", ".join(agent_names),
+            "routes": routes,
         }
+
+    def _apply_plan(self, state: AgentState, decision: TaskPlan) -> AgentState:
+        """Log a plan and return it as a state update.
+
+        Step ids are prefixed with the plan's number so that the steps of a
+        new plan never collide with those of an earlier one. Dependencies on
+        steps that are not part of the plan are dropped.
+        """
+        replans = state.get("replans", 0) + (1 if state.get("plan") else 0)
+        prefix = f"{replans}."
+        ids = {step.id for step in decision.steps}
+        steps = [
+            step.model_copy(update={
+                "id": prefix + step.id,
+                "agent": self.resolve_agent_name(step.agent),
+                "depends_on": [prefix + dep for dep in step.depends_on if dep in ids and dep != step.id],
+            })
+            for step in decision.steps
+        ]
+
+        logger.info(f"📋 Supervisor plan: {len(steps)} steps")
+        for step in steps:
+            after = f" after {', '.join(step.depends_on)}" if step.depends_on else ""
+            logger.info(f"   {step.id} {step.agent}{after}: {step.task}")
+        logger.info(f"💭 Reasoning: {decision.reasoning}")
+        emit(
+            SUPERVISOR_DECISION,
+            next=[step.agent for step in steps] or "finish",
+            reasoning=decision.reasoning,
+            plan=[step.model_dump() for step in steps],
+        )
+
+        return {"plan": steps, "replans": replans}
@@ -0,0 +1,173 @@
+"""Deterministic offline chat model for tests and benchmarks."""
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Callable, List, Optional, Union
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, PrivateAttr
+
+from .history import estimate_tokens
+
+AGENT_LINE = re.compile(r"^- (\w+):", re.MULTILINE)
+RESULT_LINE = re.compile(r"^(\w+) result: ", re.MULTILINE)
+
+Response = Union[str, dict, AIMessage]
+Responder = Callable[[List[BaseMessage], List[str]], Response]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replays scripted responses without network access.
+
+    Each call produces the next response from ``responses``, or asks
+    ``responder`` when one is given. A response can be:
+
+    - a string, returned as the message text
+    - a dict of arguments, returned as a call to the first bound tool; this is
+      how ``with_structured_output(RouteDecision)`` decisions are scripted
+    - a dict with a ``"tool_calls"`` list of ``{"name": ..., "args": ...}``
+    - an ``AIMessage``, returned as-is
+
+    Responses carry ``usage_metadata`` estimated from the prompt and reply
+    size, and ``latency`` adds an artificial delay per call.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    responses: List[Any] = []
+    responder: Optional[Responder] = None
+    latency: float = 0.0
+    model_name: str = "scripted"
+
+    _index: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name}
+
+    @property
+    def call_count(self) -> int:
+        """Number of scripted responses consumed so far."""
+        return self._index
+
+    def bind_tools(self, tools, *, tool_choice: Optional[str] = None, **kwargs: Any):
+        """Bind tools so they are passed to each call, as real chat models do."""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages, kwargs)
+
+    def _respond(self, messages: List[BaseMessage], kwargs: dict) -> ChatResult:
+        """Produce the next response as a chat result."""
+        tool_names = [tool["function"]["name"] for tool in kwargs.get("tools") or []]
+        with self._lock:
+            index = self._index
+            self._index += 1
+        if self.responder is not None:
+            response = self.responder(messages, tool_names)
+        elif index < len(self.responses):
+            response = self.responses[index]
+        else:
+            raise IndexError(f"ScriptedChatModel ran out of responses after {len(self.responses)} calls")
+
+        message = self._to_message(response, tool_names, index)
+        input_tokens = sum(estimate_tokens(str(msg.content)) for msg in messages)
+        output_tokens = estimate_tokens(str(message.content)) + sum(
+            estimate_tokens(str(call["args"])) for call in message.tool_calls
+        )
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _to_message(response: Response, tool_names: List[str], index: int) -> AIMessage:
+        """Convert a scripted response into an AIMessage."""
+        if isinstance(response, AIMessage):
+            return response.model_copy()
+        if isinstance(response, str):
+            return AIMessage(content=response)
+        if "tool_calls" in response:
+            tool_calls = response["tool_calls"]
+        else:
+            if not tool_names:
+                raise ValueError("A structured response was scripted but no tools are bound")
+            tool_calls = [{"name": tool_names[0], "args": response}]
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"name": call["name"], "args": call["args"], "id": call.get("id", f"call_{index}_{i}")}
+                for i, call in enumerate(tool_calls)
+            ],
+        )
+
+
+def sequential_router(hops: int = 1, reply: str = "Done: {request}") -> Responder:
+    """Build a responder that routes through the listed agents in order, then finishes.
+
+    Supervisor calls route to the agents of the prompt's agent list in turn
+    until ``hops`` agent results appear in the history; parallel supervisor
+    calls send every agent at once in the first turn, and planning calls plan
+    a chain of ``hops`` steps, or no steps once results exist. Leaf agent calls reply
+    with ``reply`` formatted with the request text. The decision depends only
+    on the prompt, so one model can serve concurrent and nested runs.
+
+    Args:
+        hops: Number of agent hops before finishing
+        reply: Template for leaf agent replies
+    """
+
+    def respond(messages: List[BaseMessage], tool_names: List[str]) -> Response:
+        if "RouteDecision" in tool_names or "MultiRouteDecision" in tool_names or "TaskPlan" in tool_names:
+            agents = AGENT_LINE.findall(str(messages[0].content))
+            done = len(RESULT_LINE.findall(str(messages[-1].content)))
+            if "TaskPlan" in tool_names:
+                steps = [] if done or not agents else [
+                    {
+                        "id": str(i),
+                        "agent": agents[i % len(agents)],
+                        "task": f"Step {i} for {agents[i % len(agents)]}",
+                        "depends_on": [str(i - 1)] if i else [],
+                    }
+                    for i in range(hops)
+                ]
+                return {"steps": steps, "reasoning": "Scripted plan"}
+            if "MultiRouteDecision" in tool_names:
+                routes = [] if done else [{"agent": name, "task": f"Subtask for {name}"} for name in agents]
+                return {"routes": routes, "reasoning": "Scripted parallel routing"}
+            next_agent = agents[done % len(agents)] if agents and done < hops else "finish"
+            return {"next_agent": next_agent, "reasoning": "Scripted routing"}
+        request = " ".join(str(messages[-1].content).split())
+        return reply.format(request=request[:200])
+
+    return respond
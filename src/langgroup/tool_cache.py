@@ -0,0 +1,127 @@
+"""Memoization of deterministic agent tools."""
+import hashlib
+import json
+from typing import Any, Callable, Optional, Union
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+from .cache import ResponseCache
+
+TOOL_CACHE_CONFIG_KEY = "langgroup_tool_cache"
+CACHEABLE_KEY = "langgroup_cacheable"
+
+Tool = Union[BaseTool, Callable]
+
+
+def cacheable(tool: Tool) -> Tool:
+    """Mark a tool as deterministic so its results can be reused.
+
+    Returns the tool itself, so it can be used as a decorator or inline in
+    ``BaseAgent.tools``. Results are cached in runs of an AgentSystem with a
+    ``tool_cache``. A cacheable tool must return the same result for the same
+    arguments; only string results are cached.
+    """
+    if isinstance(tool, BaseTool):
+        tool.metadata = {**(tool.metadata or {}), CACHEABLE_KEY: True}
+    else:
+        setattr(tool, CACHEABLE_KEY, True)
+    return tool
+
+
+def is_cacheable(tool: Tool) -> bool:
+    """Return True if ``tool`` was marked with ``cacheable``."""
+    if isinstance(tool, BaseTool):
+        return bool((tool.metadata or {}).get(CACHEABLE_KEY))
+    return bool(getattr(tool, CACHEABLE_KEY, False))
+
+
+def tool_name(tool: Tool) -> str:
+    """Return the name a tool is called by."""
+    return tool.name if isinstance(tool, BaseTool) else tool.__name__
+
+
+def make_tool_cache_key(name: str, function: str, args: Any) -> str:
+    """Build a cache key from a tool's name, implementation and canonicalized arguments.
+
+    Arguments are serialized with sorted keys, so argument order does not
+    change the key; unlike prompts, whitespace inside values is significant.
+    """
+    canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+    raw = "\x1f".join((f"tool:{name}", function, canonical))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def tool_cache_from_config(config: Optional[RunnableConfig]) -> Optional[ResponseCache]:
+    """Return the tool cache of the current run, if it has one."""
+    return ((config or {}).get("configurable") or {}).get(TOOL_CACHE_CONFIG_KEY)
+
+
+class ToolCacheMiddleware(AgentMiddleware):
+    """Agent middleware that answers repeated calls of cacheable tools from a cache.
+
+    A hit returns the stored result as the tool's message without running the
+    tool. Runs without a tool cache in their config run every call. Lookups
+    are reported to ``on_lookup``, e.g. the agent's ToolCallLogger, with the
+    tool name and whether the lookup hit.
+    """
+
+    def __init__(self, tool_names: set, on_lookup: Optional[Callable[[str, bool], None]] = None):
+        """Initialize the middleware.
+
+        Args:
+            tool_names: Names of the agent's cacheable tools
+            on_lookup: Optional function called after each cache lookup
+        """
+        super().__init__()
+        self.tool_names = tool_names
+        self.on_lookup = on_lookup
+
+    def wrap_tool_call(self, request, handler):
+        lookup = self._lookup(request)
+        if lookup is None:
+            return handler(request)
+        cache, key, cached = lookup
+        if cached is not None:
+            return cached
+        return self._store(cache, key, handler(request))
+
+    async def awrap_tool_call(self, request, handler):
+        lookup = self._lookup(request)
+        if lookup is None:
+            return await handler(request)
+        cache, key, cached = lookup
+        if cached is not None:
+            return cached
+        return self._store(cache, key, await handler(request))
+
+    def _lookup(self, request) -> Optional[tuple[ResponseCache, str, Optional[ToolMessage]]]:
+        """Return the cache, key and any cached message for a call, or None if uncached."""
+        call = request.tool_call
+        if call["name"] not in self.tool_names:
+            return None
+        cache = tool_cache_from_config(request.runtime.config if request.runtime else None)
+        if cache is None:
+            return None
+        func = getattr(request.tool, "func", None)
+        function = f"{func.__module__}.{func.__qualname__}" if func is not None else ""
+        key = make_tool_cache_key(call["name"], function, call["args"])
+        value = cache.get(key)
+        if self.on_lookup is not None:
+            self.on_lookup(call["name"], value is not None)
+        if value is None:
+            return cache, key, None
+        return cache, key, ToolMessage(content=value, name=call["name"], tool_call_id=call["id"])
+
+    @staticmethod
+    def _store(cache: ResponseCache, key: str, result: Any) -> Any:
+        """Cache a successful string result and pass the result on."""
+        if (
+            isinstance(result, ToolMessage)
+            and result.status != "error"
+            and isinstance(result.content, str)
+        ):
+            cache.set(key, result.content)
+        return result
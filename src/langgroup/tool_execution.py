@@ -0,0 +1,226 @@
+"""Executor policies for running agent tools inline, on a thread pool or on a process pool."""
+import asyncio
+import contextvars
+import importlib
+import logging
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+
+logger = logging.getLogger(__name__)
+
+TOOL_EXECUTOR_CONFIG_KEY = "langgroup_tool_executor"
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+EXECUTION_MODES = (INLINE, THREAD, PROCESS)
+
+
+@dataclass
+class ToolPolicy:
+    """How an agent runs one of its tools.
+
+    Attributes:
+        mode: "inline" runs the tool on the agent's own worker, "thread" on the
+            shared thread pool, for blocking I/O, and "process" on the shared
+            process pool, for CPU-bound pure functions. Process tools must be
+            module-level functions whose arguments and result can be pickled.
+        timeout: Seconds to wait for the tool before giving the model an error
+            result instead. A timed-out pooled call keeps its worker until it
+            returns; inline sync tools are not timed out.
+    """
+    mode: str = THREAD
+    timeout: Optional[float] = None
+
+    def __post_init__(self):
+        if self.mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown tool execution mode: {self.mode}")
+
+
+class ToolExecutor:
+    """Shared thread and process pools for pooled agent tools.
+
+    Pools are created on first use and shared by every agent of the runs that
+    use this executor, including nested teams, so their sizes bound the tool
+    concurrency of a whole system. Tool calls of one model turn run
+    concurrently up to those sizes.
+    """
+
+    def __init__(self, max_threads: Optional[int] = None, max_processes: Optional[int] = None):
+        """Initialize the executor.
+
+        Args:
+            max_threads: Size of the thread pool, defaulting to the
+                ``ThreadPoolExecutor`` default
+            max_processes: Size of the process pool, defaulting to the CPU count
+        """
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """The shared thread pool."""
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix="langgroup-tool"
+                )
+            return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """The shared process pool."""
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+            return self._process_pool
+
+    def pool(self, mode: str) -> Executor:
+        """Return the pool for a pooled execution mode."""
+        return self.process_pool if mode == PROCESS else self.thread_pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the pools. They are recreated if the executor is used again."""
+        with self._lock:
+            pools = [self._thread_pool, self._process_pool]
+            self._thread_pool = self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+    def __enter__(self) -> "ToolExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+
+_default_executor: Optional[ToolExecutor] = None
+_default_lock = threading.Lock()
+
+
+def default_tool_executor() -> ToolExecutor:
+    """Return the process-wide executor used by runs without one of their own."""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = ToolExecutor()
+        return _default_executor
+
+
+def tool_executor_from_config(config: Optional[RunnableConfig]) -> ToolExecutor:
+    """Return the tool executor of the current run."""
+    executor = ((config or {}).get("configurable") or {}).get(TOOL_EXECUTOR_CONFIG_KEY)
+    return executor or default_tool_executor()
+
+
+def _call_in_process(module: str, qualname: str, kwargs: Dict[str, Any]) -> Any:
+    """Look up a tool function by name in a worker process and call it.
+
+    Functions decorated with ``@tool`` are shadowed by their tool object in
+    their module, so they cannot be pickled by reference; the tool's function
+    is unwrapped here instead.
+    """
+    target: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    if isinstance(target, StructuredTool):
+        target = target.func
+    return target(**kwargs)
+
+
+class ToolExecutionMiddleware(AgentMiddleware):
+    """Agent middleware that runs tools according to their ToolPolicy.
+
+    Pooled tools are swapped for a copy whose function is submitted to the
+    run's ToolExecutor, so argument validation, callbacks and error handling
+    behave as for inline tools.
+    """
+
+    def __init__(self, policies: Dict[str, ToolPolicy], default: Optional[ToolPolicy] = None):
+        """Initialize the middleware.
+
+        Args:
+            policies: Policies by tool name
+            default: Policy for tools without one; None runs them inline
+        """
+        super().__init__()
+        self.policies = policies
+        self.default = default or ToolPolicy(mode=INLINE)
+
+    def wrap_tool_call(self, request, handler):
+        policy = self.policies.get(request.tool_call["name"], self.default)
+        pooled = self._pooled_request(request, policy)
+        if pooled is None:
+            return handler(request)
+        try:
+            return handler(pooled)
+        except FutureTimeoutError:
+            return self._timeout_message(request, policy)
+
+    async def awrap_tool_call(self, request, handler):
+        policy = self.policies.get(request.tool_call["name"], self.default)
+        pooled = self._pooled_request(request, policy)
+        try:
+            if pooled is not None:
+                return await handler(pooled)
+            if policy.timeout is None:
+                return await handler(request)
+            return await asyncio.wait_for(handler(request), policy.timeout)
+        except (asyncio.TimeoutError, FutureTimeoutError):
+            return self._timeout_message(request, policy)
+
+    def _pooled_request(self, request, policy: ToolPolicy):
+        """Return the request with its tool bound to a pool, or None to run it inline."""
+        tool = request.tool
+        if policy.mode == INLINE or not isinstance(tool, StructuredTool) or tool.func is None:
+            return None
+        executor = tool_executor_from_config(request.runtime.config if request.runtime else None)
+        pool = executor.pool(policy.mode)
+        submit = self._submitter(pool, tool.func, policy.mode)
+
+        def run(**kwargs: Any) -> Any:
+            return submit(kwargs).result(timeout=policy.timeout)
+
+        async def arun(**kwargs: Any) -> Any:
+            future = asyncio.wrap_future(submit(kwargs))
+            if policy.timeout is None:
+                return await future
+            return await asyncio.wait_for(future, policy.timeout)
+
+        return request.override(tool=tool.model_copy(update={"func": run, "coroutine": arun}))
+
+    @staticmethod
+    def _submitter(pool: Executor, func: Callable, mode: str) -> Callable:
+        """Build a function that submits a call of ``func`` to ``pool``."""
+        if mode == PROCESS:
+            return lambda kwargs: pool.submit(
+                _call_in_process, func.__module__, func.__qualname__, kwargs
+            )
+        # Run in a copy of the caller's context so callbacks and stream
+        # writers still find the current run.
+        return lambda kwargs: pool.submit(contextvars.copy_context().run, func, **kwargs)
+
+    @staticmethod
+    def _timeout_message(request, policy: ToolPolicy) -> ToolMessage:
+        """Build the error result for a tool call that timed out."""
+        name = request.tool_call["name"]
+        logger.warning(f"⚠️ Tool {name} timed out after {policy.timeout}s")
+        return ToolMessage(
+            content=f"Error: tool {name} timed out after {policy.timeout} seconds",
+            name=name,
+            tool_call_id=request.tool_call["id"],
+            status="error",
+        )
+
@@ -0,0 +1,435 @@
+"""Run traces: record every decision, agent call, model call and tool call, and replay them."""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, List, Optional, Union
+from uuid import UUID
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, ToolMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict
+
+from . import __version__
+from .metrics import locate, token_usage
+from .model_pool import model_name
+
+logger = logging.getLogger(__name__)
+
+# Event types written by the recorder, besides the stream events of ``emit``
+RUN_START = "run_start"
+RUN_END = "run_end"
+LLM_CALL = "llm_call"
+TOOL_CALL = "tool_call"
+
+
+class TraceMismatchError(LookupError):
+    """Raised when a replayed run makes a model call the trace has no response for."""
+
+
+def prompt_key(messages: List[BaseMessage]) -> str:
+    """Return the key a model call's prompt is recorded and replayed under.
+
+    The key covers each message's type, exact content and tool calls, but
+    not message or tool call ids, which differ between otherwise identical
+    live runs.
+    """
+    canonical = [
+        [
+            msg.type,
+            msg.content,
+            [[call["name"], call["args"]] for call in getattr(msg, "tool_calls", None) or []],
+        ]
+        for msg in messages
+    ]
+    raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _tool_key(name: str, args: Any) -> str:
+    """Return the key a tool call is recorded and replayed under."""
+    return f"{name}\x1f{json.dumps(args, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert values json cannot serialize, such as plan steps and messages."""
+    if isinstance(value, BaseMessage):
+        return message_to_dict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def load_trace(path: Union[str, Path]) -> list[dict]:
+    """Read the events of a trace file, skipping a partially written last line."""
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"⚠️ Skipping unreadable trace line in {path}")
+    return events
+
+
+class TraceRecorder:
+    """Append the trace of every run of an AgentSystem to a JSONL file.
+
+    Each line is one event tagged with its run id and the seconds since the
+    run started. Attach a recorder with ``AgentSystem(trace=...)``; runs of
+    nested SupervisorAgent teams are written to the enclosing run's trace.
+    Concurrent runs may share a recorder, and lines are flushed as they are
+    written, so a crashed run keeps the events that preceded the crash.
+    """
+
+    def __init__(self, path: Union[str, Path], include_prompts: bool = False):
+        """Initialize the recorder.
+
+        Args:
+            path: File to append events to; created if missing
+            include_prompts: If True, model call events also carry the full
+                prompt. Replay needs only the prompt's key, so this is off by
+                default to keep traces compact.
+        """
+        self.path = Path(path)
+        self.include_prompts = include_prompts
+        self._file = None
+        self._lock = threading.Lock()
+
+    def start_run(self, task: str, node_agent_names: dict[str, str]) -> "RunTracer":
+        """Start tracing a new run; pass the tracer as a callback of the run."""
+        tracer = RunTracer(self, node_agent_names)
+        tracer.write({"type": RUN_START, "task": task, "version": __version__})
+        return tracer
+
+    def finish_run(self, tracer: "RunTracer", result: Optional[dict]) -> None:
+        """Write the end of a run with its outcome."""
+        result = result or {}
+        tracer.write({
+            "type": RUN_END,
+            "task_result": result.get("task_result"),
+            "stop_reason": result.get("stop_reason"),
+        })
+
+    def write(self, event: dict) -> None:
+        """Append one event to the trace file."""
+        line = json.dumps(event, separators=(",", ":"), default=_jsonable) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the trace file. Later events reopen it."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RunTracer(BaseCallbackHandler):
+    """Callback handler that writes the model and tool calls of a single run.
+
+    Calls are attributed through their LangGraph checkpoint namespace, like
+    run metrics, so calls inside nested teams carry the team path and node
+    that made them. Supervisor decisions and agent inputs and outputs reach
+    the tracer through ``emit``.
+    """
+
+    run_inline = True
+
+    def __init__(self, recorder: TraceRecorder, node_agent_names: dict[str, str]):
+        """Initialize the tracer.
+
+        Args:
+            recorder: Recorder writing the trace file
+            node_agent_names: Mapping of graph node names to agent names at
+                every nesting level
+        """
+        self.recorder = recorder
+        self.node_agent_names = node_agent_names
+        self.run_id = uuid.uuid4().hex
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._llm_calls: dict[UUID, dict] = {}
+        self._tool_calls: dict[UUID, dict] = {}
+
+    def write(self, event: dict) -> None:
+        """Write an event of this run."""
+        self.recorder.write({"run": self.run_id, "t": round(time.perf_counter() - self._started, 6), **event})
+
+    def _where(self, metadata: Optional[dict]) -> dict:
+        """Return the team path and node fields of an event."""
+        location = locate(metadata, self.node_agent_names)
+        if location is None:
+            return {"team": None, "node": None}
+        return {"team": list(location[0]), "node": location[1]}
+
+    def record_event(self, metadata: Optional[dict], event: dict) -> None:
+        """Write a stream event, e.g. a supervisor decision or an agent's input or output."""
+        self.write({**event, "team": self._where(metadata)["team"]})
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        prompt = messages[0] if messages else []
+        call = {**self._where(metadata), "key": prompt_key(prompt), "start": time.perf_counter()}
+        if self.recorder.include_prompts:
+            call["prompt"] = [message_to_dict(msg) for msg in prompt]
+        with self._lock:
+            self._llm_calls[run_id] = call
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._llm_calls.pop(run_id, None)
+        if call is None:
+            return
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        if message is None:
+            return
+        prompt_tokens, completion_tokens = token_usage(response)
+        start = call.pop("start")
+        self.write({
+            "type": LLM_CALL,
+            **call,
+            "message": message_to_dict(message),
+            "duration": round(time.perf_counter() - start, 6),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        })
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._llm_calls.pop(run_id, None)
+        if call is not None:
+            start = call.pop("start")
+            self.write({
+                "type": LLM_CALL,
+                **call,
+                "error": f"{type(error).__name__}: {error}",
+                "duration": round(time.perf_counter() - start, 6),
+            })
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        inputs: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        call = {
+            **self._where(metadata),
+            "name": name,
+            "args": inputs if inputs is not None else input_str,
+            "start": time.perf_counter(),
+        }
+        with self._lock:
+            self._tool_calls[run_id] = call
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if isinstance(output, ToolMessage):
+            self._end_tool(run_id, output=output.content, status=output.status)
+        else:
+            self._end_tool(run_id, output=output if isinstance(output, str) else str(output), status="success")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_tool(run_id, error=f"{type(error).__name__}: {error}")
+
+    def _end_tool(self, run_id: UUID, **outcome: Any) -> None:
+        with self._lock:
+            call = self._tool_calls.pop(run_id, None)
+        if call is None:
+            return
+        start = call.pop("start")
+        self.write({"type": TOOL_CALL, **call, **outcome, "duration": round(time.perf_counter() - start, 6)})
+
+
+class TraceReplay:
+    """Serve the model and tool calls of a recorded trace instead of live calls.
+
+    Pass a replay to ``AgentSystem(replay=...)`` along with the same agents
+    the trace was recorded with. The supervisor and every agent, including
+    those of nested teams, are switched to a ``ReplayChatModel`` answering
+    each prompt with the response recorded for it, and tools with a recorded
+    output for the same arguments return it without running. A run with the
+    recorded task therefore drives the identical graph with no model calls,
+    so only framework overhead remains to be profiled, and a trace recorded
+    while replaying can be diffed against the original.
+
+    Responses recorded for the same prompt are returned in recorded order,
+    starting over once all have been used, so a replay can be run repeatedly.
+    """
+
+    def __init__(
+        self,
+        trace: Union[str, Path, list[dict]],
+        run: Optional[str] = None,
+        simulate_latency: bool = False,
+    ):
+        """Initialize the replay.
+
+        Args:
+            trace: A trace file written by a TraceRecorder, or its events
+            run: Replay only the run with this id; defaults to every run in
+                the trace
+            simulate_latency: If True, each replayed model call takes as long
+                as the recorded one, to reproduce the run's timing
+        """
+        events = load_trace(trace) if isinstance(trace, (str, Path)) else trace
+        self.simulate_latency = simulate_latency
+        self._responses: dict[str, list[tuple[dict, float]]] = defaultdict(list)
+        self._tool_outputs: dict[str, list[dict]] = defaultdict(list)
+        self._cursors: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.runs: list[str] = []
+        for event in events:
+            if run is not None and event.get("run") != run:
+                continue
+            if event["type"] == RUN_START:
+                self.runs.append(event["run"])
+            elif event["type"] == LLM_CALL and "message" in event:
+                self._responses[event["key"]].append((event["message"], event.get("duration", 0.0)))
+            elif event["type"] == TOOL_CALL and "output" in event:
+                self._tool_outputs[_tool_key(event["name"], event["args"])].append(event)
+
+    def get(self, llm: BaseChatModel) -> BaseChatModel:
+        """Return a model that answers from the trace in place of ``llm``."""
+        if isinstance(llm, ReplayChatModel):
+            return llm
+        return ReplayChatModel(replay=self, model_name=model_name(llm))
+
+    def _next(self, key: str, recorded: dict[str, list]) -> Any:
+        """Return the next recorded value for ``key``, or None if there is none."""
+        values = recorded.get(key)
+        if not values:
+            return None
+        with self._lock:
+            index = self._cursors[key] % len(values)
+            self._cursors[key] += 1
+        return values[index]
+
+    def response(self, messages: List[BaseMessage]) -> tuple[BaseMessage, float]:
+        """Return the recorded response to a prompt and how long the call took.
+
+        Raises:
+            TraceMismatchError: If the trace has no call with this prompt,
+                i.e. the replayed run diverged from the recorded one
+        """
+        recorded = self._next(prompt_key(messages), self._responses)
+        if recorded is None:
+            last = str(messages[-1].content)[:200] if messages else ""
+            raise TraceMismatchError(f"No recorded response for prompt ending in: {last!r}")
+        message, duration = recorded
+        return messages_from_dict([message])[0], duration
+
+    def tool_message(self, tool_call: dict) -> Optional[ToolMessage]:
+        """Return the recorded result of a tool call, or None if it was not recorded."""
+        recorded = self._next(_tool_key(tool_call["name"], tool_call["args"]), self._tool_outputs)
+        if recorded is None:
+            return None
+        return ToolMessage(
+            content=recorded["output"],
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+            status=recorded.get("status", "success"),
+        )
+
+    def reset(self) -> None:
+        """Start every prompt and tool call over from its first recorded response."""
+        with self._lock:
+            self._cursors.clear()
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model answering every call from a TraceReplay."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    replay: TraceReplay
+    model_name: str = "replay"
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools, *, tool_choice: Optional[str] = None, **kwargs: Any):
+        """Bind tools as real chat models do; replayed responses already carry their tool calls."""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, duration = self.replay.response(messages)
+        if self.replay.simulate_latency:
+            time.sleep(duration)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, duration = self.replay.response(messages)
+        if self.replay.simulate_latency:
+            await asyncio.sleep(duration)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class ToolReplayMiddleware(AgentMiddleware):
+    """Agent middleware that returns recorded tool results instead of running tools.
+
+    Calls the trace has no result for, e.g. those served by a tool cache
+    while recording, run as usual.
+    """
+
+    def __init__(self, replay: TraceReplay):
+        """Initialize the middleware.
+
+        Args:
+            replay: Replay holding the recorded tool results
+        """
+        super().__init__()
+        self.replay = replay
+
+    def wrap_tool_call(self, request, handler):
+        recorded = self.replay.tool_message(request.tool_call)
+        return recorded if recorded is not None else handler(request)
+
+    async def awrap_tool_call(self, request, handler):
+        recorded = self.replay.tool_message(request.tool_call)
+        return recorded if recorded is not None else await handler(request)
+
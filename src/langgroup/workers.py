@@ -0,0 +1,461 @@
+"""Worker processes that run queued tasks on warm AgentSystem instances."""
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Seconds to wait for a killed worker process to exit
+KILL_TIMEOUT = 5.0
+
+
+@dataclass
+class QueuedTask:
+    """A task in a TaskQueue and, once finished, its result or error.
+
+    ``result`` holds the JSON form of the run's final state produced by
+    ``result_payload``.
+    """
+    id: str
+    task: str
+    status: str = PENDING
+    attempts: int = 0
+    worker: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the task is done or has failed for good."""
+        return self.status in (DONE, FAILED)
+
+
+def result_payload(result: dict) -> dict:
+    """Convert a run's final state into JSON-serializable form for a queue."""
+    payload = {
+        "task_result": result.get("task_result", {}),
+        "stop_reason": result.get("stop_reason"),
+        "messages": [
+            {"name": msg.name, "content": msg.content} for msg in result.get("messages", [])
+        ],
+    }
+    metrics = result.get("metrics")
+    if metrics is not None:
+        payload["metrics"] = {
+            "wall_time": metrics.wall_time,
+            "hops": metrics.hops,
+            "max_depth": metrics.max_depth,
+            "prompt_tokens": metrics.prompt_tokens,
+            "completion_tokens": metrics.completion_tokens,
+        }
+    return payload
+
+
+class TaskQueue(ABC):
+    """Abstract base class for task queues shared by workers.
+
+    Workers claim tasks with a lease and must renew it while they run. A task
+    whose lease expires, e.g. because its worker died, is handed to another
+    worker until it has been attempted ``max_attempts`` times.
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        """Initialize the queue.
+
+        Args:
+            max_attempts: Attempts per task, counting retries after errors
+                and abandoned leases, before it is marked failed
+        """
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def submit(self, task: str) -> str:
+        """Add a task and return its id."""
+        pass
+
+    @abstractmethod
+    def claim(self, worker: str, lease: float) -> Optional[QueuedTask]:
+        """Lease the oldest available task to ``worker`` for ``lease`` seconds, or return None."""
+        pass
+
+    @abstractmethod
+    def renew(self, task_id: str, worker: str, lease: float) -> bool:
+        """Extend a lease; returns False if ``worker`` no longer holds it."""
+        pass
+
+    @abstractmethod
+    def complete(self, task_id: str, worker: str, result: dict) -> None:
+        """Record the result of a task leased to ``worker``."""
+        pass
+
+    @abstractmethod
+    def fail(self, task_id: str, worker: str, error: str) -> None:
+        """Record a failed attempt, releasing the task for a retry if attempts remain."""
+        pass
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[QueuedTask]:
+        """Return a task with its current status, or None if unknown."""
+        pass
+
+    @abstractmethod
+    def counts(self) -> dict[str, int]:
+        """Return the number of tasks in each status."""
+        pass
+
+    def for_worker(self) -> "TaskQueue":
+        """Return a queue handle for use in a worker process.
+
+        Backends holding connections that cannot cross a fork return a
+        freshly connected handle.
+        """
+        return self
+
+    def submit_many(self, tasks: Iterable[str]) -> list[str]:
+        """Add several tasks and return their ids."""
+        return [self.submit(task) for task in tasks]
+
+    def wait(
+        self, task_ids: Iterable[str], timeout: Optional[float] = None, poll_interval: float = 0.1
+    ) -> list[QueuedTask]:
+        """Wait until the given tasks have finished and return them.
+
+        Raises:
+            TimeoutError: If the tasks have not finished within ``timeout`` seconds
+        """
+        task_ids = list(task_ids)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            tasks = [self.get(task_id) for task_id in task_ids]
+            if all(task is not None and task.finished for task in tasks):
+                return tasks
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Tasks did not finish within {timeout} seconds")
+            time.sleep(poll_interval)
+
+
+class SQLiteTaskQueue(TaskQueue):
+    """Task queue stored in a SQLite database file.
+
+    Safe to share between threads and between processes on the same machine.
+    Pickling keeps only the path and settings, and an unpickled queue opens
+    its own connection, so it can be passed to "spawn" worker processes.
+    """
+
+    def __init__(self, path: str = ".langgroup_queue.db", max_attempts: int = 3):
+        """Initialize the queue.
+
+        Args:
+            path: Path to the database file
+            max_attempts: Attempts per task before it is marked failed
+        """
+        super().__init__(max_attempts=max_attempts)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, task TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, lease_expires REAL, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_available ON tasks (status, created_at)"
+        )
+
+    def for_worker(self) -> "SQLiteTaskQueue":
+        return SQLiteTaskQueue(self.path, max_attempts=self.max_attempts)
+
+    def __reduce__(self):
+        return SQLiteTaskQueue, (self.path, self.max_attempts)
+
+    def submit(self, task: str) -> str:
+        task_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks (id, task, status, created_at) VALUES (?, ?, ?, ?)",
+                (task_id, task, PENDING, time.time()),
+            )
+        return task_id
+
+    def claim(self, worker: str, lease: float) -> Optional[QueuedTask]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Leases abandoned by their worker on the last allowed attempt fail for good
+                self._conn.execute(
+                    "UPDATE tasks SET status = ?, error = ?, worker = NULL "
+                    "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                    (FAILED, "Lease expired", RUNNING, now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT id, task, attempts FROM tasks "
+                    "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (PENDING, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                task_id, task, attempts = row
+                self._conn.execute(
+                    "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, attempts = ? "
+                    "WHERE id = ?",
+                    (RUNNING, worker, now + lease, attempts + 1, task_id),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return QueuedTask(
+            id=task_id, task=task, status=RUNNING, attempts=attempts + 1, worker=worker
+        )
+
+    def renew(self, task_id: str, worker: str, lease: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + lease, task_id, worker, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker: str, result: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = NULL, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, json.dumps(result, default=str), task_id, worker, RUNNING),
+            )
+
+    def fail(self, task_id: str, worker: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, worker = NULL, lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (self.max_attempts, FAILED, PENDING, error, task_id, worker, RUNNING),
+            )
+
+    def get(self, task_id: str) -> Optional[QueuedTask]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, task, status, attempts, worker, result, error FROM tasks WHERE id = ?",
+                (task_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        task_id, task, status, attempts, worker, result, error = row
+        return QueuedTask(
+            id=task_id,
+            task=task,
+            status=status,
+            attempts=attempts,
+            worker=worker,
+            result=json.loads(result) if result is not None else None,
+            error=error,
+        )
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        return {status: 0 for status in (PENDING, RUNNING, DONE, FAILED)} | dict(rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class Worker:
+    """Runs tasks from a queue on one AgentSystem until stopped.
+
+    The lease of the task in progress is renewed in the background, so tasks
+    may run longer than ``lease``; a worker that dies stops renewing and its
+    task is retried elsewhere once the lease expires.
+    """
+
+    def __init__(
+        self,
+        system,
+        queue: TaskQueue,
+        worker_id: Optional[str] = None,
+        lease: float = 60.0,
+        poll_interval: float = 0.5,
+    ):
+        """Initialize the worker.
+
+        Args:
+            system: The AgentSystem to run tasks on
+            queue: Queue to claim tasks from
+            worker_id: Identifier recorded on claimed tasks; defaults to host and pid
+            lease: Seconds a claim stays valid without renewal
+            poll_interval: Seconds to wait before polling an empty queue again
+        """
+        self.system = system
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = lease
+        self.poll_interval = poll_interval
+
+    def process_one(self) -> Optional[QueuedTask]:
+        """Claim and run one task; returns the claimed task, or None if the queue was empty."""
+        claimed = self.queue.claim(self.worker_id, self.lease)
+        if claimed is None:
+            return None
+        logger.info(f"👷 {self.worker_id} running task {claimed.id} (attempt {claimed.attempts})")
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._renew, args=(claimed.id, finished), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.system.run(claimed.task)
+        except Exception as e:
+            logger.error(f"❌ Task {claimed.id} failed: {e}")
+            self.queue.fail(claimed.id, self.worker_id, f"{type(e).__name__}: {e}")
+        else:
+            self.queue.complete(claimed.id, self.worker_id, result_payload(result))
+        finally:
+            finished.set()
+            heartbeat.join()
+        return claimed
+
+    def _renew(self, task_id: str, finished: threading.Event) -> None:
+        """Renew a lease every third of its length until the task finishes."""
+        while not finished.wait(self.lease / 3):
+            if not self.queue.renew(task_id, self.worker_id, self.lease):
+                logger.warning(f"⚠️ {self.worker_id} lost the lease on task {task_id}")
+                return
+
+    def run(self, stop: Optional[Any] = None) -> None:
+        """Process tasks until ``stop`` (a threading or multiprocessing Event) is set.
+
+        A task in progress when ``stop`` is set is finished first.
+        """
+        while stop is None or not stop.is_set():
+            if self.process_one() is None:
+                if stop is None:
+                    time.sleep(self.poll_interval)
+                else:
+                    stop.wait(self.poll_interval)
+
+
+def _worker_main(
+    system_factory: Callable[[], Any],
+    queue: TaskQueue,
+    stop,
+    lease: float,
+    poll_interval: float,
+) -> None:
+    """Entry point of a worker process."""
+    # SIGTERM asks for a graceful stop after the current task; SIGINT is left
+    # to the parent, which stops workers through ``stop``
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker = Worker(
+        system_factory(), queue.for_worker(), lease=lease, poll_interval=poll_interval
+    )
+    worker.run(stop)
+
+
+class WorkerPool:
+    """A set of worker processes, each holding one warm AgentSystem.
+
+    ``system_factory`` is called once in every worker process to build its
+    system, so agent graphs are compiled once per process rather than per
+    task. With the "spawn" or "forkserver" start methods it must be a
+    module-level function, and the queue must be picklable.
+    """
+
+    def __init__(
+        self,
+        system_factory: Callable[[], Any],
+        queue: TaskQueue,
+        num_workers: int = 4,
+        lease: float = 60.0,
+        poll_interval: float = 0.5,
+        start_method: Optional[str] = None,
+    ):
+        """Initialize the pool.
+
+        Args:
+            system_factory: Function returning the AgentSystem a worker runs tasks on
+            queue: Queue the workers claim tasks from
+            num_workers: Number of worker processes
+            lease: Seconds a claim stays valid without renewal
+            poll_interval: Seconds a worker waits before polling an empty queue again
+            start_method: multiprocessing start method; defaults to the platform default
+        """
+        self.system_factory = system_factory
+        self.queue = queue
+        self.num_workers = num_workers
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context(start_method)
+        self._stop = self._context.Event()
+        self._processes: list = []
+
+    def start(self) -> "WorkerPool":
+        """Start the worker processes."""
+        self._stop.clear()
+        for i in range(self.num_workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.system_factory, self.queue, self._stop, self.lease, self.poll_interval),
+                name=f"langgroup-worker-{i}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        logger.info(f"🚀 Started {self.num_workers} workers")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers gracefully, letting them finish their current task.
+
+        Workers still running after ``timeout`` seconds are killed; their
+        tasks are retried by other workers once their leases expire.
+        """
+        self._stop.set()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for process in self._processes:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            process.join(remaining)
+            if process.is_alive():
+                # Workers treat SIGTERM as a graceful stop, so only SIGKILL
+                # interrupts a task in progress
+                logger.warning(f"⚠️ Killing worker {process.name}")
+                process.kill()
+                process.join(KILL_TIMEOUT)
+        self._processes = []
+        logger.info("✅ Workers stopped")
+
+    @property
+    def alive(self) -> int:
+        """Number of worker processes still running."""
+        return sum(process.is_alive() for process in self._processes)
+
+    def __enter__(self) -> "WorkerPool":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
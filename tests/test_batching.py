@@ -0,0 +1,51 @@
+"""Tests for micro-batching of concurrent model calls."""
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.runnables import RunnableLambda
+
+sys.path.append("src")
+
+from langgroup.batching import RequestBatcher
+
+
+class RecordingRunnable(RunnableLambda):
+    """Runnable that doubles its input and records batch sizes."""
+
+    def __init__(self):
+        super().__init__(lambda x: x * 2)
+        self.batch_sizes = []
+
+    def batch(self, inputs, config=None, **kwargs):
+        self.batch_sizes.append(len(inputs))
+        return super().batch(inputs, config, **kwargs)
+
+    async def abatch(self, inputs, config=None, **kwargs):
+        self.batch_sizes.append(len(inputs))
+        return await super().abatch(inputs, config, **kwargs)
+
+
+def test_concurrent_calls_are_batched():
+    """Test that calls from several threads are grouped into batches."""
+    runnable = RecordingRunnable()
+    batcher = RequestBatcher(max_batch_size=4, max_wait=0.05)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda x: batcher.invoke(runnable, x), range(8)))
+
+    assert results == [x * 2 for x in range(8)]
+    assert sum(runnable.batch_sizes) == 8
+    assert len(runnable.batch_sizes) < 8
+
+
+def test_async_calls_are_batched():
+    """Test that concurrent coroutines share a single abatch call."""
+    runnable = RecordingRunnable()
+    batcher = RequestBatcher(max_batch_size=16, max_wait=0.01)
+
+    async def run_all():
+        return await asyncio.gather(*(batcher.ainvoke(runnable, x) for x in range(5)))
+
+    assert asyncio.run(run_all()) == [0, 2, 4, 6, 8]
+    assert runnable.batch_sizes == [5]
@@ -0,0 +1,105 @@
+"""Tests for run budgets and local finish detection."""
+import asyncio
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, RunBudget, SupervisorAgent
+from langgroup.testing import ScriptedChatModel
+from examples.example_agents import MathAgent, WritingAgent
+
+
+def always_route(next_agent: str):
+    """Build a responder whose supervisor always picks ``next_agent``."""
+
+    def respond(messages, tool_names):
+        if "RouteDecision" in tool_names:
+            return {"next_agent": next_agent, "reasoning": "Again"}
+        return "Partial answer"
+
+    return respond
+
+
+def test_max_hops_stops_ping_pong():
+    """Test that a looping run stops at the hop limit with its partial results."""
+    llm = ScriptedChatModel(responder=always_route("MathAgent"))
+    system = AgentSystem(llm, [MathAgent(llm)], budget=RunBudget(max_hops=3))
+
+    result = system.run("Calculate 2 + 2")
+
+    assert result["stop_reason"] == "max_hops"
+    assert result["next"] == "finish"
+    assert result["task_result"] == {"MathAgent": "Partial answer"}
+    assert llm.call_count == 6  # three supervisor turns and three agent calls
+
+
+def test_max_consecutive_same_agent():
+    """Test that repeated calls to one agent stop before the repeat limit is exceeded."""
+    llm = ScriptedChatModel(responder=always_route("MathAgent"))
+    system = AgentSystem(llm, [MathAgent(llm)])
+
+    result = asyncio.run(
+        system.arun("Calculate 2 + 2", budget=RunBudget(max_consecutive_same_agent=2))
+    )
+
+    assert result["stop_reason"] == "max_consecutive_same_agent"
+    assert len(result["messages"]) == 3
+
+
+def test_max_tokens_and_wall_time():
+    """Test that token and time limits end the run between hops."""
+    llm = ScriptedChatModel(responder=always_route("MathAgent"))
+    system = AgentSystem(llm, [MathAgent(llm)])
+
+    result = system.run("Calculate 2 + 2", budget=RunBudget(max_tokens=100))
+    assert result["stop_reason"] == "max_tokens"
+    assert len(result["messages"]) == 2
+
+    slow_llm = ScriptedChatModel(responder=always_route("MathAgent"), latency=0.05)
+    system = AgentSystem(slow_llm, [MathAgent(slow_llm)])
+    result = system.run("Calculate 2 + 2", budget=RunBudget(max_wall_time=0.15))
+    assert result["stop_reason"] == "max_wall_time"
+
+
+def test_finish_and_agent_names_are_case_insensitive():
+    """Test that "FINISH" ends the run and agent names match regardless of case."""
+    llm = ScriptedChatModel(responses=[
+        {"next_agent": "mathagent", "reasoning": "math"},
+        "4",
+        {"next_agent": " FINISH.", "reasoning": "done"},
+    ])
+    system = AgentSystem(llm, [MathAgent(llm)])
+
+    result = system.run("Calculate 2 + 2")
+
+    assert result["next"] == "finish"
+    assert result["task_result"] == {"MathAgent": "4"}
+    assert "stop_reason" not in result
+
+
+def test_unknown_agent_stops_gracefully():
+    """Test that an unknown agent name ends the run instead of failing."""
+    llm = ScriptedChatModel(responses=[{"next_agent": "PoetryAgent", "reasoning": "?"}])
+    system = AgentSystem(llm, [MathAgent(llm)])
+
+    result = system.run("Write a poem")
+
+    assert result["stop_reason"] == "unknown_agent"
+    assert result["task_result"] == {}
+
+
+def test_nested_team_inherits_budget():
+    """Test that a nested team follows the budget of the run it belongs to."""
+    llm = ScriptedChatModel(responder=always_route("MathAgent"))
+    team = SupervisorAgent(llm, [MathAgent(llm)], name="MathTeam")
+    top_llm = ScriptedChatModel(responses=[
+        {"next_agent": "MathTeam", "reasoning": "math"},
+        {"next_agent": "finish", "reasoning": "done"},
+    ])
+    system = AgentSystem(top_llm, [team, WritingAgent(top_llm)], budget=RunBudget(max_hops=2))
+
+    result = system.run("Calculate 2 + 2")
+
+    assert "stop_reason" not in result
+    assert "Stopped early: max_hops" in result["task_result"]["MathTeam"]
@@ -0,0 +1,57 @@
+"""Tests for the response caches."""
+import sys
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+sys.path.append("src")
+
+from langgroup import InMemoryCache, SQLiteCache
+from langgroup.cache import make_cache_key
+
+
+def test_in_memory_cache_evicts_least_recently_used():
+    """Test LRU eviction and hit/miss counting."""
+    cache = InMemoryCache(max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert (cache.stats.hits, cache.stats.misses) == (3, 1)
+
+
+def test_in_memory_cache_expires_entries():
+    """Test that entries expire after their TTL."""
+    cache = InMemoryCache(ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_persists_between_instances(tmp_path):
+    """Test that the on-disk cache survives reopening and evicts by size."""
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    cache.close()
+
+    reopened = SQLiteCache(path, max_size=2)
+    assert reopened.get("c") == "3"
+    assert reopened.get("a") is None
+    assert len(reopened) == 2
+
+
+def test_cache_key_ignores_whitespace_but_not_agent():
+    """Test prompt normalization and namespacing of cache keys."""
+    prompt = [SystemMessage(content="Route  tasks"), HumanMessage(content="Task:\n2 + 2")]
+    same = [SystemMessage(content="Route tasks"), HumanMessage(content="Task: 2 + 2")]
+
+    assert make_cache_key("supervisor", "gpt", prompt) == make_cache_key("supervisor", "gpt", same)
+    assert make_cache_key("MathAgent", "gpt", "2 + 2") != make_cache_key("WritingAgent", "gpt", "2 + 2")
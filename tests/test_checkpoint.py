@@ -0,0 +1,118 @@
+"""Tests for checkpointed and resumable runs."""
+import asyncio
+import re
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from langgroup import AgentSystem, SupervisorAgent
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, ResearchAgent
+
+
+def route_once(messages, tool_names):
+    """Route to the team's only agent, then finish."""
+    agent = re.findall(r"^- (\w+):", str(messages[0].content), re.MULTILINE)[0]
+    done = f"{agent} result:" in str(messages[-1].content)
+    return {"next_agent": "finish" if done else agent, "reasoning": "Scripted"}
+
+
+def route_teams(messages, tool_names):
+    """Route to the research team, then the math team, then finish."""
+    history = str(messages[-1].content)
+    if "MathTeam result:" in history:
+        next_agent = "finish"
+    elif "ResearchTeam result:" in history:
+        next_agent = "MathTeam"
+    else:
+        next_agent = "ResearchTeam"
+    return {"next_agent": next_agent, "reasoning": "Scripted"}
+
+
+class FlakyResponder:
+    """Fail until ``fail`` is cleared, then answer."""
+
+    def __init__(self):
+        self.fail = True
+
+    def __call__(self, messages, tool_names):
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return "4"
+
+
+def build_system(checkpointer, flaky):
+    team_llm = ScriptedChatModel(responder=route_once)
+    research_llm = ScriptedChatModel(responses=["Findings"])
+    math_llm = ScriptedChatModel(responder=flaky)
+    research_team = SupervisorAgent(team_llm, [ResearchAgent(research_llm)], name="ResearchTeam")
+    math_team = SupervisorAgent(team_llm, [MathAgent(math_llm)], name="MathTeam")
+    top_llm = ScriptedChatModel(responder=route_teams)
+    system = AgentSystem(top_llm, [research_team, math_team], checkpointer=checkpointer)
+    return system, top_llm, team_llm, research_llm, math_llm
+
+
+def test_resume_skips_completed_steps_in_nested_teams():
+    """Test that resuming a failed run repeats only the failed work."""
+    flaky = FlakyResponder()
+    system, top_llm, team_llm, research_llm, math_llm = build_system(InMemorySaver(), flaky)
+
+    with pytest.raises(RuntimeError):
+        system.run("Research and calculate", thread_id="run-1")
+    calls = (top_llm.call_count, team_llm.call_count, research_llm.call_count)
+
+    flaky.fail = False
+    result = system.resume("run-1")
+
+    assert "MathAgent: 4" in result["task_result"]["MathTeam"]
+    assert research_llm.call_count == calls[2]  # the research team is not re-run
+    assert top_llm.call_count == calls[0] + 1  # only the final decision
+    assert team_llm.call_count == calls[1] + 1  # only the math team's finish decision
+    assert math_llm.call_count == 2
+
+
+def test_async_resume_of_finished_run_returns_final_state():
+    """Test that resuming a finished run makes no new calls."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    system = AgentSystem(llm, [MathAgent(llm)], checkpointer=InMemorySaver())
+
+    first = asyncio.run(system.arun("Calculate 2 + 2", thread_id="run-2"))
+    calls = llm.call_count
+    resumed = asyncio.run(system.aresume("run-2"))
+
+    assert resumed["task_result"] == first["task_result"]
+    assert llm.call_count == calls
+
+
+def test_sqlite_checkpointer_persists_runs(tmp_path):
+    """Test that a run saved to SQLite can be resumed by a new system."""
+    sqlite = pytest.importorskip("langgraph.checkpoint.sqlite")
+    path = tmp_path / "checkpoints.db"
+    flaky = FlakyResponder()
+    system, *_ = build_system(sqlite.SqliteSaver(sqlite3.connect(path, check_same_thread=False)), flaky)
+    with pytest.raises(RuntimeError):
+        system.run("Research and calculate", thread_id="run-3")
+
+    flaky.fail = False
+    system, _, _, research_llm, _ = build_system(
+        sqlite.SqliteSaver(sqlite3.connect(path, check_same_thread=False)), flaky
+    )
+    result = system.resume("run-3")
+
+    assert set(result["task_result"]) == {"ResearchTeam", "MathTeam"}
+    assert research_llm.call_count == 0
+
+
+def test_thread_id_requires_checkpointer():
+    """Test the errors for missing checkpointers and unknown threads."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    with pytest.raises(ValueError):
+        AgentSystem(llm, [MathAgent(llm)]).run("Calculate 2 + 2", thread_id="run-4")
+    with pytest.raises(ValueError):
+        AgentSystem(llm, [MathAgent(llm)], checkpointer=InMemorySaver()).resume("missing")
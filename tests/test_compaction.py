@@ -0,0 +1,135 @@
+"""Tests for compacting team results at team boundaries."""
+import asyncio
+import sys
+
+import pytest
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import (
+    AgentSystem,
+    ExtractiveCompactor,
+    InMemoryCache,
+    InstructionHandoff,
+    LLMCompactor,
+    SupervisorAgent,
+    TruncateCompactor,
+)
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, ResearchAgent
+
+LONG = "Filler sentence without much to say. " * 40
+RESULTS = {"ResearchAgent": LONG + "The rate is 5 percent.", "MathAgent": "2 + 2 = 4"}
+
+
+def test_truncate_compactor_shares_budget():
+    """Test that short results are kept whole and long ones cut to fit the budget."""
+    text = TruncateCompactor(max_chars=200).compact("task", RESULTS)
+
+    assert len(text) <= 200
+    assert "- MathAgent: 2 + 2 = 4" in text
+    assert text.splitlines()[0].endswith("...")
+
+
+def test_extractive_compactor_keeps_relevant_sentences():
+    """Test that sentences matching the task and carrying numbers are kept."""
+    text = ExtractiveCompactor(max_chars=120).compact("What is the interest rate?", RESULTS)
+
+    assert len(text) <= 120
+    assert "The rate is 5 percent." in text
+    assert "- MathAgent: 2 + 2 = 4" in text
+
+
+def build_team(compactor):
+    """Build a system whose team replies at length; the top level finishes after one hop."""
+    team_llm = ScriptedChatModel(responder=sequential_router(hops=2, reply=LONG + "{request}"))
+    team = SupervisorAgent(
+        team_llm, [ResearchAgent(team_llm), MathAgent(team_llm)], name="Team", compactor=compactor
+    )
+    return team, team_llm
+
+
+def test_nested_team_hands_parent_a_bounded_summary_with_fetchable_full_results():
+    """Test that a team's oversized results are compacted and can be fetched in full."""
+    team, team_llm = build_team(TruncateCompactor(max_chars=300))
+    llm = ScriptedChatModel(responder=sequential_router(hops=1))
+    result = AgentSystem(llm, [team], handoff=InstructionHandoff()).run("Research rates")
+
+    summary = result["task_result"]["Team"]
+    assert len(summary) < 600
+    assert "full results " in summary
+    ref = summary.rsplit("full results ", 1)[1].rstrip("]\n")
+
+    # The parent asks for the full results: they are returned without re-running the team
+    calls = team_llm.call_count
+    decisions = iter([
+        {"next_agent": "Team", "reasoning": "need details", "instruction": f"full results {ref}"},
+        {"next_agent": "finish", "reasoning": "done"},
+    ])
+    parent = AgentSystem(
+        ScriptedChatModel(responder=lambda messages, tools: next(decisions)),
+        [team],
+        handoff=InstructionHandoff(),
+    )
+    full = parent.run("Show the details")["task_result"]["Team"]
+
+    assert team_llm.call_count == calls
+    assert full == team.full_results(ref)
+    assert full.count(LONG) == 2
+
+
+def test_full_results_can_be_fetched_with_a_parallel_subtask():
+    """Test that a parallel route's subtask fetches full results without an instruction handoff."""
+    team, team_llm = build_team(TruncateCompactor(max_chars=300))
+    summary = team.invoke({"messages": [("human", "Research rates")]})["messages"][0].content
+    ref = summary.rsplit("full results ", 1)[1].rstrip("]\n")
+
+    calls = team_llm.call_count
+    decisions = iter([
+        {"routes": [{"agent": "Team", "task": f"full results {ref}"}], "reasoning": "details"},
+        {"routes": [], "reasoning": "done"},
+    ])
+    parent = AgentSystem(
+        ScriptedChatModel(responder=lambda messages, tools: next(decisions)), [team], parallel=True
+    )
+
+    assert parent.run("Show the details")["task_result"]["Team"] == team.full_results(ref)
+    assert team_llm.call_count == calls
+
+
+def test_compacting_team_needs_a_handoff_that_passes_instructions():
+    """Test that a parent whose handoff drops instructions is rejected."""
+    team, _ = build_team(TruncateCompactor(max_chars=300))
+    llm = ScriptedChatModel(responses=[])
+
+    with pytest.raises(ValueError, match="Team"):
+        AgentSystem(llm, [team])
+
+
+def test_results_within_budget_are_not_compacted():
+    """Test that small results pass through unchanged."""
+    team, _ = build_team(TruncateCompactor(max_chars=100_000))
+    llm = ScriptedChatModel(responder=sequential_router(hops=1))
+
+    system = AgentSystem(llm, [team], handoff=InstructionHandoff())
+    summary = system.run("Research rates")["task_result"]["Team"]
+
+    assert "compacted" not in summary
+    assert summary.count(LONG) == 2
+
+
+def test_llm_compactor_summaries_are_cached():
+    """Test that identical team results are summarized by the model only once."""
+    summarizer = ScriptedChatModel(responder=lambda messages, tools: "Short summary")
+    compactor = LLMCompactor(summarizer, max_chars=300, cache=InMemoryCache())
+    team, _ = build_team(compactor)
+    llm = ScriptedChatModel(responder=sequential_router(hops=1))
+    system = AgentSystem(llm, [team], handoff=InstructionHandoff())
+
+    first = system.run("Research rates")["task_result"]["Team"]
+    second = asyncio.run(system.arun("Research rates"))["task_result"]["Team"]
+
+    assert first.startswith("Completed task using team Team:\nShort summary\n[Results compacted")
+    assert second == first
+    assert summarizer.call_count == 1
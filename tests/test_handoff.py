@@ -0,0 +1,113 @@
+"""Tests for agent handoff strategies."""
+import sys
+
+from langchain_core.messages import HumanMessage
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import (
+    AgentSystem,
+    FullHistoryHandoff,
+    InstructionHandoff,
+    InstructionWithResultsHandoff,
+    LastMessageHandoff,
+)
+from langgroup.testing import ScriptedChatModel
+from examples.example_agents import MathAgent, ResearchAgent, WritingAgent
+
+
+def make_state(instruction: str = "", context_agents=None) -> dict:
+    """Build a state after two agent results with a pending instruction."""
+    return {
+        "messages": [
+            HumanMessage(content="Write a report on rates"),
+            HumanMessage(content="ResearchAgent result: Rates rose", name="ResearchAgent"),
+            HumanMessage(content="MathAgent result: 5%", name="MathAgent"),
+        ],
+        "next": "WritingAgent",
+        "task_result": {"ResearchAgent": "Rates rose", "MathAgent": "5%"},
+        "instruction": instruction,
+        "context_agents": context_agents or [],
+    }
+
+
+def test_last_message_handoff_sends_previous_result():
+    """Test that the default strategy keeps the original behaviour."""
+    assert LastMessageHandoff().render(make_state("Draft it")) == "MathAgent result: 5%"
+    assert LastMessageHandoff().render({**make_state(), "subtask": "Sub"}) == "Sub"
+
+
+def test_instruction_handoff_falls_back_to_task():
+    """Test that the instruction is sent alone, or the task when there is none."""
+    assert InstructionHandoff().render(make_state("Draft the report")) == "Draft the report"
+    assert InstructionHandoff().render(make_state()) == "Write a report on rates"
+
+
+def test_instruction_with_results_includes_referenced_results():
+    """Test that only the referenced results are passed along with the task."""
+    request = InstructionWithResultsHandoff().render(
+        make_state("Draft the report", context_agents=["MathAgent"])
+    )
+
+    assert request.startswith("Overall task: Write a report on rates")
+    assert "- MathAgent: 5%" in request
+    assert "Rates rose" not in request
+    assert request.endswith("Your instruction: Draft the report")
+
+
+def test_full_history_handoff_appends_instruction():
+    """Test that the whole transcript is sent before the instruction."""
+    request = FullHistoryHandoff().render(make_state("Draft the report"))
+    assert request.startswith("Conversation so far:\nWrite a report on rates\n")
+    assert "MathAgent result: 5%\n\nYour instruction" in request
+    assert request.endswith("Your instruction: Draft the report")
+
+
+def test_supervisor_instruction_reaches_agent():
+    """Test that a routing decision's instruction and context reach the chosen agent."""
+    received = []
+
+    def respond(messages, tool_names):
+        if "RouteDecision" in tool_names:
+            done = str(messages[-1].content).count(" result: ")
+            if done == 0:
+                return {"next_agent": "ResearchAgent", "reasoning": "research"}
+            if done == 1:
+                return {"next_agent": "MathAgent", "reasoning": "math"}
+            if done == 2:
+                return {
+                    "next_agent": "WritingAgent",
+                    "reasoning": "write",
+                    "instruction": "Draft a one-line summary",
+                    "context_agents": ["researchagent"],
+                }
+            return {"next_agent": "finish", "reasoning": "done"}
+        received.append(messages[-1].content)
+        return "ok"
+
+    llm = ScriptedChatModel(responder=respond)
+    system = AgentSystem(
+        llm,
+        [ResearchAgent(llm), MathAgent(llm), WritingAgent(llm)],
+        handoff=InstructionWithResultsHandoff(),
+    )
+
+    result = system.run("Write a report on rates")
+
+    assert received[0] == "Write a report on rates"
+    assert "- ResearchAgent: ok" in received[2]
+    assert "- MathAgent" not in received[2]
+    assert received[2].endswith("Your instruction: Draft a one-line summary")
+    assert result["instruction"] == ""
+
+
+def test_supervisor_is_asked_for_instructions_only_when_the_handoff_uses_them():
+    """Test that the routing prompt mentions instructions only for instruction handoffs."""
+    llm = ScriptedChatModel(responses=[])
+    state = {"messages": [], "task_result": {}}
+
+    for handoff, asked in ((LastMessageHandoff(), False), (InstructionHandoff(), True)):
+        system = AgentSystem(llm, [MathAgent(llm)], handoff=handoff)
+        prompt = system.supervisor._build_prompt(state)[0].content
+        assert ("specific instruction" in prompt) is asked
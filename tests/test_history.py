@@ -0,0 +1,48 @@
+"""Tests for supervisor history strategies."""
+import sys
+
+from langchain_core.messages import HumanMessage
+
+sys.path.append("src")
+
+from langgroup import (
+    FullHistory,
+    ResultSummaryHistory,
+    SlidingWindowHistory,
+    TokenBudgetHistory,
+)
+from langgroup.history import estimate_tokens
+
+
+def make_state(num_results: int) -> dict:
+    """Build a state with a task followed by ``num_results`` agent results."""
+    messages = [HumanMessage(content="Original task")]
+    messages += [HumanMessage(content=f"Agent{i} result: " + "x" * 80) for i in range(num_results)]
+    return {"messages": messages, "next": "", "task_result": {"MathAgent": "y" * 1000}}
+
+
+def test_full_history_keeps_every_message():
+    """Test that the default strategy reproduces the full transcript."""
+    state = make_state(5)
+    assert FullHistory().render(state).count("\n") == 5
+
+
+def test_sliding_window_keeps_recent_messages():
+    """Test that the sliding window keeps only the trailing messages."""
+    history = SlidingWindowHistory(window=2).render(make_state(10))
+    assert history.startswith("[9 earlier messages omitted]")
+    assert "Agent9 result" in history
+    assert "Agent7 result" not in history
+
+
+def test_token_budget_bounds_history_size():
+    """Test that the token budget caps the rendered history."""
+    history = TokenBudgetHistory(max_tokens=100).render(make_state(50))
+    assert estimate_tokens(history) <= 110
+    assert "Agent49 result" in history
+
+
+def test_result_summary_truncates_results():
+    """Test that result summaries are truncated per agent."""
+    history = ResultSummaryHistory(max_chars_per_result=10).render(make_state(3))
+    assert history == "MathAgent result: yyyyyyyyyy..."
@@ -0,0 +1,41 @@
+"""Tests for lazy imports and lazy agent graph construction."""
+import subprocess
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, SupervisorAgent
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, WritingAgent
+
+
+def test_import_does_not_load_langchain():
+    """Test that importing the package defers LangChain and LangGraph until first use."""
+    code = (
+        "import sys; sys.path.insert(0, 'src'); import langgroup; "
+        "print(sorted(m for m in ('langchain', 'langgraph', 'langchain_core') if m in sys.modules)); "
+        "langgroup.AgentSystem; print('langgraph' in sys.modules)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+
+    assert output[:2] == ["[]", "True"]
+
+
+def test_agent_graphs_compile_on_first_use():
+    """Test that agents and teams compile their graphs only when invoked."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    math = MathAgent(llm)
+    team = SupervisorAgent(llm, [math], name="MathTeam")
+    writer = WritingAgent(llm)
+    system = AgentSystem(llm, [team, writer])
+
+    assert math._agent is None and team._agent is None and writer._agent is None
+
+    result = system.run("Calculate 2 + 2")
+
+    assert set(result["task_result"]) == {"MathTeam"}
+    assert math._agent is not None
+    assert writer._agent is None and team._agent is None
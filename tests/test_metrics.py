@@ -0,0 +1,87 @@
+"""Tests for per-run metrics and exporters."""
+import asyncio
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import (
+    AgentSystem,
+    InMemoryExporter,
+    MetricsCollector,
+    PrometheusExporter,
+    SupervisorAgent,
+)
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, WritingAgent
+
+
+def build_system(*exporters):
+    """Build a system with a nested math team whose agent calls its tool once."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    math_llm = ScriptedChatModel(responses=[
+        {"tool_calls": [{"name": "calculation_tool", "args": {"expression": "2 + 2"}}]},
+        "2 + 2 = 4",
+    ] * 2)
+    team = SupervisorAgent(llm, [MathAgent(math_llm)], name="MathTeam")
+    return AgentSystem(llm, [team, WritingAgent(llm)], metrics=MetricsCollector(list(exporters)))
+
+
+def test_run_metrics_by_team():
+    """Test that node, LLM, token and tool metrics land on the right team and agent."""
+    exporter = InMemoryExporter()
+    system = build_system(exporter)
+
+    for result in (system.run("Calculate 2 + 2"), asyncio.run(system.arun("Calculate 2 + 2"))):
+        metrics = result["metrics"]
+        root = metrics.team()
+        team = metrics.team("MathTeam")
+
+        assert metrics.max_depth == 1
+        assert (root.depth, team.depth) == (0, 1)
+        assert (root.hops, team.hops) == (1, 1)
+        assert root.nodes["supervisor"].calls == 2
+        assert root.nodes["MathTeam"].llm_calls == 0
+
+        math_agent = team.nodes["MathAgent"]
+        assert math_agent.calls == 1
+        assert math_agent.llm_calls == 2
+        assert math_agent.prompt_tokens > 0 and math_agent.completion_tokens > 0
+        assert len(math_agent.tool_durations["calculation_tool"]) == 1
+        assert root.nodes["MathTeam"].wall_time >= math_agent.wall_time > 0
+        assert metrics.wall_time >= root.nodes["MathTeam"].wall_time
+
+    assert len(exporter.runs) == 2
+
+
+def test_stream_final_state_carries_metrics():
+    """Test that streamed runs report metrics with the final state."""
+    system = build_system()
+
+    events = list(system.stream("Calculate 2 + 2"))
+
+    assert events[-1].data["result"]["metrics"].hops == 2
+
+
+def test_prometheus_exporter_renders_counters():
+    """Test that the Prometheus exporter accumulates runs into labelled series."""
+    prometheus = PrometheusExporter()
+    system = build_system(prometheus)
+
+    system.run("Calculate 2 + 2")
+    system.run("Calculate 2 + 2")
+    text = prometheus.render()
+
+    assert "# TYPE langgroup_runs_total counter" in text
+    assert "langgroup_runs_total 2" in text
+    assert 'langgroup_hops_total{team="MathTeam"} 2' in text
+    assert 'langgroup_team_depth{team="MathTeam"} 1' in text
+    assert 'langgroup_tool_calls_total{team="MathTeam",node="MathAgent",tool="calculation_tool"} 2' in text
+
+
+def test_metrics_off_by_default():
+    """Test that results carry no metrics unless a collector is attached."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    system = AgentSystem(llm, [MathAgent(llm)])
+
+    assert "metrics" not in system.run("Calculate 2 + 2")
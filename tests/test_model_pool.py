@@ -0,0 +1,140 @@
+"""Tests for the shared model pool and its rate limiter."""
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, ModelLimits, ModelPool, PriorityRateLimiter, SupervisorAgent
+from langgroup.model_pool import ROUTING, RateLimitHandler, call_priority
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, WritingAgent
+
+
+def test_limiter_paces_requests():
+    """Test that requests beyond the burst are spaced at the quota rate."""
+    limiter = PriorityRateLimiter(ModelLimits(requests_per_minute=600, burst_seconds=0.1))
+
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.25
+    assert not limiter.acquire(blocking=False)
+
+
+def test_routing_calls_go_before_waiting_agent_calls():
+    """Test that a routing call overtakes agent calls already waiting for capacity."""
+    limiter = PriorityRateLimiter(ModelLimits(requests_per_minute=600, burst_seconds=0.1))
+    limiter.acquire()
+    order = []
+
+    def call(kind):
+        if kind == "routing":
+            with call_priority(ROUTING):
+                limiter.acquire()
+        else:
+            limiter.acquire()
+        order.append(kind)
+
+    threads = [threading.Thread(target=call, args=("agent",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    threads.append(threading.Thread(target=call, args=("routing",)))
+    threads[-1].start()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["routing", "agent", "agent", "agent"]
+
+
+def test_interrupted_waiters_leave_the_line():
+    """Test that a cancelled or failing waiter does not hold up later callers."""
+    limiter = PriorityRateLimiter(ModelLimits(requests_per_minute=600, burst_seconds=0.1))
+    limiter.acquire()
+
+    async def cancel_waiter_then_acquire():
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return await asyncio.wait_for(limiter.aacquire(), timeout=1)
+
+    assert asyncio.run(cancel_waiter_then_acquire())
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupted_wait(timeout=None):
+        raise Interrupted()
+
+    limiter._condition.wait = interrupted_wait
+    with pytest.raises(Interrupted):
+        limiter.acquire()
+    del limiter._condition.wait
+
+    assert limiter._waiters == []
+    caller = threading.Thread(target=limiter.acquire)
+    caller.start()
+    caller.join(timeout=1)
+    assert not caller.is_alive()
+
+
+def test_token_debt_delays_next_call():
+    """Test that tokens charged after a call hold back the next one, also in async code."""
+    limiter = PriorityRateLimiter(ModelLimits(tokens_per_minute=6000, burst_seconds=0.1))
+    assert limiter.acquire()
+    limiter.record_tokens(20)  # 10 tokens of debt at 100 tokens per second
+
+    assert not limiter.acquire(blocking=False)
+    started = time.monotonic()
+    asyncio.run(limiter.aacquire())
+    assert time.monotonic() - started >= 0.08
+
+
+def test_rate_limit_error_pauses_model():
+    """Test that a 429 from the provider pauses further calls."""
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    limiter = PriorityRateLimiter(ModelLimits(backoff=0.1))
+    RateLimitHandler(limiter).on_llm_error(RateLimitError())
+
+    assert not limiter.acquire(blocking=False)
+    time.sleep(0.1)
+    assert limiter.acquire(blocking=False)
+
+
+def test_system_shares_pooled_models():
+    """Test that the supervisor and all agents, nested ones included, share one limited model."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    pool = ModelPool({"scripted": ModelLimits(requests_per_minute=6000, tokens_per_minute=600_000)})
+    team = SupervisorAgent(llm, [MathAgent(llm)], name="MathTeam")
+    system = AgentSystem(llm, [team, WritingAgent(llm)], model_pool=pool)
+
+    pooled = pool.get(llm)
+    assert pooled is not llm and pool.get(pooled) is pooled
+    assert system.llm is pooled
+    assert all(agent.llm is pooled for agent in system.agents)
+    assert team.sub_system.llm is pooled and team.available_agents[0].llm is pooled
+
+    result = system.run("Calculate 2 + 2")
+
+    assert set(result["task_result"]) == {"MathTeam"}
+    limiter = pool.limiters["scripted"]
+    assert limiter.tokens.tokens < limiter.tokens.capacity
+    assert llm.call_count == 0 and pooled.call_count > 0
+
+
+def test_models_without_limits_are_shared_unchanged():
+    """Test that a model without a quota is used as-is."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    pool = ModelPool()
+
+    assert pool.get(llm) is llm
+    assert pool.limiters == {}
@@ -0,0 +1,58 @@
+"""Tests for the state reducers in the data models."""
+import sys
+
+from langchain_core.messages import HumanMessage, RemoveMessage
+
+sys.path.append("src")
+
+from langgroup.models import append_message_batches, append_messages, merge_task_results
+
+
+def test_append_messages_assigns_ids_and_appends():
+    """Test that fresh messages are appended without mutating the old list."""
+    left = append_messages([], [HumanMessage(content="task")])
+    merged = append_messages(left, [HumanMessage(content="MathAgent result: 4")])
+
+    assert [msg.content for msg in merged] == ["task", "MathAgent result: 4"]
+    assert all(msg.id for msg in merged)
+    assert len(left) == 1
+
+
+def test_append_messages_handles_removals():
+    """Test that removals fall back to LangGraph's add_messages."""
+    left = append_messages([], [HumanMessage(content="a"), HumanMessage(content="b")])
+    merged = append_messages(left, [RemoveMessage(id=left[0].id)])
+
+    assert [msg.content for msg in merged] == ["b"]
+
+
+def test_append_message_batches_leaves_previous_list_unchanged():
+    """Test that the delta channel reducer copies its list once and still applies removals."""
+    left = append_message_batches([], [[HumanMessage(content="a")], [HumanMessage(content="b")]])
+    merged = append_message_batches(left, [[HumanMessage(content="c")]])
+
+    assert merged is not left
+    assert [msg.content for msg in left] == ["a", "b"]
+    assert [msg.content for msg in merged] == ["a", "b", "c"]
+    assert all(msg.id for msg in merged)
+
+    removed = append_message_batches(merged, [[RemoveMessage(id=merged[0].id)]])
+    assert [msg.content for msg in merged] == ["a", "b", "c"]
+    assert [msg.content for msg in removed] == ["b", "c"]
+
+
+def test_append_message_batches_appends_messages_with_new_ids():
+    """Test that messages LangGraph already gave an id are appended, and updates replace."""
+    left = append_message_batches([], [[HumanMessage(content="a", id="1")]])
+    merged = append_message_batches(
+        left, [[HumanMessage(content="b", id="2")], [HumanMessage(content="a2", id="1")]]
+    )
+
+    assert [msg.content for msg in left] == ["a"]
+    assert [msg.content for msg in merged] == ["a2", "b"]
+
+
+def test_merge_task_results_prefers_newer_results():
+    """Test that newer agent results replace older ones."""
+    merged = merge_task_results({"MathAgent": "1", "WritingAgent": "w"}, {"MathAgent": "2"})
+    assert merged == {"MathAgent": "2", "WritingAgent": "w"}
@@ -1,6 +1,11 @@
 """Test script for the multiagent system."""
+import asyncio
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from dotenv import load_dotenv
 
@@ -9,6 +14,7 @@ sys.path.append("examples")
 sys.path.append("src")
 
 from langgroup import AgentSystem, SupervisorAgent
+from langgroup.testing import ScriptedChatModel, sequential_router
 from langchain_openai import ChatOpenAI
 from examples.example_agents import (
     ResearchAgent,
@@ -123,6 +129,115 @@ def test_hierarchical_supervisors():
     # The task should complete successfully
     assert result["next"] == "finish" or len(result["task_result"]) > 0
 
+@requires_openai
+def test_async_workflow():
+    """Test running several tasks concurrently on one event loop."""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    research_supervisor = SupervisorAgent(
+        llm, [ResearchAgent(llm), AnalysisAgent(llm)], name="ResearchTeamSupervisor"
+    )
+    system = AgentSystem(llm, [research_supervisor, MathAgent(llm), WritingAgent(llm)])
+
+    async def run_all():
+        return await asyncio.gather(
+            system.arun("Calculate 15 * 8"),
+            system.arun("Research the capital of France and write it down."),
+        )
+
+    math_result, research_result = asyncio.run(run_all())
+
+    assert "MathAgent" in math_result["task_result"]
+    assert "120" in math_result["task_result"]["MathAgent"]
+    assert len(research_result["task_result"]) > 0
+
+@requires_openai
+def test_parallel_fan_out():
+    """Test dispatching independent subtasks to several agents at once."""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    agents = [
+        ResearchAgent(llm),
+        AnalysisAgent(llm),
+        WritingAgent(llm),
+        MathAgent(llm),
+    ]
+    system = AgentSystem(llm, agents, parallel=True)
+    test_task = "Independently: calculate 15 * 8, and research the capital of France."
+    result = system.run(test_task)
+
+    assert "MathAgent" in result["task_result"]
+    assert "ResearchAgent" in result["task_result"]
+    assert "120" in result["task_result"]["MathAgent"]
+    assert result["next"] == "finish"
+
+@requires_openai
+def test_run_many():
+    """Test running a stream of tasks with bounded concurrency."""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    system = AgentSystem(llm, [MathAgent(llm), WritingAgent(llm)])
+    tasks = (f"Calculate {i} * 10" for i in range(4))
+
+    outcomes = list(system.run_many(tasks, max_concurrency=2))
+
+    assert sorted(outcome.index for outcome in outcomes) == [0, 1, 2, 3]
+    assert all(outcome.ok for outcome in outcomes)
+    for outcome in outcomes:
+        assert "MathAgent" in outcome.result["task_result"]
+
+@requires_openai
+def test_stream_hierarchical_events():
+    """Test that streaming reports events from nested teams with their path."""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    content_supervisor = SupervisorAgent(llm, [MathAgent(llm)], name="ContentTeamSupervisor")
+    system = AgentSystem(llm, [content_supervisor, WritingAgent(llm)])
+
+    events = list(system.stream("Calculate 15 * 8"))
+
+    assert events[0].type == "supervisor_decision"
+    assert events[-1].type == "final"
+    assert "ContentTeamSupervisor" in events[-1].data["result"]["task_result"]
+    nested = [event for event in events if event.path == ("ContentTeamSupervisor",)]
+    assert any(event.type == "agent_start" and event.agent == "MathAgent" for event in nested)
+    assert any(event.type == "tool_start" for event in nested)
+    assert any(event.type == "token" for event in nested)
+
+def test_supervisor_reuses_sub_system():
+    """Test that a supervisor builds its sub-system once and reuses it."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    supervisor = SupervisorAgent(llm, [MathAgent(llm), WritingAgent(llm)], name="ContentTeamSupervisor")
+
+    sub_system = supervisor.sub_system
+
+    assert isinstance(sub_system, AgentSystem)
+    assert supervisor.sub_system is sub_system
+    assert sub_system.agents == supervisor.available_agents
+
+def test_concurrent_first_use_builds_one_sub_system(monkeypatch):
+    """Test that threads racing on first use all get the same, single sub-system."""
+    import langgroup.agent_system
+
+    builds = []
+    build_workflow = langgroup.agent_system.AgentSystem._build_workflow
+
+    def slow_build_workflow(self):
+        builds.append(self)
+        time.sleep(0.05)  # widen the window in which a second build could start
+        return build_workflow(self)
+
+    monkeypatch.setattr(langgroup.agent_system.AgentSystem, "_build_workflow", slow_build_workflow)
+    llm = ScriptedChatModel(responder=sequential_router())
+    supervisor = SupervisorAgent(llm, [MathAgent(llm), WritingAgent(llm)], name="ContentTeamSupervisor")
+    barrier = threading.Barrier(8)
+
+    def first_use(_):
+        barrier.wait()
+        return supervisor.sub_system
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sub_systems = list(executor.map(first_use, range(8)))
+
+    assert len(builds) == 1
+    assert all(sub_system is builds[0] for sub_system in sub_systems)
+
 if __name__ == "__main__":
     # This allows running the tests directly from the script
     # The -s flag shows print statements, -v is for verbose output
@@ -0,0 +1,272 @@
+"""Offline tests of the multiagent system using the scripted chat model."""
+import asyncio
+import sys
+import threading
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgroup import AgentSystem, InMemoryCache, RouteDecision, RunBudget, SupervisorAgent
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import (
+    ResearchAgent,
+    WritingAgent,
+    MathAgent,
+)
+
+
+def test_scripted_structured_output():
+    """Test that scripted dicts come back as structured routing decisions."""
+    llm = ScriptedChatModel(responses=[{"next_agent": "MathAgent", "reasoning": "math"}])
+    decision = llm.with_structured_output(RouteDecision).invoke("route this")
+
+    assert decision == RouteDecision(next_agent="MathAgent", reasoning="math")
+
+
+def test_scripted_tool_calls():
+    """Test a scripted run where the agent calls its tool."""
+    llm = ScriptedChatModel(responses=[
+        {"next_agent": "MathAgent", "reasoning": "Needs a calculation"},
+        {"tool_calls": [{"name": "calculation_tool", "args": {"expression": "15 * 8"}}]},
+        "15 * 8 = 120",
+        {"next_agent": "finish", "reasoning": "Done"},
+    ])
+    system = AgentSystem(llm, [MathAgent(llm), WritingAgent(llm)])
+
+    result = system.run("Calculate 15 * 8")
+
+    assert result["task_result"] == {"MathAgent": "15 * 8 = 120"}
+    assert result["next"] == "finish"
+    assert llm.call_count == 4
+
+
+def test_offline_sequential_and_async_runs():
+    """Test sync and async runs route through agents in order."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=2))
+    system = AgentSystem(llm, [MathAgent(llm), WritingAgent(llm)])
+
+    for result in (system.run("Calculate 2 + 2"), asyncio.run(system.arun("Calculate 2 + 2"))):
+        assert list(result["task_result"]) == ["MathAgent", "WritingAgent"]
+        assert len(result["messages"]) == 3
+
+
+def test_offline_concurrent_async_runs():
+    """Test that several arun calls share one event loop and keep their results apart."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=1), latency=0.05)
+    team = SupervisorAgent(llm, [ResearchAgent(llm)], name="ResearchTeamSupervisor")
+    system = AgentSystem(llm, [MathAgent(llm), team])
+
+    async def run_all():
+        return await asyncio.gather(*(system.arun(f"Calculate {i} * 8") for i in range(3)))
+
+    results = asyncio.run(run_all())
+
+    for i, result in enumerate(results):
+        assert result["messages"][0].content == f"Calculate {i} * 8"
+        assert result["task_result"] == {"MathAgent": f"Done: Calculate {i} * 8"}
+        assert result["next"] == "finish"
+
+
+def count_concurrent_outcomes(system, run_async=False):
+    """Wrap a system's per-task runner to record the peak number of tasks in flight."""
+    lock, counts = threading.Lock(), {"active": 0, "peak": 0}
+
+    def enter():
+        with lock:
+            counts["active"] += 1
+            counts["peak"] = max(counts["peak"], counts["active"])
+
+    def leave():
+        with lock:
+            counts["active"] -= 1
+
+    if run_async:
+        run_outcome = system._arun_outcome
+
+        async def counting(*args):
+            enter()
+            try:
+                return await run_outcome(*args)
+            finally:
+                leave()
+    else:
+        run_outcome = system._run_outcome
+
+        def counting(*args):
+            enter()
+            try:
+                return run_outcome(*args)
+            finally:
+                leave()
+
+    setattr(system, "_arun_outcome" if run_async else "_run_outcome", counting)
+    return counts
+
+
+def test_offline_run_many_bounds_concurrency_and_indexes_outcomes():
+    """Test that run_many and arun_many keep max_concurrency and report each task's index."""
+    tasks = [f"Calculate {i} * 8" for i in range(6)]
+
+    for run_async in (False, True):
+        llm = ScriptedChatModel(responder=sequential_router(hops=1), latency=0.02)
+        system = AgentSystem(llm, [MathAgent(llm)])
+        counts = count_concurrent_outcomes(system, run_async)
+
+        if run_async:
+            async def collect():
+                return [outcome async for outcome in system.arun_many(iter(tasks), max_concurrency=2)]
+
+            outcomes = asyncio.run(collect())
+        else:
+            outcomes = list(system.run_many(iter(tasks), max_concurrency=2))
+
+        assert counts["peak"] == 2
+        outcomes.sort(key=lambda outcome: outcome.index)
+        assert [outcome.task for outcome in outcomes] == tasks
+        for outcome in outcomes:
+            assert outcome.ok
+            assert outcome.result["task_result"] == {"MathAgent": f"Done: {outcome.task}"}
+
+
+def test_offline_hierarchical_stream():
+    """Test streamed events from a nested team carry the team path."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    team = SupervisorAgent(llm, [ResearchAgent(llm)], name="ResearchTeamSupervisor")
+    system = AgentSystem(llm, [team, WritingAgent(llm)])
+
+    events = list(system.stream("Research the capital of France"))
+
+    nested = [(event.type, event.agent) for event in events if event.path == ("ResearchTeamSupervisor",)]
+    assert ("agent_start", "ResearchAgent") in nested
+    assert ("token", "ResearchAgent") in nested
+    assert events[-1].type == "final"
+    assert "ResearchTeamSupervisor" in events[-1].data["result"]["task_result"]
+
+
+def test_values_stream_chunks_are_snapshots():
+    """Test that a kept values chunk does not change as the run goes on."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=2))
+    system = AgentSystem(llm, [MathAgent(llm), WritingAgent(llm)])
+
+    chunks, lengths = [], []
+    for chunk in system.workflow.stream(
+        system._initial_state("Calculate 2 + 2"), stream_mode="values"
+    ):
+        chunks.append(chunk)
+        lengths.append(len(chunk["messages"]))
+
+    assert lengths[0] == 1
+    assert lengths[-1] == 3
+    assert [len(chunk["messages"]) for chunk in chunks] == lengths
+    assert [msg.content for msg in chunks[0]["messages"]] == ["Calculate 2 + 2"]
+
+
+def test_offline_stream_takes_run_arguments():
+    """Test that streaming honours a budget and checkpoints under a thread, like run."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=3))
+    team = SupervisorAgent(llm, [ResearchAgent(llm)], name="ResearchTeamSupervisor")
+    system = AgentSystem(llm, [team, WritingAgent(llm)], checkpointer=InMemorySaver())
+
+    async def collect():
+        events = system.astream(
+            "Research the capital of France", budget=RunBudget(max_hops=1), thread_id="stream-1"
+        )
+        return [event async for event in events]
+
+    for events in (
+        list(system.stream(
+            "Research the capital of France", budget=RunBudget(max_hops=1), thread_id="stream-0"
+        )),
+        asyncio.run(collect()),
+    ):
+        result = events[-1].data["result"]
+        assert result["stop_reason"] == "max_hops"
+        assert list(result["task_result"]) == ["ResearchTeamSupervisor"]
+        assert any(event.path == ("ResearchTeamSupervisor",) for event in events)
+
+    for thread_id in ("stream-0", "stream-1"):
+        state = system.workflow.get_state({"configurable": {"thread_id": thread_id}})
+        assert state.values["stop_reason"] == "max_hops"
+
+
+def test_offline_parallel_fan_out():
+    """Test that a parallel decision runs every routed agent in one step."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    system = AgentSystem(llm, [MathAgent(llm), ResearchAgent(llm)], parallel=True)
+
+    result = system.run("Do two independent things")
+
+    assert result["task_result"] == {
+        "MathAgent": "Done: Subtask for MathAgent",
+        "ResearchAgent": "Done: Subtask for ResearchAgent",
+    }
+
+
+def test_offline_fan_out_to_unknown_agents_stops_run():
+    """Test that a parallel decision naming only unknown agents stops the run."""
+    decisions = iter([
+        {"routes": [{"agent": "GhostAgent", "task": "haunt"}], "reasoning": "typo"},
+    ])
+    llm = ScriptedChatModel(responder=lambda messages, tools: next(decisions))
+    system = AgentSystem(llm, [MathAgent(llm), ResearchAgent(llm)], parallel=True)
+
+    result = system.run("Do two independent things")
+
+    assert result["stop_reason"] == "unknown_agent"
+    assert result["task_result"] == {}
+    assert llm.call_count == 1
+
+
+def test_offline_cache_skips_repeated_calls():
+    """Test that a repeated task is served entirely from the cache."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    system = AgentSystem(llm, [MathAgent(llm)], cache=InMemoryCache())
+
+    first = system.run("Calculate 2 + 2")
+    calls = llm.call_count
+    second = system.run("Calculate 2 + 2")
+
+    assert llm.call_count == calls
+    assert second["task_result"] == first["task_result"]
+
+
+def test_supervisor_system_prompt_is_a_stable_prefix():
+    """Test that every routing call starts with the same system message."""
+    system_messages = []
+    route = sequential_router(hops=3)
+
+    def respond(messages, tool_names):
+        if "RouteDecision" in tool_names:
+            system_messages.append(messages[0].content)
+        return route(messages, tool_names)
+
+    llm = ScriptedChatModel(responder=respond)
+    system = AgentSystem(llm, [ResearchAgent(llm), MathAgent(llm)])
+    system.run("Research and calculate")
+    system.run("Something else")
+
+    assert len(system_messages) == 8
+    assert len(set(system_messages)) == 1
+    assert "- MathAgent: " in system_messages[0]
+
+
+def test_team_prompts_follow_agent_list_changes():
+    """Test that cached prompts and descriptions are rebuilt when agents are added."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    team = SupervisorAgent(llm, [MathAgent(llm)], name="Team")
+    system = AgentSystem(llm, [team])
+    state = {"messages": [], "task_result": {}}
+
+    description = team.description
+    assert team.description is description
+    prompt = system.supervisor._build_prompt(state)[0].content
+    assert system.supervisor._build_prompt(state)[0].content is prompt
+
+    team.available_agents.append(WritingAgent(llm))
+    system.agents.append(ResearchAgent(llm))
+
+    assert team.description.endswith("Use for writing and documentation tasks.")
+    prompt = system.supervisor._build_prompt(state)[0].content
+    assert "- ResearchAgent: " in prompt and team.description in prompt
+    assert system.supervisor.resolve_agent_name("researchagent") == "ResearchAgent"
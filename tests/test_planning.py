@@ -0,0 +1,149 @@
+"""Tests for plan-then-execute mode."""
+import asyncio
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, SupervisorAgent
+from langgroup.agent_system import REPLAN_SIGNAL
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, ResearchAgent, WritingAgent
+
+DAG = {
+    "steps": [
+        {"id": "1", "agent": "ResearchAgent", "task": "Research rates"},
+        {"id": "2", "agent": "MathAgent", "task": "Compute 5% of 200"},
+        {"id": "3", "agent": "WritingAgent", "task": "Write it up", "depends_on": ["1", "2"]},
+    ],
+    "reasoning": "Research and math are independent",
+}
+
+
+def planner(plans, prompts):
+    """Build a responder that returns ``plans`` in turn and echoes agent requests."""
+
+    def respond(messages, tool_names):
+        if "TaskPlan" in tool_names:
+            prompts.append(messages[-1].content)
+            return plans[min(len(prompts), len(plans)) - 1]
+        request = messages[-1].content
+        if request.startswith("Compute") and "broken" in plans[0]["reasoning"]:
+            raise RuntimeError("calculator offline")
+        if request.startswith("Check") and "unclear" in plans[0]["reasoning"]:
+            return f"{REPLAN_SIGNAL} the source is ambiguous"
+        return f"did: {request.splitlines()[0]}"
+
+    return respond
+
+
+def build_system(plans, prompts, **kwargs):
+    llm = ScriptedChatModel(responder=planner(plans, prompts))
+    agents = [ResearchAgent(llm), MathAgent(llm), WritingAgent(llm)]
+    return AgentSystem(llm, agents, planning=True, **kwargs)
+
+
+def test_plan_runs_as_dag_with_one_supervisor_call():
+    """Test that independent steps run together and dependents get their results."""
+    prompts = []
+    system = build_system([DAG], prompts)
+
+    result = system.run("Report on 5% of 200")
+
+    assert len(prompts) == 1
+    assert result["next"] == "finish"
+    assert [msg.name for msg in result["messages"][1:]] == ["ResearchAgent", "MathAgent", "WritingAgent"]
+    writing = result["task_result"]["WritingAgent"]
+    assert writing == "did: Write it up"
+    assert set(result["step_results"]) == {"0.1", "0.2", "0.3"}
+    assert all(step.id.startswith("0.") for step in result["plan"])
+
+
+def test_dependent_step_receives_dependency_results():
+    """Test that a step's request includes the results of the steps it depends on."""
+    requests = []
+    respond = planner([DAG], [])
+
+    def recording(messages, tool_names):
+        if "TaskPlan" not in tool_names:
+            requests.append(messages[-1].content)
+        return respond(messages, tool_names)
+
+    llm = ScriptedChatModel(responder=recording)
+    system = AgentSystem(llm, [ResearchAgent(llm), MathAgent(llm), WritingAgent(llm)], planning=True)
+    system.run("Report on 5% of 200")
+
+    writing_request = requests[-1]
+    assert writing_request.startswith("Write it up\n\nResults this step builds on:\n")
+    assert "- ResearchAgent: did: Research rates" in writing_request
+    assert "- MathAgent: did: Compute 5% of 200" in writing_request
+    assert REPLAN_SIGNAL in writing_request
+
+
+def test_failed_step_triggers_replan():
+    """Test that a failing step is reported back to the supervisor for a new plan."""
+    broken = {**DAG, "reasoning": "broken calculator"}
+    fixed = {
+        "steps": [{"id": "1", "agent": "WritingAgent", "task": "Write it up without math"}],
+        "reasoning": "Skip the calculation",
+    }
+    prompts = []
+    system = build_system([broken, fixed], prompts)
+
+    result = system.run("Report on 5% of 200")
+
+    assert len(prompts) == 2
+    assert "The previous plan could not be completed" in prompts[1]
+    assert "RuntimeError: calculator offline" in prompts[1]
+    assert result["failed_steps"] == {"0.2": "RuntimeError: calculator offline"}
+    assert result["task_result"]["WritingAgent"] == "did: Write it up without math"
+    assert result["replans"] == 1 and "stop_reason" not in result
+
+
+def test_replan_signal_and_replan_limit():
+    """Test that a step can ask for a new plan and that replanning is bounded."""
+    unclear = {
+        "steps": [{"id": "1", "agent": "ResearchAgent", "task": "Check the source"}],
+        "reasoning": "unclear source",
+    }
+    prompts = []
+    system = build_system([unclear], prompts, max_replans=1)
+
+    result = system.run("Find the rate")
+
+    assert len(prompts) == 2
+    assert "asked for a new plan" in prompts[1]
+    assert result["stop_reason"] == "plan_failed"
+
+
+def test_invalid_plan_is_replanned_before_running():
+    """Test that plans naming unknown agents or cyclic steps are sent back at once."""
+    cyclic = {
+        "steps": [
+            {"id": "a", "agent": "MathAgent", "task": "A", "depends_on": ["b"]},
+            {"id": "b", "agent": "MathAgent", "task": "B", "depends_on": ["a"]},
+        ],
+        "reasoning": "cycle",
+    }
+    unknown = {"steps": [{"id": "1", "agent": "ChartAgent", "task": "Chart"}], "reasoning": "chart"}
+    prompts = []
+    system = build_system([cyclic, unknown, DAG], prompts)
+
+    result = system.run("Report on 5% of 200")
+
+    assert len(prompts) == 3
+    assert "cycle" in prompts[1] and "no agent named ChartAgent" in prompts[2]
+    assert set(result["task_result"]) == {"ResearchAgent", "MathAgent", "WritingAgent"}
+
+
+def test_async_nested_planning_team():
+    """Test planning mode in a nested team run on the event loop."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=2))
+    team = SupervisorAgent(llm, [MathAgent(llm), WritingAgent(llm)], name="Team", planning=True)
+    system = AgentSystem(llm, [team], planning=True)
+
+    result = asyncio.run(system.arun("Calculate and write"))
+
+    assert set(result["task_result"]) == {"Team"}
+    assert "- MathAgent: " in result["task_result"]["Team"]
+    assert "- WritingAgent: " in result["task_result"]["Team"]
@@ -0,0 +1,84 @@
+"""Tests for reusing agent results within a run."""
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, InMemoryCache, InstructionHandoff, SupervisorAgent
+from langgroup.testing import ScriptedChatModel
+from examples.example_agents import MathAgent, WritingAgent
+
+ROUTES = [
+    {"next_agent": "MathAgent", "reasoning": "compute", "instruction": "Compute 2 + 2"},
+    {"next_agent": "MathAgent", "reasoning": "again", "instruction": "Compute 2 + 2"},
+    {"next_agent": "MathAgent", "reasoning": "new input", "instruction": "Compute 3 + 3"},
+    {"next_agent": "MathAgent", "reasoning": "back", "instruction": "Compute  2 + 2 "},
+    {"next_agent": "finish", "reasoning": "done"},
+]
+
+
+class DiceAgent(MathAgent):
+    """A nondeterministic agent whose results must not be reused."""
+
+    @property
+    def reusable(self) -> bool:
+        return False
+
+
+def router(prompts):
+    """Build a responder that follows ROUTES and records the supervisor's prompts."""
+
+    def respond(messages, tool_names):
+        prompts.append(messages[-1].content)
+        return ROUTES[len(prompts) - 1]
+
+    return respond
+
+
+def build_system(agent_cls=MathAgent, **kwargs):
+    prompts = []
+    llm = ScriptedChatModel(responder=router(prompts))
+    math_llm = ScriptedChatModel(responder=lambda messages, tools: f"answer to {messages[-1].content}")
+    agents = [agent_cls(math_llm, name="MathAgent"), WritingAgent(math_llm)]
+    system = AgentSystem(llm, agents, handoff=InstructionHandoff(), **kwargs)
+    return system, math_llm, prompts
+
+
+def test_repeated_request_reuses_result_and_tells_supervisor():
+    """Test that a repeated request is answered from the run and flagged to the supervisor."""
+    system, math_llm, prompts = build_system(reuse_results=True)
+
+    result = system.run("Add some numbers")
+
+    assert math_llm.call_count == 2
+    assert "MathAgent was not run again" in prompts[2]
+    # An earlier request is reused after a different one, ignoring whitespace
+    assert [prompt.count("MathAgent was not run again") for prompt in prompts[3:]] == [1, 2]
+    assert result["task_result"]["MathAgent"] == "answer to Compute 2 + 2"
+    assert result["agent_results"] == {
+        "MathAgent": {
+            "Compute 2 + 2": "answer to Compute 2 + 2",
+            "Compute 3 + 3": "answer to Compute 3 + 3",
+        }
+    }
+
+
+def test_results_are_not_reused_by_default_or_for_unreusable_agents():
+    """Test that reuse is opt-in and skipped for agents that are not reusable."""
+    system, math_llm, prompts = build_system()
+    system.run("Add some numbers")
+    assert math_llm.call_count == 4
+    assert "not run again" not in prompts[2]
+
+    cache = InMemoryCache()
+    system, math_llm, _ = build_system(DiceAgent, reuse_results=True, cache=cache)
+    system.run("Add some numbers")
+    assert math_llm.call_count == 4
+    assert cache.stats.hits == 0
+
+
+def test_team_is_reusable_only_if_all_its_agents_are():
+    """Test that a team inherits the reusability of its agents."""
+    llm = ScriptedChatModel(responses=[])
+    assert SupervisorAgent(llm, [MathAgent(llm), WritingAgent(llm)]).reusable
+    assert not SupervisorAgent(llm, [DiceAgent(llm), WritingAgent(llm)]).reusable
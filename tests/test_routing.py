@@ -0,0 +1,85 @@
+"""Tests for the tiered fast router."""
+import asyncio
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, EmbeddingRouter, RuleRouter, SupervisorAgent, TieredRouter
+from langgroup.routing import cosine_similarity, hashed_embedding
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import AnalysisAgent, MathAgent, ResearchAgent, WritingAgent
+
+
+def example_agents(llm):
+    return [ResearchAgent(llm), AnalysisAgent(llm), WritingAgent(llm), MathAgent(llm)]
+
+
+def test_rule_router_requires_a_single_match():
+    """Test that rules decide only when exactly one agent matches."""
+    agents = example_agents(ScriptedChatModel())
+    router = RuleRouter()
+
+    assert router.match("Calculate 15 * 8", agents).agent == "MathAgent"
+    assert router.match("12 * (3 + 4)", agents).agent == "MathAgent"
+    assert router.match("Research Python and write a summary", agents) is None
+    assert router.match("Tell me a joke", agents) is None
+
+
+def test_embedding_router_uses_description_similarity():
+    """Test that the embedding tier picks the agent with the closest description."""
+    agents = example_agents(ScriptedChatModel())
+    router = EmbeddingRouter()
+
+    match = router.match("Gather information about the history of Rome", agents)
+
+    assert match.agent == "ResearchAgent"
+    assert match.confidence > 0.6
+    assert router.match("zzz qqq", agents) is None
+    assert cosine_similarity(hashed_embedding("calculations"), hashed_embedding("Calculate")) == 1.0
+
+
+def test_tiered_router_skips_supervisor_calls():
+    """Test that a confident route and the following finish need no supervisor call."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    router = TieredRouter(finish_on_result=True)
+    system = AgentSystem(llm, example_agents(llm), router=router)
+
+    result = system.run("Calculate 15 * 8")
+
+    assert list(result["task_result"]) == ["MathAgent"]
+    assert llm.call_count == 1  # the MathAgent's own call only
+    assert router.stats == {"rules": 2, "embedding": 0, "llm": 0}
+
+
+def test_supervisor_decides_after_a_rule_routed_hop():
+    """Test that a multi-step task is not finished after its first rule-routed agent."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=2))
+    router = TieredRouter(tiers=[RuleRouter()])
+    system = AgentSystem(llm, [MathAgent(llm), WritingAgent(llm)], router=router)
+
+    result = system.run("Calculate 15 * 8, then turn the result into a short report")
+
+    assert list(result["task_result"]) == ["MathAgent", "WritingAgent"]
+    assert router.stats == {"rules": 1, "llm": 2}
+
+
+def test_tiered_router_falls_back_to_llm():
+    """Test that ambiguous tasks are routed by the supervisor LLM."""
+    llm = ScriptedChatModel(responder=sequential_router(hops=2))
+    router = TieredRouter(tiers=[RuleRouter()])
+    system = AgentSystem(llm, [ResearchAgent(llm), WritingAgent(llm)], router=router)
+
+    result = asyncio.run(system.arun("Research Python and write a summary"))
+
+    assert list(result["task_result"]) == ["ResearchAgent", "WritingAgent"]
+    assert router.stats == {"rules": 0, "llm": 3}
+
+
+def test_tiered_router_in_nested_team():
+    """Test that a team passes its router to its sub-system."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    router = TieredRouter(tiers=[RuleRouter()])
+    team = SupervisorAgent(llm, [MathAgent(llm)], name="MathTeam", router=router)
+
+    assert team.sub_system.supervisor.router is router
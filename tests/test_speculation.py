@@ -0,0 +1,160 @@
+"""Tests for speculative routing."""
+import asyncio
+import sys
+import threading
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import (
+    AgentSystem,
+    InstructionHandoff,
+    MetricsCollector,
+    PrometheusExporter,
+    TransitionPredictor,
+)
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, WritingAgent
+
+START_STATE = {"messages": [HumanMessage(content="task")]}
+
+
+def warmed_predictor(next_agent: str, times: int = 3) -> TransitionPredictor:
+    """Build a predictor that has seen ``next_agent`` chosen first ``times`` times."""
+    predictor = TransitionPredictor()
+    for _ in range(times):
+        predictor.observe(START_STATE, next_agent)
+    return predictor
+
+
+def build_system(predictor, supervisor_latency=0.2, agent_latency=0.2, *exporters):
+    """Build a system whose supervisor routes to MathAgent once, then finishes."""
+    llm = ScriptedChatModel(responder=sequential_router(), latency=supervisor_latency)
+    math_llm = ScriptedChatModel(responses=["2 + 2 = 4"], latency=agent_latency)
+    writing_llm = ScriptedChatModel(responses=["A summary"], latency=agent_latency)
+    system = AgentSystem(
+        llm,
+        [MathAgent(math_llm), WritingAgent(writing_llm)],
+        metrics=MetricsCollector(list(exporters)),
+        speculation=predictor,
+    )
+    return system, math_llm, writing_llm
+
+
+def test_transition_predictor_threshold():
+    """Test that an agent is predicted only after enough consistent observations."""
+    predictor = warmed_predictor("MathAgent", times=2)
+    assert predictor.predict(START_STATE) is None
+
+    predictor.observe(START_STATE, "MathAgent")
+    assert predictor.predict(START_STATE) == "MathAgent"
+
+    for _ in range(3):
+        predictor.observe(START_STATE, "WritingAgent")
+    assert predictor.predict(START_STATE) is None
+    assert predictor.transitions() == {"__start__": {"MathAgent": 3, "WritingAgent": 3}}
+
+
+def test_matching_speculation_overlaps_supervisor_call():
+    """Test that a correct prediction is used and hides the agent's latency."""
+    # The first routing call and the agent call each wait for the other, so
+    # both only return if the agent ran while the supervisor was deciding
+    overlap = threading.Barrier(2, timeout=5)
+    route = sequential_router()
+
+    def supervisor(messages, tool_names):
+        if " result: " not in str(messages[-1].content):
+            overlap.wait()
+        return route(messages, tool_names)
+
+    def math_agent(messages, tool_names):
+        overlap.wait()
+        return "2 + 2 = 4"
+
+    llm = ScriptedChatModel(responder=supervisor)
+    math_llm = ScriptedChatModel(responder=math_agent)
+    system = AgentSystem(
+        llm,
+        [MathAgent(math_llm), WritingAgent(ScriptedChatModel(responses=[]))],
+        metrics=MetricsCollector(),
+        speculation=warmed_predictor("MathAgent"),
+    )
+
+    result = system.run("Calculate 2 + 2")
+
+    assert not overlap.broken
+    assert result["task_result"] == {"MathAgent": "2 + 2 = 4"}
+    assert math_llm.call_count == 1
+
+    team = result["metrics"].team()
+    assert (team.speculations, team.speculation_hits) == (1, 1)
+    assert team.speculation_wasted_tokens == 0
+    assert team.nodes["MathAgent"].llm_calls == 1 and team.nodes["MathAgent"].prompt_tokens > 0
+
+
+def test_wrong_speculation_is_discarded_and_counted():
+    """Test that a prediction the supervisor does not follow is wasted, not used."""
+    exporter = PrometheusExporter()
+    system, math_llm, writing_llm = build_system(
+        warmed_predictor("WritingAgent"), 0.1, 0.0, exporter
+    )
+
+    result = system.run("Calculate 2 + 2")
+
+    assert result["task_result"] == {"MathAgent": "2 + 2 = 4"}
+    assert writing_llm.call_count == 1
+    team = result["metrics"].team()
+    assert (team.speculations, team.speculation_hits) == (1, 0)
+    assert team.speculation_wasted_tokens > 0
+    assert 'langgroup_speculations_total{team="root"} 1' in exporter.render()
+    assert system.speculation.transitions()["__start__"]["MathAgent"] == 1
+
+
+def test_async_speculation():
+    """Test that speculation also works on the event loop."""
+    system, math_llm, _ = build_system(warmed_predictor("MathAgent"))
+
+    result = asyncio.run(system.arun("Calculate 2 + 2"))
+
+    assert result["task_result"] == {"MathAgent": "2 + 2 = 4"}
+    assert math_llm.call_count == 1
+    assert result["metrics"].team().speculation_hits == 1
+
+
+def test_speculation_requires_a_handoff_without_instructions():
+    """Test that speculation is rejected when the agent's request depends on the decision."""
+    llm = ScriptedChatModel(responses=[])
+
+    with pytest.raises(ValueError, match="speculation"):
+        AgentSystem(
+            llm, [MathAgent(llm)], speculation=TransitionPredictor(), handoff=InstructionHandoff()
+        )
+
+
+def test_unreusable_agents_are_not_started_speculatively():
+    """Test that a predicted agent with side effects is not run before the decision."""
+
+    class SideEffectWritingAgent(WritingAgent):
+        @property
+        def reusable(self) -> bool:
+            return False
+
+    # A slow decision gives a speculative call time to start
+    llm = ScriptedChatModel(responder=sequential_router(), latency=0.1)
+    math_llm = ScriptedChatModel(responses=["2 + 2 = 4"])
+    writing_llm = ScriptedChatModel(responses=["A summary"])
+    system = AgentSystem(
+        llm,
+        [MathAgent(math_llm), SideEffectWritingAgent(writing_llm, name="WritingAgent")],
+        metrics=MetricsCollector(),
+        speculation=warmed_predictor("WritingAgent"),
+    )
+
+    result = system.run("Calculate 2 + 2")
+
+    assert result["task_result"] == {"MathAgent": "2 + 2 = 4"}
+    assert writing_llm.call_count == 0
+    assert result["metrics"].team().speculations == 0
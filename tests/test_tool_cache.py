@@ -0,0 +1,103 @@
+"""Tests for memoized cacheable tools."""
+import asyncio
+import sys
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, InMemoryCache, SQLiteCache, cacheable
+from langgroup.tool_cache import is_cacheable, make_tool_cache_key
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent
+
+
+def build_system(tool_cache=None):
+    """Build a system whose math agent calls its calculation tool once per run."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    math_llm = ScriptedChatModel(responses=[
+        {"tool_calls": [{"name": "calculation_tool", "args": {"expression": "2 + 2"}}]},
+        "2 + 2 = 4",
+    ] * 2)
+    return AgentSystem(llm, [MathAgent(math_llm)], tool_cache=tool_cache)
+
+
+def tool_messages(agent):
+    """Capture the tool messages produced by an agent's calls."""
+    captured = []
+    invoke, ainvoke = agent.invoke, agent.ainvoke
+
+    def capture_invoke(*args, **kwargs):
+        output = invoke(*args, **kwargs)
+        captured.extend(msg for msg in output["messages"] if msg.type == "tool")
+        return output
+
+    async def capture_ainvoke(*args, **kwargs):
+        output = await ainvoke(*args, **kwargs)
+        captured.extend(msg for msg in output["messages"] if msg.type == "tool")
+        return output
+
+    agent.invoke, agent.ainvoke = capture_invoke, capture_ainvoke
+    return captured
+
+
+def test_cacheable_tool_reuses_result_across_runs():
+    """Test that a repeated call is answered from the cache and counted by the tool logger."""
+    cache = InMemoryCache()
+    system = build_system(cache)
+    agent = system.agents[0]
+    messages = tool_messages(agent)
+
+    system.run("Calculate 2 + 2")
+    asyncio.run(system.arun("Calculate 2 + 2"))
+
+    assert [msg.content for msg in messages] == ["Calculation result: 4"] * 2
+    assert messages[1].tool_call_id != messages[0].tool_call_id
+    stats = agent.tool_logger.cache_stats["calculation_tool"]
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert len(cache) == 1
+
+
+def test_tools_run_uncached_without_a_tool_cache():
+    """Test that cacheable tools run normally when the system has no tool cache."""
+    system = build_system()
+    system.run("Calculate 2 + 2")
+    system.run("Calculate 2 + 2")
+
+    assert system.agents[0].tool_logger.cache_stats == {}
+
+
+def test_sqlite_tool_cache_is_shared_between_systems(tmp_path):
+    """Test that an on-disk tool cache serves results to another system."""
+    path = str(tmp_path / "tools.db")
+    build_system(SQLiteCache(path)).run("Calculate 2 + 2")
+
+    system = build_system(SQLiteCache(path))
+    system.run("Calculate 2 + 2")
+
+    assert system.agents[0].tool_logger.cache_stats["calculation_tool"].hits == 1
+
+
+def test_cache_key_canonicalizes_arguments():
+    """Test that argument order does not change the key but argument values do."""
+    key = make_tool_cache_key("add", "demo.add", {"a": 1, "b": 2})
+
+    assert key == make_tool_cache_key("add", "demo.add", {"b": 2, "a": 1})
+    assert key != make_tool_cache_key("add", "demo.add", {"a": 2, "b": 1})
+    assert key != make_tool_cache_key("add", "other.add", {"a": 1, "b": 2})
+
+
+def test_cacheable_marks_functions_and_tools():
+    """Test that plain functions and LangChain tools can both be marked."""
+    from langchain_core.tools import tool
+
+    @tool
+    def lookup(query: str) -> str:
+        """Look something up."""
+        return query
+
+    def plain(query: str) -> str:
+        return query
+
+    assert is_cacheable(cacheable(lookup))
+    assert is_cacheable(cacheable(plain))
+    assert not is_cacheable(lambda query: query)
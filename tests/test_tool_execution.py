@@ -0,0 +1,155 @@
+"""Tests for pooled and timed-out tool execution inside agents."""
+import asyncio
+import os
+import threading
+import time
+import sys
+from typing import Callable, Dict, List
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, BaseAgent, ToolExecutor, ToolPolicy
+from langgroup.testing import ScriptedChatModel
+
+
+def slow_lookup(query: str) -> str:
+    """Look up a query slowly."""
+    time.sleep(0.2)
+    return f"{query} on {threading.current_thread().name}"
+
+
+# Passed only when two paired lookups are running at the same time
+PAIR = threading.Barrier(2, timeout=2)
+
+
+def paired_lookup(query: str) -> str:
+    """Look up a query once another lookup is running alongside it."""
+    PAIR.wait()
+    return f"{query} on {threading.current_thread().name}"
+
+
+def worker_pid(n: int) -> str:
+    """Report the process a computation ran in."""
+    return f"{sum(range(n))} in {os.getpid()}"
+
+
+class LookupAgent(BaseAgent):
+    """Agent with pooled tools."""
+
+    def __init__(self, llm, policies: Dict[str, ToolPolicy]):
+        self.policies = policies
+        super().__init__(llm)
+
+    @property
+    def description(self) -> str:
+        return "Looks things up."
+
+    @property
+    def tools(self) -> List[Callable]:
+        return [slow_lookup, paired_lookup, worker_pid]
+
+    @property
+    def system_prompt(self) -> str:
+        return "You look things up."
+
+    @property
+    def tool_policies(self) -> Dict[str, ToolPolicy]:
+        return self.policies
+
+
+def build_system(tool_calls, policies, tool_executor=None):
+    """Build a system whose agent makes ``tool_calls`` in one turn, then answers."""
+    llm = ScriptedChatModel(responses=[
+        {"next_agent": "LookupAgent", "reasoning": "lookup"},
+        {"tool_calls": tool_calls},
+        "Looked up",
+        {"next_agent": "FINISH", "reasoning": "done"},
+    ])
+    return AgentSystem(llm, [LookupAgent(llm, policies)], tool_executor=tool_executor)
+
+
+def tool_results(result) -> List[str]:
+    """Return the tool messages an agent produced during a run."""
+    return [msg.content for msg in result["agent_messages"] if msg.type == "tool"]
+
+
+def run_with_tool_messages(system, task, use_async=False):
+    """Run a task, capturing the agent's own messages through a wrapped invoke."""
+    agent = system.agents[0]
+    captured = []
+    invoke, ainvoke = agent.invoke, agent.ainvoke
+
+    def capture_invoke(*args, **kwargs):
+        output = invoke(*args, **kwargs)
+        captured.extend(output["messages"])
+        return output
+
+    async def capture_ainvoke(*args, **kwargs):
+        output = await ainvoke(*args, **kwargs)
+        captured.extend(output["messages"])
+        return output
+
+    agent.invoke, agent.ainvoke = capture_invoke, capture_ainvoke
+    result = asyncio.run(system.arun(task)) if use_async else system.run(task)
+    result["agent_messages"] = captured
+    return result
+
+
+def test_thread_pool_runs_tool_calls_concurrently():
+    """Test that tool calls of one turn overlap on the system's shared thread pool."""
+    calls = [
+        {"name": "paired_lookup", "args": {"query": "a"}},
+        {"name": "paired_lookup", "args": {"query": "b"}},
+    ]
+    with ToolExecutor(max_threads=2) as executor:
+        for use_async in (False, True):
+            PAIR.reset()
+            system = build_system(calls, {"paired_lookup": ToolPolicy()}, tool_executor=executor)
+            result = run_with_tool_messages(system, "Look up a and b", use_async=use_async)
+
+            outputs = tool_results(result)
+            # Each call only returns once both are inside the tool together
+            assert not PAIR.broken
+            assert len(outputs) == 2
+            assert all("langgroup-tool" in output for output in outputs)
+            assert result["task_result"] == {"LookupAgent": "Looked up"}
+
+
+def test_pool_size_bounds_tool_concurrency():
+    """Test that a single-thread pool runs the calls one after another."""
+    calls = [
+        {"name": "slow_lookup", "args": {"query": "a"}},
+        {"name": "slow_lookup", "args": {"query": "b"}},
+    ]
+    with ToolExecutor(max_threads=1) as executor:
+        system = build_system(calls, {"slow_lookup": ToolPolicy()}, tool_executor=executor)
+        started = time.monotonic()
+        system.run("Look up a and b")
+        assert time.monotonic() - started >= 0.4
+
+
+def test_tool_timeout_returns_error_result():
+    """Test that a timed-out tool gives the model an error result instead of failing the run."""
+    calls = [{"name": "slow_lookup", "args": {"query": "a"}}]
+    policies = {"slow_lookup": ToolPolicy(timeout=0.05)}
+
+    for use_async in (False, True):
+        result = run_with_tool_messages(
+            build_system(calls, policies), "Look up a", use_async=use_async
+        )
+
+        assert tool_results(result) == ["Error: tool slow_lookup timed out after 0.05 seconds"]
+        assert result["task_result"] == {"LookupAgent": "Looked up"}
+
+
+def test_process_pool_runs_tool_in_worker_process():
+    """Test that process tools run outside the calling process."""
+    calls = [{"name": "worker_pid", "args": {"n": 10}}]
+    with ToolExecutor(max_processes=1) as executor:
+        system = build_system(calls, {"worker_pid": ToolPolicy(mode="process")}, executor)
+        output, = tool_results(run_with_tool_messages(system, "Compute"))
+
+    total, pid = output.split(" in ")
+    assert total == "45"
+    assert int(pid) != os.getpid()
@@ -0,0 +1,133 @@
+"""Tests for run traces and trace replay."""
+import asyncio
+import sys
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import (
+    AgentSystem,
+    SupervisorAgent,
+    TraceMismatchError,
+    TraceRecorder,
+    TraceReplay,
+    load_trace,
+)
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, WritingAgent
+
+TASK = "Calculate 6 * 7 and write it up"
+
+
+def tool_using_responder():
+    """Build a responder that routes to the team once, and the team to both agents.
+
+    Each agent calls its tool once before replying.
+    """
+    route_top, route_team = sequential_router(hops=1), sequential_router(hops=2)
+    tools = {"MathAgent": "calculation_tool", "WritingAgent": "writing_tool"}
+
+    def respond(messages, tool_names):
+        if isinstance(messages[-1], HumanMessage) and not any(
+            name.endswith("Decision") for name in tool_names
+        ):
+            agent = "MathAgent" if "mathematical" in str(messages[0].content) else "WritingAgent"
+            arg = "expression" if agent == "MathAgent" else "content"
+            return {"tool_calls": [{"name": tools[agent], "args": {arg: "6 * 7"}}]}
+        if "- Team:" in str(messages[0].content):
+            return route_top(messages, tool_names)
+        return route_team(messages, tool_names)
+
+    return respond
+
+
+def build_system(llm, **kwargs):
+    team = SupervisorAgent(llm, [MathAgent(llm), WritingAgent(llm)], name="Team")
+    return AgentSystem(llm, [team], **kwargs)
+
+
+def record(tmp_path):
+    llm = ScriptedChatModel(responder=tool_using_responder())
+    path = tmp_path / "run.jsonl"
+    result = build_system(llm, trace=TraceRecorder(path)).run(TASK)
+    return path, result, llm.call_count
+
+
+def test_trace_records_decisions_agents_models_and_tools(tmp_path):
+    """Test that every level of a nested run is written to the trace."""
+    path, result, model_calls = record(tmp_path)
+    events = load_trace(path)
+
+    assert events[0]["type"] == "run_start" and events[0]["task"] == TASK
+    assert events[-1]["type"] == "run_end" and events[-1]["task_result"] == result["task_result"]
+    assert len({event["run"] for event in events}) == 1
+
+    decisions = [(e["team"], e["data"]["next"]) for e in events if e["type"] == "supervisor_decision"]
+    assert decisions == [
+        ([], "Team"),
+        (["Team"], "MathAgent"),
+        (["Team"], "WritingAgent"),
+        (["Team"], "finish"),
+        ([], "finish"),
+    ]
+    agent_ends = [(e["team"], e["agent"]) for e in events if e["type"] == "agent_end"]
+    assert agent_ends == [(["Team"], "MathAgent"), (["Team"], "WritingAgent"), ([], "Team")]
+
+    llm_calls = [e for e in events if e["type"] == "llm_call"]
+    assert len(llm_calls) == model_calls
+    assert {(tuple(e["team"]), e["node"]) for e in llm_calls} == {
+        ((), "supervisor"),
+        (("Team",), "supervisor"),
+        (("Team",), "MathAgent"),
+        (("Team",), "WritingAgent"),
+    }
+    tool_calls = [e for e in events if e["type"] == "tool_call"]
+    assert tool_calls[0]["name"] == "calculation_tool"
+    assert tool_calls[0]["args"] == {"expression": "6 * 7"}
+    assert tool_calls[0]["output"] == "Calculation result: 42"
+    assert all(e["duration"] >= 0 for e in llm_calls + tool_calls)
+
+
+def test_replay_reproduces_run_without_model_calls(tmp_path):
+    """Test that a replayed run makes the recorded decisions with no model or tool calls."""
+    path, result, _ = record(tmp_path)
+    llm = ScriptedChatModel(responses=[])
+    replay_path = tmp_path / "replay.jsonl"
+    system = build_system(llm, replay=TraceReplay(path), trace=TraceRecorder(replay_path))
+
+    replayed = system.run(TASK)
+
+    assert replayed["task_result"] == result["task_result"]
+    assert llm.call_count == 0
+
+    def stream_events(events):
+        return [(e["type"], e["team"], e["agent"], e["data"]) for e in events if "data" in e]
+
+    assert stream_events(load_trace(replay_path)) == stream_events(load_trace(path))
+    # Tool results came from the trace rather than running the tools
+    assert not [e for e in load_trace(replay_path) if e["type"] == "tool_call"]
+
+    # Replays can be repeated
+    assert system.run(TASK)["task_result"] == result["task_result"]
+
+
+def test_async_replay(tmp_path):
+    """Test that a trace also replays on the event loop."""
+    path, result, _ = record(tmp_path)
+    system = build_system(ScriptedChatModel(responses=[]), replay=TraceReplay(path))
+
+    replayed = asyncio.run(system.arun(TASK))
+
+    assert replayed["task_result"] == result["task_result"]
+
+
+def test_diverging_replay_raises(tmp_path):
+    """Test that a run that leaves the recorded path fails instead of calling models."""
+    path, _, _ = record(tmp_path)
+    system = build_system(ScriptedChatModel(responses=[]), replay=TraceReplay(path))
+
+    with pytest.raises(TraceMismatchError):
+        system.run("A different task")
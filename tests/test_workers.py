@@ -0,0 +1,138 @@
+"""Tests for the task queue and worker processes."""
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append("examples")
+sys.path.append("src")
+
+from langgroup import AgentSystem, MetricsCollector, SQLiteTaskQueue, Worker, WorkerPool
+from langgroup.testing import ScriptedChatModel, sequential_router
+from examples.example_agents import MathAgent, WritingAgent
+
+
+def build_system():
+    """Build a scripted system that routes to one agent per task."""
+    llm = ScriptedChatModel(responder=sequential_router())
+    return AgentSystem(llm, [MathAgent(llm), WritingAgent(llm)], metrics=MetricsCollector())
+
+
+class StuckSystem:
+    """A system whose runs take far longer than the tests wait."""
+
+    def run(self, task):
+        time.sleep(60)
+
+
+def build_stuck_system():
+    return StuckSystem()
+
+
+def test_worker_runs_queued_tasks(tmp_path):
+    """Test that a worker stores results and metrics for each task."""
+    queue = SQLiteTaskQueue(str(tmp_path / "queue.db"))
+    ids = queue.submit_many(["Calculate 2 + 2", "Calculate 3 + 3"])
+    worker = Worker(build_system(), queue, worker_id="w1")
+
+    assert worker.process_one().id == ids[0]
+    assert worker.process_one().id == ids[1]
+    assert worker.process_one() is None
+
+    tasks = queue.wait(ids, timeout=1)
+    assert [task.status for task in tasks] == ["done", "done"]
+    assert tasks[0].result["task_result"] == {"MathAgent": "Done: Calculate 2 + 2"}
+    assert tasks[0].result["messages"][0]["content"] == "Calculate 2 + 2"
+    assert tasks[0].result["metrics"]["hops"] == 1
+    assert queue.counts() == {"pending": 0, "running": 0, "done": 2, "failed": 0}
+
+
+def test_errors_are_retried_then_failed(tmp_path):
+    """Test that a failing task is retried up to max_attempts and then marked failed."""
+
+    class BrokenSystem:
+        def run(self, task):
+            raise RuntimeError("model unavailable")
+
+    queue = SQLiteTaskQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    task_id = queue.submit("Calculate 2 + 2")
+    worker = Worker(BrokenSystem(), queue, worker_id="w1")
+
+    worker.process_one()
+    assert queue.get(task_id).status == "pending"
+    worker.process_one()
+
+    task = queue.get(task_id)
+    assert task.status == "failed" and task.attempts == 2
+    assert task.error == "RuntimeError: model unavailable"
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    """Test that a task abandoned by its worker is handed out again after its lease."""
+    queue = SQLiteTaskQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    task_id = queue.submit("Calculate 2 + 2")
+
+    assert queue.claim("dead-worker", lease=0.05).id == task_id
+    assert queue.claim("w2", lease=10) is None
+    time.sleep(0.1)
+
+    retry = queue.claim("w2", lease=0.05)
+    assert retry.id == task_id and retry.attempts == 2
+    assert not queue.renew(task_id, "dead-worker", 10)
+    time.sleep(0.1)
+
+    assert queue.claim("w3", lease=10) is None
+    assert queue.get(task_id).error == "Lease expired"
+
+
+def test_worker_stops_when_asked(tmp_path):
+    """Test that a running worker loop exits once its stop event is set."""
+    queue = SQLiteTaskQueue(str(tmp_path / "queue.db"))
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=Worker(build_system(), queue, poll_interval=0.01).run, args=(stop,)
+    )
+    thread.start()
+    task_id = queue.submit("Calculate 2 + 2")
+
+    assert queue.wait([task_id], timeout=5)[0].status == "done"
+    stop.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_worker_pool_shares_queue(tmp_path, start_method):
+    """Test that worker processes drain a queue between them."""
+    queue = SQLiteTaskQueue(str(tmp_path / "queue.db"))
+    ids = queue.submit_many([f"Calculate {i} + {i}" for i in range(6)])
+
+    pool = WorkerPool(
+        build_system, queue, num_workers=2, poll_interval=0.01, start_method=start_method
+    )
+    with pool:
+        tasks = queue.wait(ids, timeout=60)
+        assert pool.alive == 2
+
+    assert all(task.status == "done" for task in tasks)
+    assert tasks[5].result["task_result"] == {"MathAgent": "Done: Calculate 5 + 5"}
+    assert pool.alive == 0
+
+
+def test_worker_pool_stop_kills_busy_workers_after_timeout(tmp_path):
+    """Test that stop returns within its timeout while a worker is in the middle of a task."""
+    queue = SQLiteTaskQueue(str(tmp_path / "queue.db"))
+    task_id = queue.submit("Calculate 2 + 2")
+    pool = WorkerPool(
+        build_stuck_system, queue, num_workers=1, poll_interval=0.01, start_method="fork"
+    ).start()
+    deadline = time.monotonic() + 30
+    while queue.get(task_id).status != "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    pool.stop(timeout=0.5)
+
+    assert time.monotonic() - started < 2
+    assert pool.alive == 0